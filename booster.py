@@ -1,23 +1,40 @@
 # booster.py — unified opener driven by booster_registry.REGISTRY (query-driven, readable)
 
-import requests, random, time 
+import random, time 
 from typing import Dict, Any, Callable, Optional, List, Tuple
 
 from booster_registry import REGISTRY, FETCHLAND_NAMES
+from valuation import get_policy
 
 # =========================
 # Utilities
 # =========================
 
-def pick_weighted(weights: Dict[str, float]) -> str:
+# rng arguments take a random.Random; None falls back to the module-level random (shared state)
+
+def pick_weighted(weights: Dict[str, float], rng: Optional[random.Random] = None) -> str:
     keys, vals = zip(*weights.items())
-    return random.choices(keys, weights=vals, k=1)[0]
+    return (rng or random).choices(keys, weights=vals, k=1)[0]
 
-def pick_from_table(table: List[Dict[str, Any]]) -> Dict[str, Any]:
+def pick_table_index(table: List[Dict[str, Any]], rng: Optional[random.Random] = None) -> int:
     weights = [entry.get("weight", 1.0) for entry in table]
-    idx = random.choices(range(len(table)), weights=weights, k=1)[0]
+    return (rng or random).choices(range(len(table)), weights=weights, k=1)[0]
+
+def pick_from_table(table: List[Dict[str, Any]], draws: Optional[List[int]] = None,
+                    rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    # draws (optional) collects the picked entry index so samples can be reweighted later
+    idx = pick_table_index(table, rng)
+    if draws is not None:
+        draws.append(idx)
     return table[idx]
 
+def card_value(card: Optional[Dict[str, Any]], is_foil: bool = False) -> float:
+    # in the valuation policy's base currency (same rule the engines' price columns use)
+    return get_policy().card_price(card, is_foil)
+
+def pack_value(booster, foil, bonus) -> float:
+    return sum(card_value(c) for c in booster) + card_value(foil, True) + card_value(bonus)
+
 def color_emojis(card: Dict[str, Any]) -> str:
     # Use color_identity; fallback to produced mana or type heuristics
     mapping = {"W": "⚪", "U": "🔵", "B": "⚫", "R": "🔴", "G": "🟢"}
@@ -61,57 +78,158 @@ def fetch_random_card(
     produces: Optional[str] = None,
     full_art: bool = False,
     raw_query: Optional[str] = None,
+    rng: Optional[random.Random] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     Single random card from Scryfall with flexible filters.
     If raw_query is provided, it is used verbatim (plus our global -!"Ragnarok, Divine Deliverance").
     """
+    query = build_query(set_code, rarity, is_foil, variation, frame, type_line,
+                        set_override, collector_number, produces, full_art, raw_query)
+    return fetch_card_by_query(query, rng)
+
+EXCLUDED_CARD = '-!"Ragnarok, Divine Deliverance"'
+EXEMPT_SETS = {"spg","fca","eos","otp","big","wot","mul","brc","dmc","sta","zne"}
+
+def build_query(
+    set_code: Optional[str] = None,
+    rarity: Optional[str] = None,
+    is_foil: bool = False,
+    variation: bool = False,
+    frame: Optional[str] = None,
+    type_line: Optional[str] = None,
+    set_override: Optional[str] = None,
+    collector_number: Optional[str] = None,
+    produces: Optional[str] = None,
+    full_art: bool = False,
+    raw_query: Optional[str] = None,
+) -> str:
+    """
+    The Scryfall query fetch_random_card would send, normalized to single spaces.
+    Shared with the compiled engine so both sample from exactly the same card pools.
+    """
     if raw_query:
         query = raw_query.strip()
-        if '-!"Ragnarok, Divine Deliverance"' not in query:
-            query += ' -!"Ragnarok, Divine Deliverance"'
-        url = "https://api.scryfall.com/cards/random?q=" + "+".join(query.split())
+        if EXCLUDED_CARD not in query:
+            query += " " + EXCLUDED_CARD
+        return " ".join(query.split())
+
+    parts: List[str] = []
+    actual_set = set_override or set_code
+    if actual_set:
+        parts.append(f"set:{actual_set}")
+
+    if type_line == "basic land":
+        parts.append("t:basic")
+    elif actual_set not in EXEMPT_SETS and type_line != "token":
+        parts.append("is:booster")
+
+    if rarity: parts.append(f"rarity:{rarity}")
+    if is_foil: parts.append("is:foil")
+    if variation: parts.append("variation:true")
+    if frame: parts.append(f"frame:{frame}")
+    if type_line and type_line != "basic land": parts.append(f"type:{type_line}")
+    if full_art: parts.append("t:full_art")
+    if collector_number: parts.append(f"cn:{collector_number}")
+    if produces: parts.append(f"produces:{produces}")
+
+    parts.append(EXCLUDED_CARD)
+    return " ".join(parts)
+
+def add_query_terms(query: str, *terms: str) -> str:
+    # extra filters go in front of the global exclusion so the query keeps build_query's shape
+    body = query.replace(EXCLUDED_CARD, "").strip()
+    return " ".join([body, *terms, EXCLUDED_CARD])
+
+def bonus_sheet_query(cfg: Dict[str, Any], rarity: Optional[str]) -> str:
+    query = build_query(set_override=cfg.get("bonus_sheet_code"), rarity=rarity)
+    cn_range = cfg.get("bonus_sheet_cn_range")
+    if cn_range:
+        query = add_query_terms(query, f"cn>={cn_range[0]}", f"cn<={cn_range[1]}")
+    return query
+
+def fetchland_query(set_code: str, names) -> str:
+    wanted = " OR ".join(f'!"{n}"' for n in sorted(names))
+    return add_query_terms(build_query(set_code, "rare", is_foil=True), f"({wanted})")
+
+# Where fetch_card_by_query gets its cards from; None = one /cards/random call per card.
+# A source is any callable query -> card dict (or None), e.g. prefetch.CardReservoir.get, or
+# hedged.DeadlineSource.get with a reservoir in front of it (the CLI's online mode).
+# Sources that sample locally (card_pools.sample_from_pool) take the pack's rng as well.
+# A source that samples from whole pools can also hand them out (pool: query -> list of cards),
+# which lets fetch_distinct pick among the cards left instead of redrawing duplicates.
+_card_source: Optional[Callable[..., Optional[Dict[str, Any]]]] = None
+_source_takes_rng = False
+_source_pool: Optional[Callable[[str], Optional[List[Dict[str, Any]]]]] = None
+
+# redraws of a duplicate when the source has no pool to pick from (online)
+DISTINCT_TRIES = 8
+
+def set_card_source(source: Optional[Callable[..., Optional[Dict[str, Any]]]], takes_rng: bool = False,
+                    pool: Optional[Callable[[str], Optional[List[Dict[str, Any]]]]] = None):
+    global _card_source, _source_takes_rng, _source_pool
+    _card_source, _source_takes_rng, _source_pool = source, takes_rng, pool
+
+def card_source():
+    """(source, takes_rng, pool) as last passed to set_card_source, so a caller can put them back."""
+    return _card_source, _source_takes_rng, _source_pool
+
+def fetch_card_by_query(query: str, rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
+    source, takes_rng = _card_source, _source_takes_rng
+    if source is not None:
+        return source(query, rng) if takes_rng else source(query)
+    return fetch_random_card_http(query)
+
+def fetch_distinct(query: str, taken: List[str], rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
+    """
+    A card of query whose id is not in taken (the pack's earlier draws from the same pool), then
+    records it there. With a pool the pick is int(random() * cards left), stepped over the taken
+    positions in pool order — the batched engine does the same per slot. Online, duplicates are
+    redrawn up to DISTINCT_TRIES times. A pool smaller than the slots it fills repeats cards.
+    """
+    query = " ".join(query.split())
+    pool = _source_pool(query) if _source_pool is not None else None
+    if pool:
+        r = rng or random
+        ids = set(taken)
+        positions = [i for i, c in enumerate(pool) if c.get("id") in ids]
+        left = len(pool) - len(positions)
+        if left <= 0:
+            card = dict(pool[int(r.random() * len(pool))])
+        else:
+            pick = int(r.random() * left)
+            for p in positions:
+                if pick >= p:
+                    pick += 1
+            card = dict(pool[pick])
     else:
-        query: List[str] = []
-        actual_set = set_override or set_code
-        if actual_set:
-            query.append(f"set:{actual_set}")
-
-        exempt_sets = {"spg","fca","eos","otp","big","wot","mul","brc","dmc","sta","zne"}
-
-        if type_line == "basic land":
-            query.append("t:basic")
-        elif actual_set not in exempt_sets and type_line != "token":
-            query.append("is:booster")
-
-        if rarity: query.append(f"rarity:{rarity}")
-        if is_foil: query.append("is:foil")
-        if variation: query.append("variation:true")
-        if frame: query.append(f"frame:{frame}")
-        if type_line and type_line != "basic land": query.append(f"type:{type_line}")
-        if full_art: query.append("t:full_art")
-        if collector_number: query.append(f"cn:{collector_number}")
-        if produces: query.append(f"produces:{produces}")
-
-        query.append('-!"Ragnarok, Divine Deliverance"')
-        url = "https://api.scryfall.com/cards/random?q=" + "+".join(query)
+        card = None
+        for _ in range(DISTINCT_TRIES):
+            card = fetch_card_by_query(query, rng)
+            if card is None or card.get("id") not in taken:
+                break
+    if card is not None:
+        taken.append(card.get("id"))
+    return card
 
+def fetch_random_card_http(query: str, timeout: float = 20) -> Optional[Dict[str, Any]]:
+    import requests  # only the online path pays for it (~0.1 s at import)
+    url = "https://api.scryfall.com/cards/random?q=" + "+".join(query.split())
     try:
-        req = requests.get(url, timeout=20)
+        req = requests.get(url, timeout=timeout)
         req.raise_for_status()
         return req.json()
     except requests.RequestException as err:
         print("[fetch_random_card] Error:", err, "| URL:", url)
         return None
 
-def fetch_bonus_sheet_card(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    sheet = cfg.get("bonus_sheet_code")
+def fetch_bonus_sheet_card(cfg: Dict[str, Any], rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
     weights = cfg.get("bonus_sheet_weights")
     bonusSheetCollectorNumRange: Optional[Tuple[int,int]] = cfg.get("bonus_sheet_cn_range")
-    # Try a few times to hit the CN restriction if present
+    # The CN restriction is part of the query; the check below only guards against odd CNs
     for _ in range(12):
-        rarity = pick_weighted(weights) if weights else None
-        card = fetch_random_card(set_override=sheet, rarity=rarity)
+        rarity = pick_weighted(weights, rng) if weights else None
+        card = fetch_card_by_query(bonus_sheet_query(cfg, rarity), rng)
         if not card: continue
         if not bonusSheetCollectorNumRange:
             return card
@@ -124,6 +242,47 @@ def fetch_bonus_sheet_card(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             pass
     return None
 
+# ==================================================================================================== #
+# Pack context                                                                                         #
+# ==================================================================================================== #
+
+class PackContext(dict):
+    """
+    Everything one pack needs while it is being opened: the set's config (copied), the rng, the
+    draws log and the cards so far. Hooks get it as their ctx dict; nothing here is shared between
+    packs, so any number of packs can be opened at once on different threads.
+    """
+
+    def __init__(self, set_code: str, rng: Optional[random.Random] = None,
+                 draws: Optional[Dict[str, List[int]]] = None):
+        super().__init__(REGISTRY.get(set_code, REGISTRY["_default"]))
+        self["set_code"] = set_code
+        self["draws"] = draws
+        self["_booster_cards"] = []  # filled before the post hooks run
+        self.rng = rng if rng is not None else random.Random()
+        self.taken: Dict[str, List[str]] = {}  # query → card ids drawn without replacement
+
+    def fetch(self, query: str, card: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        The card of a common/uncommon slot: card when a hook replaced the slot, else a draw from
+        query. With distinct_slots the draw skips the cards earlier slots drew from that pool.
+        Hook cards are not recorded: they are independent of the base draws, so excluding them
+        would make the base pool non-uniform where a hook pool overlaps it (DSK Lurking Evil).
+        """
+        if card:
+            return card
+        if not self.get("distinct_slots"):
+            return fetch_card_by_query(query, self.rng)
+        return fetch_distinct(query, self.taken.setdefault(query, []), self.rng)
+
+    def table_draws(self, table_name: str) -> Optional[List[int]]:
+        draws = self["draws"]
+        return draws.setdefault(table_name, []) if draws is not None else None
+
+def _rng(ctx) -> random.Random:
+    # hooks may still be called with a plain config dict
+    return getattr(ctx, "rng", None) or random
+
 # ==================================================================================================== #
 # Hooks For Extra Logic                                                                                #
 # ==================================================================================================== #
@@ -133,27 +292,28 @@ def dsk_lurking_hook(slot_name: str, set_code: dict, params: Optional[dict] = No
     if set_code.get("set_code") != "dsk":
         return None
 
+    rng = _rng(set_code)
     lurking_evil = (params or set_code.get("lurking_evil") or {}).copy()
     collector_num = (lurking_evil.get("cn") or {}).copy()
 
     if slot_name == "common":
-        if random.random() < lurking_evil.get("common_chance", 0.0):
-            num = random.choice(collector_num.get("common", []))
+        if rng.random() < lurking_evil.get("common_chance", 0.0):
+            num = rng.choice(collector_num.get("common", []))
             if num:
-                return fetch_random_card("dsk", "common", collector_number=num)
+                return fetch_random_card("dsk", "common", collector_number=num, rng=rng)
 
     if slot_name == "uncommon":
-        r = random.random()
+        r = rng.random()
         le_chance = lurking_evil.get("uncommon_le_chance", 0.0)
         pf_chance = lurking_evil.get("uncommon_pf_chance", 0.0)
         if r < le_chance:
-            num = random.choice(collector_num.get("uncommon", []))
+            num = rng.choice(collector_num.get("uncommon", []))
             if num:
-                return fetch_random_card("dsk", "uncommon", collector_number=num)
+                return fetch_random_card("dsk", "uncommon", collector_number=num, rng=rng)
         elif r < le_chance + pf_chance:
-            num = random.choice(lurking_evil.get("pf_uncommon_numbers", []))
+            num = rng.choice(lurking_evil.get("pf_uncommon_numbers", []))
             if num:
-                return fetch_random_card("dsk", "uncommon", collector_number=num)
+                return fetch_random_card("dsk", "uncommon", collector_number=num, rng=rng)
     return None
 
 # --- OTJ Breaking News Hook ---
@@ -166,8 +326,9 @@ def otj_breaking_news_hook(slot_name: str, set_code: dict, params: Optional[dict
     p = params or {}
     odds = p.get("otp_odds", {"uncommon": 0.667, "rare": 0.285, "mythic": 0.048})
     sheet = p.get("otp_sheet_code", "otp")
-    rarity = pick_weighted(odds)
-    card = fetch_random_card(set_override=sheet, rarity=rarity)
+    rng = _rng(set_code)
+    rarity = pick_weighted(odds, rng)
+    card = fetch_random_card(set_override=sheet, rarity=rarity, rng=rng)
     return [card] if card else None
 
 # --- CLB Specials Hook ---
@@ -178,16 +339,17 @@ def clb_specials_hook(slot_name: str, set_code: dict, params: Optional[dict] = N
         return None
 
     p = params or {}
+    rng = _rng(set_code)
     hook_out: List[Dict[str, Any]] = []
 
     def maybe_add(item: dict):
         if not item or not item.get("enabled", True):
             return
         freq = item.get("frequency", 0.0)
-        if random.random() <= freq:
-            rarity = pick_weighted(item.get("rarities", {"rare": 1.0}))
+        if rng.random() <= freq:
+            rarity = pick_weighted(item.get("rarities", {"rare": 1.0}), rng)
             bonus_sheet_code = item.get("sheet_code") or "clb"
-            card = fetch_random_card(set_override=bonus_sheet_code, rarity=rarity)
+            card = fetch_random_card(set_override=bonus_sheet_code, rarity=rarity, rng=rng)
             if card:
                 hook_out.append(card)
 
@@ -202,12 +364,13 @@ def fin_uncommon_specials_hook(slot_name: str, set_code: dict, params: Optional[
     if set_code.get("set_code") != "fin" or slot_name != "uncommon":
         return None
     p = params or {}
+    rng = _rng(set_code)
     chance = p.get("chance", 0.003)  # 0.3% per uncommon slot
-    if random.random() >= chance:
+    if rng.random() >= chance:
         return None
 
     # 50/50 woodblock vs character unless we change it in params
-    mode = random.choice(["woodblock", "character"])
+    mode = rng.choice(["woodblock", "character"])
     if mode == "woodblock":
         query = "set:fin cn>=323 cn<=373 r:uncommon"
         treatment = "borderless woodblock"
@@ -215,7 +378,7 @@ def fin_uncommon_specials_hook(slot_name: str, set_code: dict, params: Optional[
         query = "set:fin cn>=374 cn<=405 r:uncommon"
         treatment = "borderless character"
 
-    card = fetch_random_card(raw_query=query)
+    card = fetch_random_card(raw_query=query, rng=rng)
     if card:
         card["x_treatment"] = treatment
     return card
@@ -226,33 +389,33 @@ def snc_extra_rares_hook(slot_name: str, ctx: dict, params: dict = None):
     #      ~0.5% get +3 extra rares (total 4).
     # Returns a single card dict each time so the caller
     # can append directly, not a list.
+    # The count is rolled once per pack (ctx must be that pack's PackContext).
     if ctx.get("set_code") != "snc" or slot_name != "rare":
         return None
 
-    r = random.random()
-    extras = 0
-    if r < 0.005:   # ~0.5% → 4 rares
-        extras = 3
-    elif r < 0.035: # ~3% → 3 rares
-        extras = 2
-    elif r < 0.305: # ~27% → 2 rares
-        extras = 1
-
-    if extras == 0:
-        return None
+    rng = _rng(ctx)
+    if "_snc_extra_remaining" not in ctx:
+        r = rng.random()
+        extras = 0
+        if r < 0.005:   # ~0.5% → 4 rares
+            extras = 3
+        elif r < 0.035: # ~3% → 3 rares
+            extras = 2
+        elif r < 0.305: # ~27% → 2 rares
+            extras = 1
+        # stash count in ctx so we know how many remain
+        ctx["_snc_extra_remaining"] = extras
 
     rare_table = ctx.get("rare_table") or REGISTRY.get("snc", {}).get("rare_table")
     if not rare_table:
         return None
 
     # return one extra card dict per call until we've given out all extras
-    # stash count in ctx so we know how many remain
-    ctx.setdefault("_snc_extra_remaining", extras)
-
     if ctx["_snc_extra_remaining"] > 0:
         ctx["_snc_extra_remaining"] -= 1
-        entry = pick_from_table(rare_table)
-        return _fetch_with_meta(entry["query"], entry.get("treatment"))
+        draws = ctx.get("draws")
+        entry = pick_from_table(rare_table, draws.setdefault("rare_table", []) if draws is not None else None, rng)
+        return _fetch_with_meta(entry["query"], entry.get("treatment"), rng=rng)
 
     return None
 
@@ -269,14 +432,15 @@ def snc_showcase_guarantee_hook(slot_name: str, ctx: dict, params: dict = None):
         return None  # already satisfied
 
     # 90% chance Golden Age, 10% Skyscraper
-    if random.random() < 0.9:
+    rng = _rng(ctx)
+    if rng.random() < 0.9:
         query = "set:snc cn>=296 cn<=340"
         treatment = "Golden Age Showcase"
     else:
         query = "set:snc cn>=350 cn<=359"
         treatment = "Skyscraper Land Showcase"
 
-    card = fetch_random_card(raw_query=query)
+    card = fetch_random_card(raw_query=query, rng=rng)
     if card:
         card["x_treatment"] = treatment
         return card
@@ -298,9 +462,8 @@ def display_card(card: Optional[Dict[str,Any]], is_foil=False, extra_prefix: str
     treatment = (card.get("x_treatment") or "").strip().lower()
     colors = color_emojis(card)
 
-    prices = card.get("prices",{})
-    key = "eur_foil" if is_foil else "eur"
-    value = prices.get(key) or prices.get("usd_foil" if is_foil else "usd")
+    is_foil = is_foil or bool(card.get("x_foil"))
+    value = card_value(card, is_foil)
 
     # Build prefix like: (rare) (borderless triumphant) (FOIL) 🟢🔴 Name 0.00 €
     parts = [f"({rarity})"]
@@ -312,13 +475,10 @@ def display_card(card: Optional[Dict[str,Any]], is_foil=False, extra_prefix: str
     parts.append(colors)
     head = " ".join(parts)
 
-    price_str = f"{value} €" if value else "N/A"
+    price_str = get_policy().format(value) if value else "N/A"
     print(f"{extra_prefix}{head} {name} {price_str}")
 
-    try:
-        return float(value) if value else 0.0
-    except:
-        return 0.0
+    return value
 
 
 def display_booster(booster, foil, bonus, token_count, suspense=True):
@@ -376,62 +536,73 @@ def display_booster(booster, foil, bonus, token_count, suspense=True):
             time.sleep(2)
 
     print(f"\n🎟️ Tokens/Art Cards: {token_count}")
-    print(f"💰 Total Pack Value: {total:.2f}€")
+    print(f"💰 Total Pack Value: {get_policy().format(total)}")
 
 # =========================
 # Core opener 
 # =========================
 
+# The one table of hook names a set's [[hooks]] may use (booster_plan.HOOK_COMPILERS compiles the
+# same names; booster_registry.validate checks set files against both).
+HOOKS: Dict[str, Callable[..., Any]] = {
+    "dsk_lurking": dsk_lurking_hook,
+    "otj_breaking_news": otj_breaking_news_hook,
+    "clb_specials": clb_specials_hook,
+    "fin_uncommon_specials": fin_uncommon_specials_hook,
+    "snc_extra_rares": snc_extra_rares_hook,
+    "snc_showcase_guarantee": snc_showcase_guarantee_hook,
+}
+
 def _resolve_hooks(cfg: dict):
-    name_to_callable = {
-        "dsk_lurking": dsk_lurking_hook,
-        "otj_breaking_news": otj_breaking_news_hook,
-        "clb_specials": clb_specials_hook,
-        "fin_uncommon_specials": fin_uncommon_specials_hook,
-        "snc_extra_rares": snc_extra_rares_hook,
-        "snc_showcase_guarantee": snc_showcase_guarantee_hook,
-
-    }
     resolved: List[Callable[[str, dict], Optional[Any]]] = []
     for hooks in cfg.get("hooks", []):
         if isinstance(hooks, str):
-            fn = name_to_callable.get(hooks)
+            fn = HOOKS.get(hooks)
             if fn:
                 resolved.append(lambda slot, ctx, _fn=fn: _fn(slot, ctx, None))
         elif isinstance(hooks, dict):
             name = hooks.get("name")
             params = hooks.get("params", {})
-            fn = name_to_callable.get(name)
+            fn = HOOKS.get(name)
             if fn:
                 resolved.append(lambda slot, ctx, _fn=fn, _p=params: _fn(slot, ctx, _p))
     return resolved
 
-def _fetch_with_meta(query: str, treatment: Optional[str], force_foil: bool=False) -> Optional[Dict[str,Any]]:
-    card = fetch_random_card(raw_query=query)
+def _fetch_with_meta(query: str, treatment: Optional[str], force_foil: bool=False,
+                     rng: Optional[random.Random] = None) -> Optional[Dict[str,Any]]:
+    card = fetch_random_card(raw_query=query, rng=rng)
     if card:
         if treatment:
             card["x_treatment"] = treatment
+        if force_foil:
+            card["x_foil"] = True  # valued (and shown) as a foil wherever it ends up
     return card
 
-def open_booster(setCode: str):
+def open_booster(setCode: str, draws: Optional[Dict[str, List[int]]] = None,
+                 rng: Optional[random.Random] = None):
+    """
+    Opens one pack. If draws is a dict, it is filled with the table entry index picked
+    for every table-driven slot, e.g. {"rare_table": [0], "wildcard_table": [3], "foil_table": [1]}.
+    All randomness comes from rng (a fresh random.Random if None) and all per-pack state lives in
+    one PackContext, so concurrent calls never touch each other's packs.
+    """
     setCode = setCode.lower()
-    config = REGISTRY.get(setCode, REGISTRY["_default"]).copy()
-    config["set_code"] = setCode
+    ctx = PackContext(setCode, rng, draws)
+    rng = ctx.rng
 
-    hooks = _resolve_hooks(config)
-    config["hooks"] = hooks
+    hooks = _resolve_hooks(ctx)
 
     booster: List[Dict[str,Any]] = []
     bonus_card = None
 
     # --- commons (with optional SPG replacement) ---
-    commons_to_draw = config["common_slots"]
+    commons_to_draw = ctx["common_slots"]
 
-    if config.get("bonus_chance", 0) > 0 and config.get("bonus_sheet_code"):
-        if config["bonus_chance"] >= 1.0:
-            bonus_card = fetch_bonus_sheet_card(config)
-        elif random.random() < config["bonus_chance"]:
-            bc = fetch_bonus_sheet_card(config)
+    if ctx.get("bonus_chance", 0) > 0 and ctx.get("bonus_sheet_code"):
+        if ctx["bonus_chance"] >= 1.0:
+            bonus_card = fetch_bonus_sheet_card(ctx, rng)
+        elif rng.random() < ctx["bonus_chance"]:
+            bc = fetch_bonus_sheet_card(ctx, rng)
             if bc:
                 bonus_card = bc
                 commons_to_draw -= 1
@@ -440,106 +611,187 @@ def open_booster(setCode: str):
         # allow hook to replace a common (DSK variant, etc.)
         card = None
         for hook in hooks:
-            res = hook("common", config)
+            res = hook("common", ctx)
             card = res or card
-        booster.append(card or fetch_random_card(setCode, "common"))
+        booster.append(ctx.fetch(build_query(setCode, "common"), card))
 
     # --- uncommons ---
-    for _ in range(config["uncommon_slots"]):
+    for _ in range(ctx["uncommon_slots"]):
         card = None
         for hook in hooks:
-            res = hook("uncommon", config)
+            res = hook("uncommon", ctx)
             card = res or card
-        booster.append(card or fetch_random_card(setCode, "uncommon"))
+        booster.append(ctx.fetch(build_query(setCode, "uncommon"), card))
 
     # --- rare/mythic slot ---
-    if config.get("rare_table"):
-        entry = pick_from_table(config["rare_table"])
-        base_card = _fetch_with_meta(entry["query"], entry.get("treatment"))
+    if ctx.get("rare_table"):
+        entry = pick_from_table(ctx["rare_table"], ctx.table_draws("rare_table"), rng)
+        base_card = _fetch_with_meta(entry["query"], entry.get("treatment"), rng=rng)
         booster.append(base_card)
 
-        # --- SNC extra rares hook ---
-        if setCode== "snc":
-            ctx = {"set_code": setCode, "rare_table": config["rare_table"]}
-            snc_extras_added = False
+        # --- extra rare slots (SNC), one card per call until the hook says none are left ---
+        for hook in hooks:
             while True:
-                extra = snc_extra_rares_hook("rare", ctx)
+                extra = hook("rare", ctx)
                 if not extra:
                     break
                 booster.append(extra)
-                snc_extras_added = True
-        # hooks can override if they intercept this slot
+        # hooks can add a card if they intercept this slot
+        card = None
         for hook in hooks:
-            override = hook("rare_slot", config)
+            override = hook("rare_slot", ctx)
             card = override or card
-        if card is not None and not snc_extras_added:
+        if card is not None:
             booster.append(card)
     else:
-        rareWeights = pick_weighted(config["rare_weights"])
+        rareWeights = pick_weighted(ctx["rare_weights"], rng)
         card = None
         for hook in hooks:
-            res = hook("rare_slot", config)
+            res = hook("rare_slot", ctx)
             card = res or card
-        booster.append(card or fetch_random_card(setCode, rareWeights))
+        booster.append(card or fetch_random_card(setCode, rareWeights, rng=rng))
 
     # --- wildcard slot ---
-    if config.get("wildcard_table"):
-        slots = config.get("wildcard_slots", 1)
+    if ctx.get("wildcard_table"):
+        slots = ctx.get("wildcard_slots", 1)
 
         for _ in range(slots):
-            entry = pick_from_table(config["wildcard_table"])
-            booster.append(_fetch_with_meta(entry["query"], entry.get("treatment")))
+            entry = pick_from_table(ctx["wildcard_table"], ctx.table_draws("wildcard_table"), rng)
+            booster.append(_fetch_with_meta(entry["query"], entry.get("treatment"), rng=rng))
     else:
-        wc = pick_weighted(config["wildcard_weights"])
+        wc = pick_weighted(ctx["wildcard_weights"], rng)
         card = None
         for hook in hooks:
-            res = hook("wildcard", config)
+            res = hook("wildcard", ctx)
             card = res or card
-        booster.append(card or fetch_random_card(setCode, wc))
+        booster.append(card or fetch_random_card(setCode, wc, rng=rng))
 
     # --- foil slot (table-aware, uses foil prices) ---
     foil = None
-    if config.get("foil_table"):
-        entry = pick_from_table(config["foil_table"])
-        foil = _fetch_with_meta(entry["query"], entry.get("treatment"), force_foil=True)
+    if ctx.get("foil_table"):
+        entry = pick_from_table(ctx["foil_table"], ctx.table_draws("foil_table"), rng)
+        foil = _fetch_with_meta(entry["query"], entry.get("treatment"), force_foil=True, rng=rng)
     else:
         # legacy: MH3 fetchland
-        if config.get("foil_fetchlands"):
-            if random.random() < config.get("foil_fetch_chance", 0.057):
-                for _ in range(8):
-                    cand = fetch_random_card(setCode, "rare", is_foil=True)
-                    if cand and cand.get("name") in config.get("fetchland_names", FETCHLAND_NAMES):
-                        foil = cand; break
+        if ctx.get("foil_fetchlands"):
+            if rng.random() < ctx.get("foil_fetch_chance", 0.057):
+                # ask for the fetchlands directly instead of rerolling foil rares until one shows up
+                foil = fetch_card_by_query(fetchland_query(setCode, ctx.get("fetchland_names", FETCHLAND_NAMES)), rng)
         if not foil:
-            foil_rarity = pick_weighted(config["foil_weights"])
-            foil = fetch_random_card(setCode, foil_rarity, is_foil=True)
+            foil_rarity = pick_weighted(ctx["foil_weights"], rng)
+            foil = fetch_random_card(setCode, foil_rarity, is_foil=True, rng=rng)
 
     # --- post-build hooks (OTP, CLB adds, etc.) ---
+    # they see every card opened so far, foil and bonus included (SNC showcase guarantee)
     for hook in hooks:
-        extra = hook("post", config)
+        ctx["_booster_cards"] = [c for c in booster + [foil, bonus_card] if c]
+        extra = hook("post", ctx)
         if extra:
             if isinstance(extra, list):
                 booster.extend([c for c in extra if c])
             elif isinstance(extra, dict):
                 booster.append(extra)
 
-    token_count = config.get("token_count", 1)
+    token_count = ctx.get("token_count", 1)
     return booster, foil, bonus_card, token_count
 
+def open_boosters(setCode: str, n: int, seed: Optional[int] = None, workers: int = 8,
+                  draws: Optional[List[Dict[str, List[int]]]] = None):
+    """
+    n packs opened concurrently. Pack i uses its own random.Random derived from (seed, i), so the
+    result is the same for a seed whatever the worker count or thread scheduling.
+    If draws is a list it receives one draws dict per pack.
+    """
+    base = seed if seed is not None else random.SystemRandom().getrandbits(64)
+    logs = [{} for _ in range(n)] if draws is not None else [None] * n
+
+    def one(i: int):
+        return open_booster(setCode, logs[i], random.Random(f"{base}/{i}"))
+
+    if workers <= 1:
+        packs = [one(i) for i in range(n)]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="open") as pool:
+            packs = list(pool.map(one, range(n)))
+    if draws is not None:
+        draws.extend(logs)
+    return packs
+
+class PackPipeline:
+    """
+    Opens packs ahead of the reader: iterate to get (set_code, pack) in schedule order while the
+    next `depth` packs are already being opened on background threads. A pack is only drawn once,
+    in schedule order, from its own rng, so the sequence is the same as opening them one by one.
+    """
+
+    def __init__(self, schedule: List[str], depth: int = 2, seed: Optional[int] = None,
+                 opener: Optional[Callable[..., Any]] = None):
+        self.schedule = list(schedule)
+        self.depth = max(1, depth)
+        # open_booster(set_code, draws, rng) or a drop-in like hedged.open_booster_within
+        self.opener = opener or open_booster
+        self._base = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix="pipeline")
+        self._pending: List[Any] = []
+        self._next = 0
+
+    def _submit_ahead(self):
+        while self._next < len(self.schedule) and len(self._pending) < self.depth:
+            i = self._next
+            code = self.schedule[i]
+            self._pending.append((code, self._executor.submit(self.opener, code, None, random.Random(f"{self._base}/{i}"))))
+            self._next += 1
+
+    def __iter__(self):
+        try:
+            self._submit_ahead()
+            while self._pending:
+                code, future = self._pending.pop(0)
+                pack = future.result()
+                # refill before handing the pack over: the next ones open while this one is shown
+                self._submit_ahead()
+                yield code, pack
+        finally:
+            self.close()
+
+    def close(self):
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        self._executor.shutdown(wait=False)
+
 # =========================
 # Tiny CLI
 # =========================
 
+# Sets without their own REGISTRY entry that can still be opened with the _default layout
+EXTRA_SET_CODES = {
+    "blb","mkm","lci","cmm","mom","one","bro","dmu","snc","neo","vow","mid","afr","stx","khm","znr","thb","fut",
+}
+
+def all_set_codes() -> set:
+    return set(k for k in REGISTRY.keys() if not k.startswith("_")) | EXTRA_SET_CODES
+
 def main():
     modes = {"1": "single", "2": "compare"}
     print("1. Open a single booster\n2. Compare two sets")
     mode = input("Enter 1 or 2: ").strip()
     suspense = input("Reveal one by one? (y/n): ").strip().lower() == "y"
-    
-    
-    MTGSets = set(k for k in REGISTRY.keys() if not k.startswith("_")) | {
-        "blb","mkm","lci","cmm","mom","one","bro","dmu","snc","neo","vow","mid","afr","stx","khm","znr","thb","fut",
-    }
+    online = input("Draw live from Scryfall? (y/n): ").strip().lower() == "y"
+
+    MTGSets = all_set_codes()
+
+    def use_source(set_codes):
+        """Local pool sampling, or live draws bounded per pack with the pools as fallback; returns the opener."""
+        if online:
+            from hedged import use_online_source, open_booster_within
+            use_online_source(set_codes)
+            return lambda code, draws=None, rng=None: open_booster_within(code, rng=rng, draws=draws)
+        from card_pools import use_pool_source
+        use_pool_source(set_codes)
+        return open_booster
 
     if modes.get(mode) == "compare":
         def ask(prompt, exclude=None): # leave exclude for whenever we want to compare different boosters
@@ -554,34 +806,22 @@ def main():
         rounds = int(input("How many boosters? (Rounds)").strip()) # investigate a way to while loop this u
         totals = {firstSet: 0.0, secondSet: 0.0}
 
-        for i in range(rounds): # rounds to make finals be 5v5 boosters
-            for set_code in (firstSet, secondSet):
-                print(f"\n--- {set_code.upper()} Booster #{i+1} ---")
-                booster, foil, bonus, token = open_booster(set_code)
-                display_booster(booster, foil, bonus, token, suspense)
-
-                #defines the function that finds the price
-                def value(i, foil=False):
-                    if not i: 
-                        return 0.0
-                    prices = i.get("prices", {})
-                    if foil:
-                        eur = "eur_foil"
-                    else:
-                        eur = "eur"
-                    finalValue = prices.get(eur) or prices.get("usd_foil" if foil else "usd")
-                    try: 
-                        return float(finalValue) if finalValue else 0.0
-                    except: 
-                        return 0.0
-
-                totalValueOfPack = sum(value(i) for i in booster) + value(foil, True) + value(bonus)
-                totals[set_code] += totalValueOfPack
-                input("Press Enter...")
+        # one /cards/search per distinct query, then every card is sampled locally (or is the fallback)
+        opener = use_source([firstSet, secondSet])
+
+        # the next packs of both sets are opened while the current one is revealed
+        schedule = [set_code for _ in range(rounds) for set_code in (firstSet, secondSet)] # rounds to make finals be 5v5 boosters
+        for n, (set_code, (booster, foil, bonus, token)) in enumerate(PackPipeline(schedule, depth=2, opener=opener)):
+            print(f"\n--- {set_code.upper()} Booster #{n // 2 + 1} ---")
+            display_booster(booster, foil, bonus, token, suspense)
+
+            totalValueOfPack = pack_value(booster, foil, bonus)
+            totals[set_code] += totalValueOfPack
+            input("Press Enter...")
 
         print("\n=== Results ===")
-        print(f"{firstSet.upper()}: {totals[firstSet]:.2f}€")
-        print(f"{secondSet.upper()}: {totals[secondSet]:.2f}€")
+        print(f"{firstSet.upper()}: {get_policy().format(totals[firstSet])}")
+        print(f"{secondSet.upper()}: {get_policy().format(totals[secondSet])}")
         if totals[firstSet] > totals[secondSet]:
             print("Winner: ", firstSet)
         elif totals[firstSet] < totals[secondSet]:
@@ -594,7 +834,8 @@ def main():
         if set_code not in MTGSets:
             print("Invalid set. Load code to Try again.")
             return
-        booster, foil, bonus, token = open_booster(set_code)
+        opener = use_source([set_code])
+        booster, foil, bonus, token = opener(set_code)
         display_booster(booster, foil, bonus, token, suspense)
 
 if __name__ == "__main__":
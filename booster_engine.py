@@ -0,0 +1,537 @@
+# booster_engine.py — batched pack opening over compiled plans + local card pools
+#
+# compile_set() binds a booster_plan to card pools (card_pools.load_pool) and turns everything
+# into numpy arrays; sample_packs() then opens any number of packs with one vectorized pass per
+# slot. Boxes and cases are just reshaped batches of packs.
+
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from booster_plan import compile_plan, plan_queries
+from card_pools import load_pool
+from price_store import PriceStore, get_store, reload_store, check_for_update
+from valuation import ValuationPolicy, get_policy
+
+RARITIES = ("common", "uncommon", "rare", "mythic", "special", "bonus")
+RARITY_CODE = {r: i for i, r in enumerate(RARITIES)}
+MYTHIC = RARITY_CODE["mythic"]
+
+# uniforms per slot: u0 gate/group, u1 entry, u2 card inside the pool
+DRAWS_PER_SLOT = 3
+
+# pool position of a distinct slot that took nothing from the shared pool
+TAKEN_NONE = np.iinfo(np.int64).max
+
+# packs per vectorized chunk when aggregating boxes/cases (bounds memory)
+CHUNK_PACKS = 100_000
+
+_compiled: Dict[str, Dict[str, Any]] = {}
+_compiled_lock = threading.Lock()
+
+def is_special(treatment: Optional[str]) -> bool:
+    return bool(treatment) and treatment.strip().lower() != "regular"
+
+# =========================
+# Compile
+# =========================
+
+def compile_set(set_code: str) -> Dict[str, Any]:
+    """Plan + pools as arrays. Cards are indexed once per set; pools are index ranges into one flat array."""
+    plan = compile_plan(set_code)
+    queries = plan_queries(plan)
+
+    cards: List[Dict[str, Any]] = []
+    index: Dict[str, int] = {}
+    flat: List[int] = []
+    pool_range: Dict[str, Tuple[int, int]] = {}
+    for query in queries:
+        start = len(flat)
+        for card in load_pool(query):
+            i = index.get(card["id"])
+            if i is None:
+                i = index[card["id"]] = len(cards)
+                cards.append(card)
+            flat.append(i)
+        pool_range[query] = (start, len(flat) - start)
+
+    treatments: List[Optional[str]] = [None]
+    slots: List[Dict[str, Any]] = []
+    labels = {slot["label"]: s for s, slot in enumerate(plan["slots"])}
+    for slot in plan["slots"]:
+        entries = [e for g in slot["groups"] for e in g["entries"]]
+        group_sizes = [len(g["entries"]) for g in slot["groups"]]
+        entry_treatment = []
+        for e in entries:
+            if e["treatment"] not in treatments:
+                treatments.append(e["treatment"])
+            entry_treatment.append(treatments.index(e["treatment"]))
+        gate = slot["gate"]
+        slots.append({
+            "label": slot["label"],
+            "kind": slot["kind"],
+            "foil": slot["foil"],
+            "entries": entries,
+            "group_cum": np.cumsum([g["p"] for g in slot["groups"]]),
+            "group_start": np.concatenate([[0], np.cumsum(group_sizes)[:-1]]).astype(np.intp),
+            # Python-float running sums, exactly what random.choices bisects into
+            "entry_cum": [np.cumsum([e["weight"] for e in g["entries"]]) for g in slot["groups"]],
+            "pool_offset": np.array([pool_range[e["query"]][0] for e in entries], dtype=np.int64),
+            "pool_size": np.array([pool_range[e["query"]][1] for e in entries], dtype=np.int64),
+            "entry_treatment": np.array(entry_treatment, dtype=np.int16),
+            "gate": None if gate is None else (labels[gate["slot"]], gate["below"], gate.get("inclusive", False)),
+            "skip_if": None if slot["skip_if"] is None else labels[slot["skip_if"]],
+            "unless_treatments": slot["unless_treatments"],
+            "distinct": slot.get("distinct", False),
+            # how open_booster spends its random() calls on the slot (seed_search replays them)
+            "rolls": slot.get("rolls", 0),
+            "group_pick": [g.get("pick", True) for g in slot["groups"]],
+        })
+
+    rarity = np.array([RARITY_CODE.get(c.get("rarity"), len(RARITIES)) for c in cards], dtype=np.uint8)
+    price_rows, price, price_foil = _price_columns(cards)
+    return {
+        "set_code": plan["set_code"],
+        "plan": plan,
+        "slots": slots,
+        "cards": cards,
+        "index": index,
+        "pool_flat": np.array(flat, dtype=np.uint32),
+        "price_rows": price_rows,
+        "price": price,
+        "price_foil": price_foil,
+        "rarity": rarity,
+        "treatments": treatments,
+        "special": np.array([is_special(t) for t in treatments], dtype=bool),
+        "slot_foil": np.array([s["foil"] for s in slots], dtype=bool),
+        # sets the cards come from (a FIN pack also holds FCA cards) → which price versions matter
+        "card_sets": sorted({c.get("set") or "" for c in cards}),
+        # derived results (pull rates, EV...) live and die with this compiled set
+        "cache": {},
+        "price_version": store_version(),
+        "price_policy": get_policy().key,
+    }
+
+def store_version() -> int:
+    store = get_store()
+    return store.version if store is not None else 0
+
+def reprice(compiled: Dict[str, Any]) -> Dict[str, Any]:
+    """Refresh the price columns from the current store (pools and pull rates stay valid)."""
+    compiled["price_rows"], compiled["price"], compiled["price_foil"] = _price_columns(compiled["cards"])
+    compiled["price_version"] = store_version()
+    compiled["price_policy"] = get_policy().key
+    for key in [k for k in compiled["cache"] if k == "ev" or (isinstance(k, tuple) and k[0] == "prices")]:
+        del compiled["cache"][key]
+    return compiled
+
+def _price_columns(cards: List[Dict[str, Any]]):
+    """Store rows + per-card values under the current policy; unseen cards use their pool prices."""
+    store = get_store()
+    if store is None:
+        rows = np.full(len(cards), -1, dtype=np.int64)
+    else:
+        rows = store.rows_for(c["id"] for c in cards)
+    price, price_foil = get_policy().vectors(cards, store, rows)
+    return rows, price, price_foil
+
+def price_vector(compiled: Dict[str, Any], policy: Optional[ValuationPolicy] = None) -> np.ndarray:
+    """
+    [regular prices | foil prices | 0] for the compiled set's cards: card c in a regular slot is
+    entry c, in a foil slot entry n + c, an absent slot the trailing 0. Cached per policy.
+    """
+    policy = policy or get_policy()
+    key = ("prices", policy.key)
+    hit = compiled["cache"].get(key)
+    if hit is None:
+        if policy.key == compiled.get("price_policy"):
+            regular, foil = compiled["price"], compiled["price_foil"]
+        else:
+            regular, foil = policy.vectors(compiled["cards"], get_store(), compiled["price_rows"])
+        hit = compiled["cache"][key] = np.concatenate([regular, foil, [0.0]]).astype(np.float32)
+    return hit
+
+def store_prices(set_codes: Sequence[str], path: Optional[str] = None) -> PriceStore:
+    """Write the prices of every card in the sets' pools to the shared price store."""
+    store = PriceStore(path, writable=True) if path else PriceStore(writable=True)
+    for code in set_codes:
+        store.ingest(compile_set(code)["cards"])
+    store.save()
+    reload_store()
+    invalidate()
+    return store
+
+def get_compiled(set_code: str) -> Dict[str, Any]:
+    set_code = set_code.lower()
+    with _compiled_lock:
+        hit = _compiled.get(set_code)
+    if hit is not None and hit.get("price_policy") != get_policy().key:
+        # valuation policy changed since: same pools and plan, new price columns
+        fresh = reprice(dict(hit, cache={k: v for k, v in hit["cache"].items() if k == "pull_rates"}))
+        with _compiled_lock:
+            _compiled[set_code] = fresh
+        hit = fresh
+    if hit is None:
+        import warm_start
+        hit = warm_start.load_compiled(set_code)
+        if hit is None:
+            hit = compile_set(set_code)
+            warm_start.save_compiled(hit)
+        with _compiled_lock:
+            hit = _compiled.setdefault(set_code, hit)
+        # art for every card the set's packs can show, in the background (image_cache.set_warm_on_load)
+        from image_cache import warm_loaded
+        warm_loaded(hit["cards"], key=set_code)
+    return hit
+
+def invalidate(set_code: Optional[str] = None):
+    with _compiled_lock:
+        if set_code is None:
+            _compiled.clear()
+        else:
+            _compiled.pop(set_code.lower(), None)
+
+def invalidate_card_sets(card_sets) -> List[str]:
+    """Drops compiled sets containing cards from any of card_sets; returns the dropped codes."""
+    card_sets = set(card_sets)
+    with _compiled_lock:
+        stale = [code for code, c in _compiled.items() if card_sets & set(c["card_sets"])]
+        for code in stale:
+            del _compiled[code]
+    return stale
+
+def reload_sets() -> List[str]:
+    """
+    Picks up edited set files (booster_registry.REGISTRY.refresh) and returns the changed codes.
+    Compiled sets among them are rebuilt aside and swapped in one at a time, so callers holding the
+    old compiled dict keep sampling from it and never see a half-built one.
+    """
+    from booster_registry import REGISTRY, DEFAULT_CODE
+    import warm_start
+
+    changed = REGISTRY.refresh()
+    with _compiled_lock:
+        # sets without a file of their own are pure _default
+        stale = [code for code in _compiled
+                 if code in changed or (DEFAULT_CODE in changed and code not in REGISTRY)]
+    for code in stale:
+        try:
+            fresh = compile_set(code)
+        except Exception as err:
+            print(f"[engine] keeping the old {code} plan: {err!r}")
+            continue
+        warm_start.save_compiled(fresh)
+        with _compiled_lock:
+            _compiled[code] = fresh
+    return changed
+
+def sync_prices() -> List[str]:
+    """Picks up a newer price store and recompiles (lazily) only the sets whose prices moved."""
+    changed = check_for_update()
+    return invalidate_card_sets(changed) if changed else []
+
+# =========================
+# Batched sampling
+# =========================
+
+def draw_uniforms(compiled: Dict[str, Any], n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.random((n, len(compiled["slots"]), DRAWS_PER_SLOT))
+
+def _pick_distinct(u: np.ndarray, size: np.ndarray, taken: List[np.ndarray]) -> np.ndarray:
+    """
+    Sequential sampling without replacement, vectorised over packs: floor(u * cards left), then
+    stepped over the pool positions earlier slots took, in ascending order (booster.fetch_distinct
+    does the same for one pack). taken holds those positions as per-pack ascending columns
+    (_take), TAKEN_NONE where a slot took none.
+    """
+    left = size.copy()
+    for column in taken:
+        left -= column < size
+    pick = np.floor(u * left).astype(np.int64)
+    for column in taken:
+        pick += pick >= column
+    # a pool smaller than the slots it fills repeats cards
+    return np.where(left > 0, pick, np.floor(u * size).astype(np.int64))
+
+def _take(taken: List[np.ndarray], position: np.ndarray):
+    """Insert position into the ascending columns of taken (a repeat counts once)."""
+    for column in taken:
+        position[column == position] = TAKEN_NONE
+    # one pass of an insertion network keeps every pack's columns sorted without np.sort
+    for j, column in enumerate(taken):
+        taken[j], position = np.minimum(column, position), np.maximum(column, position)
+    taken.append(position)
+
+def _base_positions(compiled: Dict[str, Any], slot: Dict[str, Any], base: int) -> np.ndarray:
+    """card index → position in the slot's base pool (TAKEN_NONE when not in it), cached."""
+    offset, size = int(slot["pool_offset"][base]), int(slot["pool_size"][base])
+    key = ("base_positions", offset, size)
+    lookup = compiled["cache"].get(key)
+    if lookup is None:
+        lookup = np.full(len(compiled["cards"]), TAKEN_NONE, dtype=np.int64)
+        lookup[compiled["pool_flat"][offset:offset + size][::-1]] = np.arange(size)[::-1]
+        compiled["cache"][key] = lookup
+    return lookup
+
+def sample_packs(compiled: Dict[str, Any], n: Optional[int] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 uniforms: Optional[np.ndarray] = None,
+                 cut_slots: Optional[Dict[int, Tuple[int, np.ndarray]]] = None) -> Dict[str, np.ndarray]:
+    """
+    Opens n packs at once. Returns per (pack, slot):
+      entry — index into slot["entries"] (-1 if the slot is absent)
+      card  — index into compiled["cards"] (-1 if absent or the pool is empty)
+    cut_slots (collation.sample_collated) maps slot → (run key, (n, k) cards cut from a sheet):
+    base draws of those slots take the run's next card instead of a pool draw.
+    """
+    if uniforms is None:
+        uniforms = draw_uniforms(compiled, n, rng)
+    n = uniforms.shape[0]
+    S = len(compiled["slots"])
+    entry = np.full((n, S), -1, dtype=np.int16)
+    card = np.full((n, S), -1, dtype=np.int32)
+    treat = np.zeros((n, S), dtype=np.int16)
+    treatments = compiled["treatments"]
+    pool_flat = compiled["pool_flat"]
+    taken: Dict[int, List[np.ndarray]] = {}  # base pool offset → positions distinct slots took
+    used: Dict[int, np.ndarray] = {}         # run key → run cards handed out so far, per pack
+    rows_n = np.arange(n)
+
+    for s, slot in enumerate(compiled["slots"]):
+        u = uniforms[:, s, :]
+        present = np.ones(n, dtype=bool)
+        if slot["gate"] is not None:
+            src, below, inclusive = slot["gate"]
+            gate_u = uniforms[:, src, 0]
+            present &= (gate_u <= below) if inclusive else (gate_u < below)
+        if slot["skip_if"] is not None:
+            present &= card[:, slot["skip_if"]] < 0
+        if slot["unless_treatments"]:
+            codes = [i for i, t in enumerate(treatments) if t and t.lower() in slot["unless_treatments"]]
+            if codes and s:
+                have = np.isin(treat[:, :s], codes) & (card[:, :s] >= 0)
+                present &= ~have.any(axis=1)
+
+        # group by u0 (hook thresholds), then entry by u1 inside the group
+        group_cum = slot["group_cum"]
+        if len(group_cum) > 1:
+            g = np.minimum(np.searchsorted(group_cum, u[:, 0], side="right"), len(group_cum) - 1)
+        else:
+            g = np.zeros(n, dtype=np.intp)
+        e = np.empty(n, dtype=np.intp)
+        for gi, cum in enumerate(slot["entry_cum"]):
+            rows = g == gi
+            if not rows.any():
+                continue
+            k = np.searchsorted(cum, u[rows, 1] * cum[-1], side="right")
+            e[rows] = slot["group_start"][gi] + np.minimum(k, len(cum) - 1)
+
+        size = slot["pool_size"][e]
+        has_card = present & (size > 0)
+        base = slot["group_start"][-1]
+        entry[:, s] = np.where(present, e, -1)
+        treat[:, s] = np.where(present, slot["entry_treatment"][e], 0)
+        if cut_slots and s in cut_slots:
+            # the run's next card for base draws; only hook rows are drawn from their pools
+            key, run_cards = cut_slots[s]
+            at = used.setdefault(key, np.zeros(n, dtype=np.intp))
+            from_run = has_card & (e == base)
+            shown = np.where(from_run, run_cards[rows_n, np.minimum(at, run_cards.shape[1] - 1)], -1)
+            other = np.flatnonzero(has_card & ~from_run)
+            if other.size:
+                k = np.minimum(np.floor(u[other, 2] * size[other]).astype(np.int64), size[other] - 1)
+                shown[other] = pool_flat[slot["pool_offset"][e[other]] + k]
+            at += from_run
+            card[:, s] = shown
+            continue
+        pick = np.floor(u[:, 2] * size).astype(np.int64)
+        if slot.get("distinct"):
+            # base draws skip what the pack took from the base pool; hook entries draw as before
+            prior = taken.setdefault(int(slot["pool_offset"][base]), [])
+            if prior:
+                pick = np.where(has_card & (e == base), _pick_distinct(u[:, 2], size, prior), pick)
+        idx = np.where(has_card, slot["pool_offset"][e] + np.minimum(pick, np.maximum(size - 1, 0)), 0)
+
+        card[:, s] = np.where(has_card, pool_flat[idx].astype(np.int32), -1)
+        if slot.get("distinct"):
+            # only base draws are taken (at their base pool position); hook cards stay independent
+            from_base = has_card & (e == base)
+            _take(prior, np.where(from_base, _base_positions(compiled, slot, base)[card[:, s]], TAKEN_NONE))
+
+    return {"entry": entry, "card": card, "treatment": treat}
+
+def slot_values(compiled: Dict[str, Any], draws: Dict[str, np.ndarray],
+                policy: Optional[ValuationPolicy] = None) -> np.ndarray:
+    """Value of every (pack, slot) under policy (default: the current one); one gather."""
+    card = draws["card"]
+    n = len(compiled["cards"])
+    idx = np.where(card >= 0, card + compiled["slot_foil"][None, :] * n, 2 * n)
+    return price_vector(compiled, policy)[idx]
+
+def pack_values(compiled: Dict[str, Any], draws: Dict[str, np.ndarray],
+                policy: Optional[ValuationPolicy] = None) -> np.ndarray:
+    return slot_values(compiled, draws, policy).sum(axis=1, dtype=np.float64)
+
+def materialize(compiled: Dict[str, Any], draws: Dict[str, np.ndarray], row: int):
+    """One sampled pack in open_booster's (booster, foil, bonus, token_count) shape."""
+    booster: List[Dict[str, Any]] = []
+    foil = bonus = None
+    for s, slot in enumerate(compiled["slots"]):
+        c = int(draws["card"][row, s])
+        if c < 0:
+            continue
+        card = dict(compiled["cards"][c])
+        treatment = slot["entries"][int(draws["entry"][row, s])]["treatment"]
+        if treatment:
+            card["x_treatment"] = treatment
+        if slot["kind"] == "foil":
+            foil = card
+        elif slot["kind"] == "bonus":
+            bonus = card
+        else:
+            booster.append(card)
+    return booster, foil, bonus, compiled["plan"]["token_count"]
+
+# =========================
+# Boxes and cases
+# =========================
+
+def _duplicates(cards: np.ndarray) -> np.ndarray:
+    # cards: (groups, k) with -1 for empty; duplicates = cards - distinct cards, per row
+    s = np.sort(cards, axis=1)
+    valid = s >= 0
+    repeat = (s[:, 1:] == s[:, :-1]) & valid[:, 1:]
+    return repeat.sum(axis=1)
+
+def _box_stats(compiled: Dict[str, Any], draws: Dict[str, np.ndarray], boxes: int, packs_per_box: int) -> Dict[str, np.ndarray]:
+    card = draws["card"]
+    S = card.shape[1]
+    values = pack_values(compiled, draws).reshape(boxes, packs_per_box)
+    box_cards = card.reshape(boxes, packs_per_box * S)
+    mythic = (compiled["rarity"][np.maximum(box_cards, 0)] == MYTHIC) & (box_cards >= 0)
+    special = compiled["special"][draws["treatment"]] & (card >= 0)
+    return {
+        "value": values.sum(axis=1),
+        "best_pack": values.max(axis=1),
+        "duplicates": _duplicates(box_cards),
+        "mythics": mythic.sum(axis=1),
+        "specials": special.reshape(boxes, packs_per_box * S).sum(axis=1),
+    }
+
+def _summary(values: np.ndarray) -> Dict[str, float]:
+    q = np.quantile(values, [0.05, 0.25, 0.5, 0.75, 0.95])
+    return {"mean": float(values.mean()), "std": float(values.std()),
+            "p05": float(q[0]), "p25": float(q[1]), "median": float(q[2]), "p75": float(q[3]), "p95": float(q[4])}
+
+def open_box(set_code: str, packs_per_box: Optional[int] = None,
+             rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """One box: its packs plus value / duplicates / mythic and special counts."""
+    compiled = get_compiled(set_code)
+    packs_per_box = packs_per_box or compiled["plan"]["packs_per_box"]
+    draws = sample_packs(compiled, packs_per_box, rng)
+    stats = _box_stats(compiled, draws, 1, packs_per_box)
+    return {
+        "set_code": compiled["set_code"],
+        "packs": [materialize(compiled, draws, i) for i in range(packs_per_box)],
+        "pack_values": pack_values(compiled, draws).tolist(),
+        **{k: v[0].item() for k, v in stats.items()},
+    }
+
+def simulate_boxes(set_code: str, boxes: int, packs_per_box: Optional[int] = None,
+                   rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """Box value distribution, mean duplicates and P(at least one mythic / special treatment)."""
+    compiled = get_compiled(set_code)
+    packs_per_box = packs_per_box or compiled["plan"]["packs_per_box"]
+    rng = rng if rng is not None else np.random.default_rng()
+    per_chunk = max(1, CHUNK_PACKS // packs_per_box)
+
+    parts: List[Dict[str, np.ndarray]] = []
+    done = 0
+    while done < boxes:
+        b = min(per_chunk, boxes - done)
+        draws = sample_packs(compiled, b * packs_per_box, rng)
+        parts.append(_box_stats(compiled, draws, b, packs_per_box))
+        done += b
+    stats = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    return {
+        "set_code": compiled["set_code"],
+        "boxes": boxes,
+        "packs_per_box": packs_per_box,
+        "value": _summary(stats["value"]),
+        "duplicates": float(stats["duplicates"].mean()),
+        "p_mythic": float((stats["mythics"] > 0).mean()),
+        "p_special": float((stats["specials"] > 0).mean()),
+        "mythics": float(stats["mythics"].mean()),
+        "specials": float(stats["specials"].mean()),
+    }
+
+def _case_stats(compiled: Dict[str, Any], draws: Dict[str, np.ndarray], cases: int,
+                boxes_per_case: int, packs_per_box: int) -> Dict[str, np.ndarray]:
+    box = _box_stats(compiled, draws, cases * boxes_per_case, packs_per_box)
+    per_case = lambda a: a.reshape(cases, boxes_per_case)
+    return {
+        "value": per_case(box["value"]).sum(axis=1),
+        "duplicates": _duplicates(draws["card"].reshape(cases, -1)),
+        "boxes_with_mythic": (per_case(box["mythics"]) > 0).sum(axis=1),
+        "boxes_with_special": (per_case(box["specials"]) > 0).sum(axis=1),
+        "box_value": box["value"],
+    }
+
+def open_case(set_code: str, boxes_per_case: Optional[int] = None, packs_per_box: Optional[int] = None,
+              rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    compiled = get_compiled(set_code)
+    boxes_per_case = boxes_per_case or compiled["plan"]["boxes_per_case"]
+    packs_per_box = packs_per_box or compiled["plan"]["packs_per_box"]
+    draws = sample_packs(compiled, boxes_per_case * packs_per_box, rng)
+    stats = _case_stats(compiled, draws, 1, boxes_per_case, packs_per_box)
+    return {
+        "set_code": compiled["set_code"],
+        "box_values": stats["box_value"].tolist(),
+        "value": float(stats["value"][0]),
+        "duplicates": int(stats["duplicates"][0]),
+        "boxes_with_mythic": int(stats["boxes_with_mythic"][0]),
+        "boxes_with_special": int(stats["boxes_with_special"][0]),
+    }
+
+def simulate_cases(set_code: str, cases: int, boxes_per_case: Optional[int] = None,
+                   packs_per_box: Optional[int] = None,
+                   rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    compiled = get_compiled(set_code)
+    boxes_per_case = boxes_per_case or compiled["plan"]["boxes_per_case"]
+    packs_per_box = packs_per_box or compiled["plan"]["packs_per_box"]
+    rng = rng if rng is not None else np.random.default_rng()
+    packs_per_case = boxes_per_case * packs_per_box
+    per_chunk = max(1, CHUNK_PACKS // packs_per_case)
+
+    parts: List[Dict[str, np.ndarray]] = []
+    done = 0
+    while done < cases:
+        c = min(per_chunk, cases - done)
+        draws = sample_packs(compiled, c * packs_per_case, rng)
+        parts.append(_case_stats(compiled, draws, c, boxes_per_case, packs_per_box))
+        done += c
+    stats = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    return {
+        "set_code": compiled["set_code"],
+        "cases": cases,
+        "boxes_per_case": boxes_per_case,
+        "packs_per_box": packs_per_box,
+        "value": _summary(stats["value"]),
+        "box_value": _summary(stats["box_value"]),
+        "duplicates": float(stats["duplicates"].mean()),
+        "p_box_mythic": float(stats["boxes_with_mythic"].mean() / boxes_per_case),
+        "p_box_special": float(stats["boxes_with_special"].mean() / boxes_per_case),
+        "p_every_box_special": float((stats["boxes_with_special"] == boxes_per_case).mean()),
+    }
+
+if __name__ == "__main__":
+    import sys, time
+    code = sys.argv[1] if len(sys.argv) > 1 else "fin"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    t = time.perf_counter()
+    print(simulate_cases(code, n))
+    print(f"{n} cases in {time.perf_counter() - t:.2f}s")
@@ -0,0 +1,288 @@
+# booster_plan.py — compile a REGISTRY entry (+ hooks) into a flat list of slots
+#
+# open_booster walks the config and calls hooks card by card. The batched engines need the same
+# distribution as data instead, so every slot is described as:
+#
+#   slot = {
+#     "label":  unique name ("common#0", "rare", "post:clb_specials:legendary_background", ...),
+#     "kind":   common | uncommon | rare | rare_extra | wildcard | foil | bonus | post,
+#     "foil":   valued with foil prices,
+#     "groups": [{"p": prob, "entries": [entry, ...], "pick": bool}, ...]   u0 picks the group, u1 the entry
+#               (pick False: a single entry open_booster takes without a random call),
+#     "rolls":  random() calls open_booster spends testing the slot's hooks (0 or 1),
+#     "gate":   None or {"slot": label, "below": p, "inclusive": bool}   present iff u0(slot) < p,
+#     "skip_if": None or label     absent when that slot produced a card (bonus replacing a common),
+#     "unless_treatments": None or [treatment, ...]   absent when the pack already has one of them,
+#     "distinct": base-group draws exclude cards earlier slots took from the same pool,
+#   }
+#   entry = {"query", "treatment", "weight", "table", "index", "rarity"}
+#
+# u2 then picks the card inside the entry's pool. Group/entry picks are inverse-CDF in the same
+# order open_booster's hooks test their thresholds, so a slot consumes its randomness the same way.
+
+from typing import Dict, Any, List, Optional, Callable
+
+from booster_registry import REGISTRY, FETCHLAND_NAMES
+from booster import build_query, bonus_sheet_query, fetchland_query
+
+# =========================
+# Small builders
+# =========================
+
+def make_entry(query: str, treatment: Optional[str] = None, weight: float = 1.0,
+               table: Optional[str] = None, index: Optional[int] = None,
+               rarity: Optional[str] = None) -> Dict[str, Any]:
+    return {"query": " ".join(query.split()), "treatment": treatment, "weight": float(weight),
+            "table": table, "index": index, "rarity": rarity}
+
+def make_slot(label: str, kind: str, groups: List[Dict[str, Any]], foil: bool = False,
+              gate: Optional[Dict[str, Any]] = None, skip_if: Optional[str] = None,
+              unless_treatments: Optional[List[str]] = None, distinct: bool = False,
+              rolls: int = 0) -> Dict[str, Any]:
+    return {"label": label, "kind": kind, "foil": foil, "groups": groups, "gate": gate,
+            "skip_if": skip_if, "unless_treatments": unless_treatments, "distinct": distinct,
+            "rolls": rolls}
+
+def table_entries(table: List[Dict[str, Any]], table_name: str) -> List[Dict[str, Any]]:
+    return [
+        make_entry(build_query(raw_query=e["query"]), e.get("treatment"), e.get("weight", 1.0),
+                   table=table_name, index=i)
+        for i, e in enumerate(table)
+    ]
+
+def rarity_entries(set_code: str, weights: Dict[str, float], is_foil: bool = False) -> List[Dict[str, Any]]:
+    return [make_entry(build_query(set_code, r, is_foil=is_foil), None, w, rarity=r) for r, w in weights.items()]
+
+def hook_groups(base: List[Dict[str, Any]], hooked: List[Dict[str, Any]], pick: bool = True) -> List[Dict[str, Any]]:
+    # hook groups are tested first (r < p1, r < p1 + p2, ...); whatever is left is the base slot
+    hooked = [g for g in hooked if g["p"] > 0 and g["entries"]]
+    rest = 1.0 - sum(g["p"] for g in hooked)
+    return hooked + [{"p": max(0.0, rest), "entries": base, "pick": pick}]
+
+# =========================
+# Hook compilers (same names as booster.HOOKS)
+# =========================
+# Signature mirrors the runtime hooks: (slot_name, config, params).
+#  - "common"/"uncommon" → list of groups that replace the base card
+#  - "rare"             → list of extra slots
+#  - "post"             → list of added slots
+
+def _dsk_lurking(slot_name: str, config: dict, params: Optional[dict]):
+    if config.get("set_code") != "dsk":
+        return None
+    lurking_evil = params or config.get("lurking_evil") or {}
+    collector_num = lurking_evil.get("cn") or {}
+
+    def cn_group(p: float, rarity: str, numbers: List[str]):
+        return {"p": p, "entries": [make_entry(build_query("dsk", rarity, collector_number=n)) for n in numbers if n]}
+
+    if slot_name == "common":
+        return [cn_group(lurking_evil.get("common_chance", 0.0), "common", collector_num.get("common", []))]
+    if slot_name == "uncommon":
+        return [
+            cn_group(lurking_evil.get("uncommon_le_chance", 0.0), "uncommon", collector_num.get("uncommon", [])),
+            cn_group(lurking_evil.get("uncommon_pf_chance", 0.0), "uncommon", lurking_evil.get("pf_uncommon_numbers", [])),
+        ]
+    return None
+
+def _otj_breaking_news(slot_name: str, config: dict, params: Optional[dict]):
+    if config.get("set_code") != "otj" or slot_name != "post":
+        return None
+    p = params or {}
+    odds = p.get("otp_odds", {"uncommon": 0.667, "rare": 0.285, "mythic": 0.048})
+    sheet = p.get("otp_sheet_code", "otp")
+    entries = [make_entry(build_query(set_override=sheet, rarity=r), None, w, rarity=r) for r, w in odds.items()]
+    return [make_slot("post:otj_breaking_news", "post", [{"p": 1.0, "entries": entries}])]
+
+def _clb_specials(slot_name: str, config: dict, params: Optional[dict]):
+    if config.get("set_code") != "clb" or slot_name != "post":
+        return None
+    p = params or {}
+    slots = []
+    for key in ("foil_etched_legendary_bg", "legendary_creature_pw", "legendary_background"):
+        item = p.get(key)
+        if not item or not item.get("enabled", True):
+            continue
+        sheet = item.get("sheet_code") or "clb"
+        entries = [make_entry(build_query(set_override=sheet, rarity=r), None, w, rarity=r)
+                   for r, w in item.get("rarities", {"rare": 1.0}).items()]
+        label = f"post:clb_specials:{key}"
+        # the runtime hook tests random() <= frequency
+        gate = {"slot": label, "below": item.get("frequency", 0.0), "inclusive": True}
+        slots.append(make_slot(label, "post", [{"p": 1.0, "entries": entries}], gate=gate))
+    return slots
+
+def _fin_uncommon_specials(slot_name: str, config: dict, params: Optional[dict]):
+    if config.get("set_code") != "fin" or slot_name != "uncommon":
+        return None
+    chance = (params or {}).get("chance", 0.003)
+    entries = [
+        make_entry(build_query(raw_query="set:fin cn>=323 cn<=373 r:uncommon"), "borderless woodblock"),
+        make_entry(build_query(raw_query="set:fin cn>=374 cn<=405 r:uncommon"), "borderless character"),
+    ]
+    return [{"p": chance, "entries": entries}]
+
+# cumulative thresholds the runtime hook compares one random() against (4, 3, 2 rares)
+SNC_EXTRA_RARE_THRESHOLDS = (0.305, 0.035, 0.005)
+
+def _snc_extra_rares(slot_name: str, config: dict, params: Optional[dict]):
+    if config.get("set_code") != "snc" or slot_name != "rare":
+        return None
+    rare_table = config.get("rare_table") or REGISTRY.get("snc", {}).get("rare_table")
+    if not rare_table:
+        return None
+    entries = table_entries(rare_table, "rare_table")
+    return [
+        make_slot(f"rare_extra#{k}", "rare_extra", [{"p": 1.0, "entries": entries}],
+                  gate={"slot": "rare", "below": threshold, "inclusive": False})
+        for k, threshold in enumerate(SNC_EXTRA_RARE_THRESHOLDS)
+    ]
+
+SNC_SHOWCASE_TREATMENTS = ["golden age showcase", "skyscraper land showcase", "art deco showcase"]
+
+def _snc_showcase_guarantee(slot_name: str, config: dict, params: Optional[dict]):
+    if config.get("set_code") != "snc" or slot_name != "post":
+        return None
+    entries = [
+        make_entry(build_query(raw_query="set:snc cn>=296 cn<=340"), "Golden Age Showcase", 0.9),
+        make_entry(build_query(raw_query="set:snc cn>=350 cn<=359"), "Skyscraper Land Showcase", 0.1),
+    ]
+    return [make_slot("post:snc_showcase_guarantee", "post", [{"p": 1.0, "entries": entries}],
+                      unless_treatments=SNC_SHOWCASE_TREATMENTS)]
+
+HOOK_COMPILERS: Dict[str, Callable[[str, dict, Optional[dict]], Any]] = {
+    "dsk_lurking": _dsk_lurking,
+    "otj_breaking_news": _otj_breaking_news,
+    "clb_specials": _clb_specials,
+    "fin_uncommon_specials": _fin_uncommon_specials,
+    "snc_extra_rares": _snc_extra_rares,
+    "snc_showcase_guarantee": _snc_showcase_guarantee,
+}
+
+def _resolve_hook_compilers(config: dict):
+    resolved = []
+    for hook in config.get("hooks", []):
+        if isinstance(hook, str):
+            name, params = hook, None
+        elif isinstance(hook, dict):
+            name, params = hook.get("name"), hook.get("params", {})
+        else:
+            continue
+        fn = HOOK_COMPILERS.get(name)
+        if fn:
+            resolved.append(lambda slot, cfg, _fn=fn, _p=params: _fn(slot, cfg, _p))
+    return resolved
+
+# =========================
+# Compiler
+# =========================
+
+def set_config(set_code: str) -> Dict[str, Any]:
+    set_code = set_code.lower()
+    config = REGISTRY.get(set_code, REGISTRY["_default"]).copy()
+    config["set_code"] = set_code
+    return config
+
+def compile_plan(set_code: str) -> Dict[str, Any]:
+    """Slot-by-slot description of one pack, in the order open_booster draws it."""
+    config = set_config(set_code)
+    set_code = config["set_code"]
+    hooks = _resolve_hook_compilers(config)
+    slots: List[Dict[str, Any]] = []
+
+    def hooked(slot_name: str) -> List[Any]:
+        out: List[Any] = []
+        for hook in hooks:
+            res = hook(slot_name, config)
+            if res:
+                out.extend(res)
+        return out
+
+    # --- bonus sheet (added when chance >= 1, otherwise replaces the first common) ---
+    replaces_common = False
+    chance = config.get("bonus_chance", 0) or 0
+    if chance > 0 and config.get("bonus_sheet_code"):
+        weights = config.get("bonus_sheet_weights") or {None: 1.0}
+        entries = [make_entry(bonus_sheet_query(config, rarity), None, w, rarity=rarity)
+                   for rarity, w in weights.items()]
+        gate = None if chance >= 1.0 else {"slot": "bonus", "below": chance, "inclusive": False}
+        groups = [{"p": 1.0, "entries": entries, "pick": bool(config.get("bonus_sheet_weights"))}]
+        slots.append(make_slot("bonus", "bonus", groups, gate=gate))
+        replaces_common = chance < 1.0
+
+    # --- commons / uncommons ---
+    for kind, count in (("common", config["common_slots"]), ("uncommon", config["uncommon_slots"])):
+        base = [make_entry(build_query(set_code, kind), rarity=kind)]
+        replaced = hooked(kind)
+        groups = hook_groups(base, replaced, pick=False)
+        for i in range(max(0, count)):
+            skip_if = "bonus" if (kind == "common" and i == 0 and replaces_common) else None
+            slots.append(make_slot(f"{kind}#{i}", kind, groups, skip_if=skip_if,
+                                   distinct=bool(config.get("distinct_slots")), rolls=int(bool(replaced))))
+
+    # --- rare/mythic ---
+    if config.get("rare_table"):
+        rare = table_entries(config["rare_table"], "rare_table")
+    else:
+        rare = rarity_entries(set_code, config["rare_weights"])
+    slots.append(make_slot("rare", "rare", [{"p": 1.0, "entries": rare}]))
+    slots.extend(hooked("rare"))
+
+    # --- wildcard(s) ---
+    if config.get("wildcard_table"):
+        wild = table_entries(config["wildcard_table"], "wildcard_table")
+        for i in range(config.get("wildcard_slots", 1)):
+            slots.append(make_slot(f"wildcard#{i}", "wildcard", [{"p": 1.0, "entries": wild}]))
+    else:
+        wild = rarity_entries(set_code, config["wildcard_weights"])
+        slots.append(make_slot("wildcard#0", "wildcard", [{"p": 1.0, "entries": wild}]))
+
+    # --- foil ---
+    rolls = 0
+    if config.get("foil_table"):
+        groups = [{"p": 1.0, "entries": table_entries(config["foil_table"], "foil_table")}]
+    else:
+        base = rarity_entries(set_code, config["foil_weights"], is_foil=True)
+        groups = [{"p": 1.0, "entries": base}]
+        if config.get("foil_fetchlands"):
+            fetch = make_entry(fetchland_query(set_code, config.get("fetchland_names", FETCHLAND_NAMES)),
+                               None, rarity="rare")
+            groups = hook_groups(base, [{"p": config.get("foil_fetch_chance", 0.057), "entries": [fetch],
+                                         "pick": False}])
+            rolls = 1
+    slots.append(make_slot("foil", "foil", groups, foil=True, rolls=rolls))
+
+    # --- post-build additions ---
+    slots.extend(hooked("post"))
+
+    return {
+        "set_code": set_code,
+        "slots": slots,
+        "token_count": config.get("token_count", 1),
+        "packs_per_box": config.get("packs_per_box", 36),
+        "boxes_per_case": config.get("boxes_per_case", 6),
+        "msrp": config.get("msrp", 5.0),
+    }
+
+def plan_queries(plan: Dict[str, Any]) -> List[str]:
+    """Distinct pool queries a plan draws from, in first-use order."""
+    seen: Dict[str, None] = {}
+    for slot in plan["slots"]:
+        for group in slot["groups"]:
+            for entry in group["entries"]:
+                seen.setdefault(entry["query"], None)
+    return list(seen)
+
+def empty_pools(set_code: str) -> List[tuple]:
+    """(slot label, query) of every reachable entry whose pool has no cards (loads the pools)."""
+    from card_pools import load_pool
+
+    out = []
+    for slot in compile_plan(set_code)["slots"]:
+        for group in slot["groups"]:
+            if group["p"] <= 0:
+                continue
+            for entry in group["entries"]:
+                if entry["weight"] > 0 and not load_pool(entry["query"]):
+                    out.append((slot["label"], entry["query"]))
+    return out
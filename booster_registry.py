@@ -1,4 +1,23 @@
-from typing import Dict, Any
+# booster_registry.py — set definitions, read lazily from sets/<code>.toml
+#
+#   python booster_registry.py check [codes...] [--pools]     validate set files (and their pools)
+#
+# sets/_default.toml is the template; sets/<code>.toml lists only what differs from it. Nothing is
+# parsed at import: REGISTRY["fin"] / REGISTRY.get("fin") reads, merges and validates fin's file the
+# first time it is asked for, and listing or testing codes only looks at file names.
+#
+# Long-running processes call REGISTRY.refresh() (booster_engine.reload_sets does, and recompiles
+# what changed): files whose mtime moved are re-read, and the codes whose merged config actually
+# differs are returned. A file that fails validation keeps its last good config.
+
+import os, copy, math, threading
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
 
 MYTHIC_CHANCE = 0.125
 
@@ -15,615 +34,291 @@ LURKING_EVIL_COLLECTOR_NUMBERS = {
     "mythic":   ["293","298"],
 }
 
-# -----------------------------
-# DEFAULT (fallback template)
-# -----------------------------
-REGISTRY: Dict[str, Dict[str, Any]] = {
-    "_default": dict(
-        set_code="",
-        common_slots=6,
-        uncommon_slots=3,
-
-        # If you use simple rarity splits instead of a table:
-        rare_weights={"rare": 1 - MYTHIC_CHANCE, "mythic": MYTHIC_CHANCE},
-        wildcard_weights={"common": 0.50, "uncommon": 0.30, "rare": 0.15, "mythic": 0.05},
-        foil_weights={"common": 0.65, "uncommon": 0.25, "rare": 0.08, "mythic": 0.02},
-
-        # Tables (optional): arrays of weighted entries with exact queries
-        #  - Each entry: {"weight": float, "treatment": "label", "query": "...", "foil": bool?}
-        #  - If table provided, it overrides the simple weights for that slot.
-        rare_table=None,
-        wildcard_table=None,
-        foil_table=None,
-
-        token_count=1,
-
-        # Bonus sheet behavior:
-        #  - bonus_chance == 1.0  → add a bonus card (e.g., WOE's WOT)
-        #  - 0 < bonus_chance < 1 → replace FIRST common with a bonus card
-        bonus_chance=0.0,
-        bonus_sheet_code=None,
-        bonus_sheet_weights=None,
-        # Optional CN range restriction for the bonus sheet:
-        bonus_sheet_cn_range=None,  # e.g. (119, 128)
-
-        # Hooks: array of {"name": str, "params": dict}
-        hooks=[],
-
-        # MH3-style foil fetchland mini-lottery (kept for your MH3)
-        foil_fetchlands=False,
-        foil_fetch_chance=0.057,
-    ),
-}
-
-# -----------------------------
-# SET ENTRIES
-# -----------------------------
-
-# FIN (Bloomburrow)
-REGISTRY["fin"] = {
-    **REGISTRY["_default"],
-    "set_code": "fin",
-
-    # 6–7 commons: we always draw 6 commons; FCA can REPLACE one common in 1/3 of packs
-    "common_slots": 6,
-    "uncommon_slots": 3,
-
-    # FCA bonus replaces a common (1/3 chance), with the given rarity split
-    "bonus_chance": 1/3,
-    "bonus_sheet_code": "fca",
-    "bonus_sheet_weights": {"uncommon": 63.25, "rare": 29.75, "mythic": 7.0},
-
-    # Uncommon special (0.3%) hook: woodblock or character uncommon
-    "hooks": [
-        {"name": "fin_uncommon_specials", "params": {"chance": 0.003}}
-    ],
-
-    # --- Rare/Mythic slot (non-foil) ---
-    # Using your split + explicit tables for alternates
-    "rare_table": [
-        # default frame (main set)
-        {"weight": 80.0, "treatment": "regular", "query": "set:fin is:booster r:rare"},
-        {"weight": 10.0, "treatment": "regular", "query": "set:fin is:booster r:mythic"},
-
-        # borderless (cn 328–406)
-        {"weight": 8.0, "treatment": "borderless", "query": "set:fin cn>=328 cn<=406 r:rare"},
-        {"weight": 1.0, "treatment": "borderless", "query": "set:fin cn>=328 cn<=406 r:mythic"},
-
-        # FF artist borderless (cn 315–323 + cn:577)
-        {"weight": 0.5, "treatment": "ff artist borderless", "query": "(set:fin cn>=315 cn<=323 r:rare)"}, #since 577 is mythic only
-        {"weight": 0.5, "treatment": "ff artist borderless", "query": "(set:fin cn>=315 cn<=323 r:mythic) OR (set:fin cn:577 r:mythic)"},
-    ],
-
-    # --- Wildcard slot ---
-    "wildcard_table": [
-        # main set
-        {"weight": 16.7, "treatment": "regular", "query": "set:fin is:booster r:common"},
-        {"weight": 58.3, "treatment": "regular", "query": "set:fin is:booster r:uncommon"},
-
-        # borderless woodblock common (2.6%)
-        {"weight": 2.6,  "treatment": "borderless woodblock", "query": "set:fin cn>=323 cn<=373 r:common"},
-
-        # borderless woodblock or character uncommon (5.7% total)
-        # Borderless woodblock uncommon (cn 323–373)
-        {"weight": 2.85, "treatment": "woodblock", "query": "set:fin cn>=323 cn<=373 r:uncommon"},
-
-        # Borderless character uncommon (cn 374–405)
-        {"weight": 2.85, "treatment": "character", "query": "set:fin cn>=374 cn<=405 r:uncommon"},
-
-
-        # rare/mythic (16.7%) — split ~80/20 like rare slot (best effort)
-        {"weight": 13.36, "treatment": "regular", "query": "set:fin is:booster r:rare"},
-        {"weight": 3.34,  "treatment": "regular", "query": "set:fin is:booster r:mythic"},
-    ],
-
-    # --- Foil slot (use foil prices) ---
-    "foil_table": [
-        # default frame foils
-        {"weight": 55.75, "treatment": "regular", "query": "set:fin is:booster is:foil r:common",   "foil": True},
-        {"weight": 35.90, "treatment": "regular", "query": "set:fin is:booster is:foil r:uncommon", "foil": True},
-        {"weight": 5.50,  "treatment": "regular", "query": "set:fin is:booster is:foil r:rare",     "foil": True},
-        {"weight": 0.25,  "treatment": "regular", "query": "set:fin is:booster is:foil r:mythic",   "foil": True},
-
-        # booster-fun foils (borderless woodblock/character buckets)
-        {"weight": 0.10, "treatment": "booster fun", "query": "set:fin is:foil cn>=323 cn<=406 r:common",   "foil": True},
-        {"weight": 0.50, "treatment": "booster fun", "query": "set:fin is:foil cn>=323 cn<=406 r:uncommon", "foil": True},
-        {"weight": 1.00, "treatment": "booster fun", "query": "set:fin is:foil cn>=323 cn<=406 r:rare",     "foil": True},
-        {"weight": 0.25, "treatment": "booster fun", "query": "set:fin is:foil cn>=323 cn<=406 r:mythic",   "foil": True},
-
-        # 1 of 15 Cid variants (foil)
-        {"weight": 0.25, "treatment": "cid variant", "query": "(set:fin is:foil cn>=407 cn<=420) OR (set:fin is:foil cn:216)", "foil": True},
-    ],
-}
-
-
-
-# Tarkir Booster
-REGISTRY["tdm"] = {
-    **REGISTRY["_default"],
-    "set_code": "tdm",
-
-    # 6–7 commons (we draw 6; the bonus sheet can replace 1 common)
-    "common_slots": 6,
-    "uncommon_slots": 3,
-
-    # SPG replaces one common 1.5% of the time (only SPG #104–113)
-    "bonus_chance": 0.015,
-    "bonus_sheet_code": "spg",
-    "bonus_sheet_cn_range": (104, 113),
-
-    # ---- Rare/Mythic slot ----
-    "rare_table": [
-        # Main set
-        {"weight": 75.0,  "treatment": "regular",                "query": "set:tdm is:booster r:rare"},
-        {"weight": 12.5,  "treatment": "regular",                "query": "set:tdm is:booster r:mythic"},
-
-        # Showcase draconic frame (cn 292–326)
-        {"weight": 0.8,   "treatment": "showcase draconic",      "query": "set:tdm cn>=292 cn<=326 r:rare"},
-        {"weight": 0.6,   "treatment": "showcase draconic",      "query": "set:tdm cn>=292 cn<=326 r:mythic"},
-
-        # Borderless clan cards (cn 327–376)
-        {"weight": 6.4,   "treatment": "borderless clan",        "query": "set:tdm cn>=327 cn<=376 r:rare"},
-        {"weight": 1.2,   "treatment": "borderless clan",        "query": "set:tdm cn>=327 cn<=376 r:mythic"},
-
-        # Borderless sagas/sieges/lands + (borderless) Elspeth, Storm Slayer (cn 383–398)
-        {"weight": 2.7,   "treatment": "borderless saga/siege/land", "query": "set:tdm cn>=383 cn<=398 r:rare"},
-        {"weight": 0.1,   "treatment": "borderless saga/siege/land", "query": "set:tdm cn>=383 cn<=398 r:mythic"},
-
-        # Borderless reversible dragon (cn 377–382)
-        {"weight": 0.8,   "treatment": "borderless reversible dragon", "query": "set:tdm cn>=377 cn<=382 r:rare"},
-        {"weight": 0.9,   "treatment": "borderless reversible dragon", "query": "set:tdm cn>=377 cn<=382 r:mythic"},
-    ],
-
-    # ---- Wildcard slot ----
-    "wildcard_table": [
-        # Main set
-        {"weight": 12.5,  "treatment": "regular",                "query": "set:tdm is:booster r:common"},
-        {"weight": 58.3,  "treatment": "regular",                "query": "set:tdm is:booster r:uncommon"},
-        {"weight": 15.6,  "treatment": "regular",                "query": "set:tdm is:booster r:rare"},
-        {"weight": 2.5,   "treatment": "regular",                "query": "set:tdm is:booster r:mythic"},
-
-        # Showcase draconic frame (cn 292–326)
-        {"weight": 4.6,   "treatment": "showcase draconic",      "query": "set:tdm cn>=292 cn<=326 r:common"},
-        {"weight": 3.8,   "treatment": "showcase draconic",      "query": "set:tdm cn>=292 cn<=326 r:uncommon"},
-
-        # Borderless clan cards (cn 327–376)
-        {"weight": 1.3,   "treatment": "borderless clan",        "query": "set:tdm cn>=327 cn<=376 r:rare"},
-        {"weight": 0.2,   "treatment": "borderless clan",        "query": "set:tdm cn>=327 cn<=376 r:mythic"},
-
-        # Borderless sagas/sieges/lands + Elspeth (cn 383–398)
-        {"weight": 0.6,   "treatment": "borderless saga/siege/land", "query": "set:tdm cn>=383 cn<=398 r:rare"},
-        {"weight": 0.1,   "treatment": "borderless saga/siege/land", "query": "set:tdm cn>=383 cn<=398 r:mythic"},
-
-        # Borderless reversible dragon (cn 377–382)
-        {"weight": 0.2,   "treatment": "borderless reversible dragon", "query": "set:tdm cn>=377 cn<=382 r:rare"},
-        {"weight": 0.1,   "treatment": "borderless reversible dragon", "query": "set:tdm cn>=377 cn<=382 r:mythic"},
-    ],
-
-    # ---- Foil slot (use foil prices) ----
-    "foil_table": [
-        # Main set foils
-        {"weight": 56.5,  "treatment": "regular",                "query": "set:tdm is:booster is:foil r:common",   "foil": True},
-        {"weight": 32.0,  "treatment": "regular",                "query": "set:tdm is:booster is:foil r:uncommon", "foil": True},
-        {"weight": 6.4,   "treatment": "regular",                "query": "set:tdm is:booster is:foil r:rare",     "foil": True},
-        {"weight": 1.1,   "treatment": "regular",                "query": "set:tdm is:booster is:foil r:mythic",   "foil": True},
-
-        # Showcase draconic frame foils (cn 292–326)
-        {"weight": 1.6,   "treatment": "showcase draconic",      "query": "set:tdm is:foil cn>=292 cn<=326 r:common",   "foil": True},
-        {"weight": 1.4,   "treatment": "showcase draconic",      "query": "set:tdm is:foil cn>=292 cn<=326 r:uncommon", "foil": True},
-        {"weight": 0.9,   "treatment": "showcase draconic",      "query": "set:tdm is:foil cn>=292 cn<=326 r:rare",     "foil": True},
-        {"weight": 0.1,   "treatment": "showcase draconic",      "query": "set:tdm is:foil cn>=292 cn<=326 r:mythic",   "foil": True},
-
-        # Borderless clan foils (cn 327–376)
-        {"weight": 0.5,   "treatment": "borderless clan",        "query": "set:tdm is:foil cn>=327 cn<=376 r:rare",     "foil": True},
-        {"weight": 0.1,   "treatment": "borderless clan",        "query": "set:tdm is:foil cn>=327 cn<=376 r:mythic",   "foil": True},
-
-        # Borderless sagas/sieges/lands + Elspeth foils (cn 383–398)
-        {"weight": 0.2,   "treatment": "borderless saga/siege/land", "query": "set:tdm is:foil cn>=383 cn<=398 r:rare",   "foil": True},
-        {"weight": 0.1,   "treatment": "borderless saga/siege/land", "query": "set:tdm is:foil cn>=383 cn<=398 r:mythic", "foil": True},
-
-        # Borderless reversible dragon foils (cn 377–382)
-        {"weight": 0.05,   "treatment": "borderless reversible dragon", "query": "set:tdm is:foil cn>=377 cn<=382 r:rare",   "foil": True},
-        {"weight": 0.05,   "treatment": "borderless reversible dragon", "query": "set:tdm is:foil cn>=377 cn<=382 r:mythic", "foil": True},
-    ],
-}
-
-
-# DFT
-# --- DFT: Aetherdrift (Play Booster) ---
-REGISTRY["dft"] = {
-    **REGISTRY["_default"],
-    "set_code": "dft",
-
-    # 6–7 commons (draw 6; SPG may replace 1 common)
-    "common_slots": 7,
-    "uncommon_slots": 3,
-
-    # Special Guests: 1.5% of boosters replace one common; only SPG #84–93
-    "bonus_chance": 0.015,
-    "bonus_sheet_code": "spg",
-    "bonus_sheet_cn_range": (84, 93),
-
-    # ---- Rare/Mythic slot ----
-    # 60 rares (78%), 20 mythics (13%) main set
-    # 45 borderless rares (8%), 13 borderless mythics (1%)
-    # Borderless themes:
-    #   Revved Up = cn 292–332
-    #   Rude Riders = cn 333–346
-    "rare_table": [
-        # Main set regular frame
-        {"weight": 78.0, "treatment": "regular", "query": "set:dft is:booster r:rare"},
-        {"weight": 13.0, "treatment": "regular", "query": "set:dft is:booster r:mythic"},
-
-        # Borderless R/M split: 8% rare, 1% mythic — split evenly across the two themes
-        # Revved Up (cn 292–332)
-        {"weight": 4.0,  "treatment": "borderless revved up",  "query": "set:dft is:borderless cn>=292 cn<=332 r:rare"},
-        {"weight": 0.5,  "treatment": "borderless revved up",  "query": "set:dft is:borderless cn>=292 cn<=332 r:mythic"},
-
-        # Rude Riders (cn 333–346)
-        {"weight": 4.0,  "treatment": "borderless rude riders","query": "set:dft is:borderless cn>=333 cn<=346 r:rare"},
-        {"weight": 0.5,  "treatment": "borderless rude riders","query": "set:dft is:borderless cn>=333 cn<=346 r:mythic"},
-        
-        {"weight": 2.0, "treatment": "borderless", "query": "set:dft is:borderless cn>=355 cn<=375"}
-    ],
-
-    # ---- Wildcard slot ----
-    # common 8.3%, uncommon 62.5%,
-    # rare+mythic 20.8% split with SAME proportions as the rare slot (78/13 across R/M):
-    # → rare ≈ 17.83%, mythic ≈ 2.97%
-    # plus 8.3% borderless revved up C/U (cn 292–332)
-    "wildcard_table": [
-        {"weight": 8.3,   "treatment": "regular",                "query": "set:dft is:booster r:common"},
-        {"weight": 62.5,  "treatment": "regular",                "query": "set:dft is:booster r:uncommon"},
-        {"weight": 17.83, "treatment": "regular",                "query": "set:dft is:booster r:rare"},
-        {"weight": 2.97,  "treatment": "regular",                "query": "set:dft is:booster r:mythic"},
-
-        # Borderless revved up common/uncommon (8.3% total)
-        {"weight": 4.15,  "treatment": "borderless revved up",   "query": "set:dft cn>=292 cn<=332 r:common"},
-        {"weight": 4.15,  "treatment": "borderless revved up",   "query": "set:dft cn>=292 cn<=332 r:uncommon"},
-    ],
-
-    # ---- Foil slot (use foil prices) ----
-    # Main set foils:
-    #   Common 60.5%, Uncommon 30.0%, Rare 6.4%, Mythic 1.1%
-    # Borderless foils (all themes together):
-    #   Common 0.5%, Uncommon 0.5%, Rare 0.9%, Mythic 0.1%
-    "foil_table": [
-        # Main set foils
-        {"weight": 60.5, "treatment": "regular", "query": "set:dft is:booster is:foil r:common",   "foil": True},
-        {"weight": 30.0, "treatment": "regular", "query": "set:dft is:booster is:foil r:uncommon", "foil": True},
-        {"weight": 6.4, "treatment": "regular", "query": "set:dft is:booster is:foil r:rare",     "foil": True},
-        {"weight": 1.1, "treatment": "regular", "query": "set:dft is:booster is:foil r:mythic",   "foil": True},
-
-        # Borderless foils (combine Revved Up + Rude Riders: cn 292–346)
-        {"weight": 0.5,  "treatment": "borderless", "query": "set:dft is:foil is:borderless cn>=292 cn<=346 r:common",   "foil": True},
-        {"weight": 0.5,  "treatment": "borderless", "query": "set:dft is:foil is:borderless cn>=292 cn<=346 r:uncommon", "foil": True},
-        {"weight": 0.9,  "treatment": "borderless", "query": "set:dft is:foil is:borderless cn>=292 cn<=346 r:rare",     "foil": True},
-        {"weight": 0.1,  "treatment": "borderless", "query": "set:dft is:foil is:borderless cn>=292 cn<=346 r:mythic",   "foil": True},
-    ],
-
-    # Land/token text is informational for now (your CLI prints token count only)
-    "token_count": 1,
-}
-
-# FDN — SPG replaces a common; wildcard=foil distribution per your notes
-
-REGISTRY["fdn"] = {
-    **REGISTRY["_default"],
-    "set_code": "fdn",
-    
-    # 6-7 commons
-    "common_slots": 7,
-    "uncommon_slots": 3,
-    
-    # special guests
-    "bonus_chance": 0.015,
-    "bonus_sheet_code": "spg",
-    "bonus_sheet_cn_range": (74, 83),
-    
-    "rare_table":[
-        #rare or myhthic
-        {"weight": 78,   "treatment": "regular",    "query": "set:fdn is:booster r:rare"},
-        {"weight": 12.8, "treatment": "regular",    "query": "set:fdn is:booster r:mythic"},
-        {"weight": 7.7,  "treatment": "borderless", "query": "set:fdn is:borderless r:r"},
-        {"weight": 1.5,  "treatment": "borderless", "query": "set:fdn is:borderless r:m"},
-    ],
-    
-    "wildcard_table":[
-        # traditional non-foil weight
-        {"weight": 16.7,  "treatment": "regular",   "query": "set:fdn is:booster r:common"},
-        {"weight": 58.3,  "treatment": "regular",   "query": "set:fdn is:booster r:uncommon"},
-        {"weight": 16.3,  "treatment": "regular",   "query": "set:fdn is:booster r:rare"},
-        {"weight": 2.6,   "treatment": "regular",   "query": "set:fdn is:booster r:mythic"},
-        
-        # borderless cards, common, uncommon, 
-        {"weight": 1.8,  "treatment": "borderless", "query": "set:fdn is:borderless r:c"},
-        {"weight": 2.4,  "treatment": "borderless", "query": "set:fdn is:borderless r:u"},
-        {"weight": 1.6,  "treatment": "borderless", "query": "set:fdn is:borderless r:r"},
-        {"weight": 0.3,  "treatment": "borderless", "query": "set:fdn is:borderless r:m"},  
-    ],
-
-    #finish u the foils
-    "foil_table":[
-        # same weight for traditional foils as wildcard non-foils
-        {"weight": 16.7,  "treatment": "regular",   "query": "set:fdn is:booster is:foil r:common"},
-        {"weight": 58.3,  "treatment": "regular",   "query": "set:fdn is:booster is:foil r:uncommon"},
-        {"weight": 16.3,  "treatment": "regular",   "query": "set:fdn is:booster is:foil r:rare"},
-        {"weight": 2.6,   "treatment": "regular",   "query": "set:fdn is:booster is:foil r:mythic"},
-        
-    ],
-    
-    "token count": 1,
-}
-
-
-
-# WOE — Enchanting Tales (WOT) bonus card is ADDED (not a replacement)
-REGISTRY["woe"] = {
-    **REGISTRY["_default"],
-    "set_code": "woe",
-    "common_slots": 3,
-    "uncommon_slots": 3,
-    "rare_weights": {"rare": 0.87, "mythic": 0.13},
-    "wildcard_weights": {"common": 0.55, "uncommon": 0.30, "rare": 0.13, "mythic": 0.02},
-    "foil_weights": {"common": 0.65, "uncommon": 0.25, "rare": 0.08, "mythic": 0.02},
-    "bonus_chance": 1.0,
-    "bonus_sheet_code": "wot",
-    "bonus_sheet_weights": {"uncommon": 0.2857, "rare": 0.4762, "mythic": 0.2381},
-}
-
-# LTR — base split
-REGISTRY["ltr"] = {
-    **REGISTRY["_default"],
-    "set_code": "ltr",
-    "common_slots": 3,
-    "uncommon_slots": 3,
-    "rare_weights": {"rare": 0.875, "mythic": 0.125},
-}
-
-# DSK — Lurking Evil / Paranormal Frame via hook + params
-REGISTRY["dsk"] = {
-    **REGISTRY["_default"],
-    "set_code": "dsk",
-    "rare_weights": {"rare": 0.857, "mythic": 0.143},  # collapsed from subpools
-    "bonus_chance": 1/64,    # Special Guest replaces a common
-    "bonus_sheet_code": "spg",
-    "hooks": ["dsk_lurking"],
-    "lurking_evil": {
-        "common_chance": 0.25,
-        "uncommon_le_chance": 0.25,
-        "uncommon_pf_chance": 0.25,
-        "pf_uncommon_numbers": ["306","309","314","319"],
-        "cn": LURKING_EVIL_COLLECTOR_NUMBERS,
-    },
-}
-
-# CLB — specialty adds via hook
-REGISTRY["clb"] = {
-    **REGISTRY["_default"],
-    "set_code": "clb",
-    "rare_weights": {"rare": 0.875, "mythic": 0.125},
-    "hooks": [
-        {
-            "name": "clb_specials",
-            "params": {
-                "foil_etched_legendary_bg": {
-                    "enabled": True, "frequency": 1/3,
-                    "rarities": {"rare": 1 - MYTHIC_CHANCE, "mythic": MYTHIC_CHANCE}
-                },
-                "legendary_creature_pw": {
-                    "enabled": True, "frequency": 0.50,
-                    "rarities": {"rare": 1 - MYTHIC_CHANCE, "mythic": MYTHIC_CHANCE}
-                },
-                "legendary_background": {
-                    "enabled": True, "frequency": 1/12,
-                    "rarities": {"rare": 1.0}
-                }
-            }
-        }
-    ],
-}
-
-# OTJ — Breaking News (OTP), Big Score (BIG)
-REGISTRY["otj"] = {
-    **REGISTRY["_default"],
-    "set_code": "otj",
-    "rare_weights": {"rare": 0.895, "mythic": 0.105},
-    "wildcard_weights": {"common": 0.50, "uncommon": 0.4167, "rare": 0.0667, "mythic": 0.0166},
-    "hooks": [
-        {
-            "name": "otj_breaking_news",
-            "params": {
-                "otp_sheet_code": "otp",
-                "otp_odds": {"uncommon": 0.667, "rare": 0.285, "mythic": 0.048},
-                # "mode": "replace_common"
-            }
-        }
-    ],
-}
-
-# MH3 — optional foil fetchland lotto
-REGISTRY["mh3"] = {
-    **REGISTRY["_default"],
-    "set_code": "mh3",
-    "rare_weights": {"rare": 0.875, "mythic": 0.125},
-    "foil_fetchlands": True,
-    "foil_fetch_chance": 0.057,
-    "fetchland_names": FETCHLAND_NAMES,
-    "bonus_chance": 0.0,
-    "bonus_sheet_code": None,
-}
-
-# EOE — Edge of Eternities (NEW)
-REGISTRY["eoe"] = {
-    **REGISTRY["_default"],
-    "set_code": "eoe",
-
-    # 6 commons, 3 uncommons
-    "common_slots": 6,
-    "uncommon_slots": 3,
-
-    # Special Guests: (set:spg cn:119–128) — 1.8% chance replaces a common
-    "bonus_chance": 0.018,
-    "bonus_sheet_code": "spg",
-    "bonus_sheet_cn_range": (119, 128),
-
-    # Rare/Mythic slot table
-    "rare_table": [
-        # Main set R/M (regular frame)
-        {"weight": 80.4, "treatment": "regular", "query": "set:eoe is:booster r:rare"},
-        {"weight": 14.2, "treatment": "regular", "query": "set:eoe is:booster r:mythic"},
-
-        # Borderless Triumphant (cn 307–316)
-        {"weight": 2.0, "treatment": "borderless triumphant", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=307 cn<=316 r:rare"},
-        {"weight": 0.9, "treatment": "borderless triumphant", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=307 cn<=316 r:mythic"},
-
-        # Surreal Space (cn 287–302)
-        {"weight": 2.0, "treatment": "borderless surreal space", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=287 cn<=302 r:rare"},
-        {"weight": 0.9, "treatment": "borderless surreal space", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=287 cn<=302 r:mythic"},
-    ],
-
-    # Wildcard slot table
-    "wildcard_table": [
-        # Regular frame (main set)
-        {"weight": 12.5, "treatment": "regular", "query": "set:eoe is:booster r:common"},
-        {"weight": 62.5, "treatment": "regular", "query": "set:eoe is:booster r:uncommon"},
-        {"weight": 10.6, "treatment": "regular", "query": "set:eoe is:booster r:rare"},
-        {"weight": 0.9,  "treatment": "regular", "query": "set:eoe is:booster r:mythic"},
-
-        # Stellar Sights land (EOS)
-        {"weight": 10.0, "treatment": "stellar sights land", "query": "set:eos r:rare t:land"},
-        {"weight": 2.5,  "treatment": "stellar sights land", "query": "set:eos r:mythic t:land"},
-
-        # Borderless viewport land (exclude Secluded Starforge cn:366)
-        {"weight": 1.0, "treatment": "borderless viewport land", "query": "set:eoe is:showcase t:land -cn:366 r:rare"},
-        {"weight": 0.9, "treatment": "borderless viewport land", "query": "set:eoe is:showcase t:land -cn:366 r:mythic"},
-
-        # Borderless Triumphant (cn 307–316)
-        {"weight": 1.0, "treatment": "borderless triumphant", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=307 cn<=316 r:rare"},
-        {"weight": 0.9, "treatment": "borderless triumphant", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=307 cn<=316 r:mythic"},
-
-        # Borderless Surreal Space (cn 287–302)
-        {"weight": 1.0, "treatment": "borderless surreal space", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=287 cn<=302 r:rare"},
-        {"weight": 0.9, "treatment": "borderless surreal space", "query": "set:eoe is:borderless -is:showcase -t:basic cn>=287 cn<=302 r:mythic"},
-    ],
-
-    # Foil slot table — use foil prices (we fetch with is:foil)
-    "foil_table": [
-        # Main set (regular frame, booster legal)
-        {"weight": 58.0, "treatment": "regular", "query": "set:eoe is:booster is:foil r:common",  "foil": True},
-        {"weight": 32.0, "treatment": "regular", "query": "set:eoe is:booster is:foil r:uncommon","foil": True},
-        {"weight": 6.4,  "treatment": "regular", "query": "set:eoe is:booster is:foil r:rare",    "foil": True},
-        {"weight": 1.1,  "treatment": "regular", "query": "set:eoe is:booster is:foil r:mythic",  "foil": True},
-
-        # Stellar Sights land (EOS)
-        {"weight": 1.0, "treatment": "stellar sights land", "query": "set:eos is:foil r:rare",   "foil": True},
-        {"weight": 0.9, "treatment": "stellar sights land", "query": "set:eos is:foil r:mythic", "foil": True},
-
-        # Borderless viewport / triumphant / surreal space (EOE alternates)
-        # viewport: showcase lands (exclude cn:366)
-        {"weight": 0.9, "treatment": "borderless viewport land", "query": "set:eoe is:foil is:showcase t:land -cn:366 r:rare",   "foil": True},
-        {"weight": 0.9, "treatment": "borderless viewport land", "query": "set:eoe is:foil is:showcase t:land -cn:366 r:mythic", "foil": True},
-
-        # triumphant (cn 307–316)
-        {"weight": 0.9, "treatment": "borderless triumphant", "query": "set:eoe is:foil is:borderless -is:showcase -t:basic cn>=307 cn<=316 r:rare",   "foil": True},
-        {"weight": 0.9, "treatment": "borderless triumphant", "query": "set:eoe is:foil is:borderless -is:showcase -t:basic cn>=307 cn<=316 r:mythic", "foil": True},
-
-        # surreal space (cn 287–302)
-        {"weight": 0.9, "treatment": "borderless surreal space", "query": "set:eoe is:foil is:borderless -is:showcase -t:basic cn>=287 cn<=302 r:rare",   "foil": True},
-        {"weight": 0.9, "treatment": "borderless surreal space", "query": "set:eoe is:foil is:borderless -is:showcase -t:basic cn>=287 cn<=302 r:mythic", "foil": True},
-    ],
-}
-
-
-# Streets of New Capenna (SNC) — registry entry
-REGISTRY["snc"] = {
-    **REGISTRY["_default"],
-    "set_code": "snc",
-
-    # core slots
-    "common_slots": 3,
-    "uncommon_slots": 3,
-    "wildcard_slots": 2,
-
-
-    "uncommon_showcase_slot": [
-        {"weight": 0.0, "treatment": "Uncommon Showcase", "query": "set:snc is:showcase r<=u"}
-    ],
-    
-    # Rare table (base guaranteed rare/mythic slot) — weights sum ~100
-    "rare_table": [
-        # main set (cn 001–261)
-        {"weight": 78.0, "treatment": "regular", "query": "set:snc cn<=261 r:rare"},
-        {"weight": 12.8, "treatment": "regular", "query": "set:snc cn<=261 r:mythic"},
-
-        # small borderless planeswalker / borderless bucket (cn 282–295)
-        {"weight": 1.5, "treatment": "borderless", "query": "set:snc cn>=282 cn<=295 r:rare"},
-        {"weight": 0.7, "treatment": "borderless", "query": "set:snc cn>=282 cn<=295 r:mythic"},
-
-        # Golden Age Showcase (cn 296–340)
-        {"weight": 3.5, "treatment": "Golden Age Showcase", "query": "set:snc cn>=296 cn<=340 r:rare"},
-        {"weight": 1.2, "treatment": "Golden Age Showcase", "query": "set:snc cn>=296 cn<=340 r:mythic"},
-
-        # Art Deco Showcase (cn 341–349)
-        {"weight": 1.0, "treatment": "Art Deco Showcase", "query": "set:snc cn>=341 cn<=349 r:rare"},
-        {"weight": 0.8, "treatment": "Art Deco Showcase", "query": "set:snc cn>=341 cn<=349 r:mythic"},
-
-        # Skyscraper Land Showcase (cn 350–359) — rare showcase lands
-        {"weight": 0.5, "treatment": "Skyscraper Land Showcase", "query": "set:snc cn>=350 cn<=359 r:rare"},
-    ],
-
-    # still to fix the weights as every slot has the same chance to get a common than a mythic
-    # Wildcard table (two wildcards per set booster normally; single-table entry used by open_booster)
-    "wildcard_table": [
-        # Regular main set
-        {"weight": 30.0, "treatment": "regular", "query": "set:snc cn<=261 r:common"},
-        {"weight": 40.0, "treatment": "regular", "query": "set:snc cn<=261 r:uncommon"},
-        {"weight": 20.0, "treatment": "regular", "query": "set:snc cn<=261 r:rare"},
-        {"weight": 5.0,  "treatment": "regular", "query": "set:snc cn<=261 r:mythic"},
-
-        # Borderless (rare/mythic only) — small slice
-        {"weight": 0.5, "treatment": "borderless", "query": "set:snc cn>=282 cn<=295 r:rare"},
-        {"weight": 0.5, "treatment": "borderless", "query": "set:snc cn>=282 cn<=295 r:mythic"},
-
-        # Golden Age Showcase (all rarities)
-        {"weight": 1.0,  "treatment": "Golden Age Showcase", "query": "set:snc cn>=296 cn<=340 r:common"},
-        {"weight": 0.7,  "treatment": "Golden Age Showcase", "query": "set:snc cn>=296 cn<=340 r:uncommon"},
-        {"weight": 0.15, "treatment": "Golden Age Showcase", "query": "set:snc cn>=296 cn<=340 r:rare"},
-        {"weight": 0.15, "treatment": "Golden Age Showcase", "query": "set:snc cn>=296 cn<=340 r:mythic"},
-
-        # Art Deco Showcase (rare/mythic only)
-        {"weight": 0.5, "treatment": "Art Deco Showcase", "query": "set:snc cn>=341 cn<=349 r:rare"},
-        {"weight": 0.5, "treatment": "Art Deco Showcase", "query": "set:snc cn>=341 cn<=349 r:mythic"},
-
-        # Skyscraper Land Showcase (rare only)
-        {"weight": 0.5, "treatment": "Skyscraper Land Showcase", "query": "set:snc cn>=350 cn<=359 r:rare"},
-
-        # Commander exclusives from NCC (very small)
-        {"weight": 0.3, "treatment": "commander", "query": "set:ncc cn>=1 cn<=85 r:rare"},
-        {"weight": 0.2, "treatment": "commander", "query": "set:ncc cn>=1 cn<=85 r:mythic"},
-    ],
-
-    # Foil slot: 1 gilded or foil card (gilded CNs 361–405)
-    "foil_table": [
-        # main set foils
-        {"weight": 58.0, "treatment": "regular", "query": "set:snc cn>=1 cn<=261 is:foil r:common", "foil": True},
-        {"weight": 29.0, "treatment": "regular", "query": "set:snc cn>=1 cn<=261 is:foil r:uncommon", "foil": True},
-        {"weight": 7.0,  "treatment": "regular", "query": "set:snc cn>=1 cn<=261 is:foil r:rare", "foil": True},
-        {"weight": 0.5,  "treatment": "regular", "query": "set:snc cn>=1 cn<=261 is:foil r:mythic", "foil": True},
-
-        # gilded foils (special visual treatment) — cn:361–405
-        {"weight": 4.0, "treatment": "gilded", "query": "set:snc is:foil cn>=361 cn<=405", "foil": True},
-    ],
-
-    # Hooks: add extra rare hook (it will return extra rare pulls to append)
-    "hooks": [
-        {"name": "snc_extra_rares"},
-        {"name": "snc_showcase_guarantee"}
-    ],
-
-
-    # other non-essential metadata
-    "token_count": 1,
-}
-
+SETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sets")
+DEFAULT_CODE = "_default"
+
+# TOML has no null: these default to None when _default.toml leaves them out
+NULLABLE = ("rare_table", "wildcard_table", "foil_table",
+            "bonus_sheet_code", "bonus_sheet_weights", "bonus_sheet_cn_range")
+# keys a set may add that the template does not have
+EXTRA_KEYS = ("wildcard_slots", "lurking_evil", "fetchland_names", "uncommon_showcase_slot", "collation")
+
+TABLE_KEYS = ("rare_table", "wildcard_table", "foil_table", "uncommon_showcase_slot")
+TABLE_ENTRY_KEYS = {"weight", "treatment", "query", "foil"}
+WEIGHT_KEYS = ("rare_weights", "wildcard_weights", "foil_weights", "bonus_sheet_weights")
+COUNT_KEYS = ("common_slots", "uncommon_slots", "wildcard_slots", "token_count", "packs_per_box", "boxes_per_case")
+PROBABILITY_KEYS = ("bonus_chance", "foil_fetch_chance")
+
+# [collation.<kind>] print sheets (collation.py)
+COLLATION_KINDS = ("common", "uncommon")
+COLLATION_KEYS = {"layout", "copies", "run_length", "start", "seed"}
+COLLATION_LAYOUTS = ("color_stripes", "shuffled", "collector")
+COLLATION_STARTS = ("uniform", "aligned")
+
+# weights are relative, but a table that is meant to sum to 1 or 100 and doesn't is usually a typo
+SUM_TOLERANCE = 0.01
+
+class RegistryError(ValueError):
+    pass
+
+# =========================
+# Validation
+# =========================
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _check_weights(where: str, weights: List[Any], warnings: List[str]):
+    for w in weights:
+        if not _is_number(w) or not math.isfinite(w) or w < 0:
+            raise RegistryError(f"{where}: weight {w!r} must be a finite number >= 0")
+    total = float(sum(weights))
+    if total <= 0:
+        raise RegistryError(f"{where}: weights sum to 0")
+    if not any(abs(total - target) <= SUM_TOLERANCE * target for target in (1.0, 100.0)):
+        warnings.append(f"{where}: weights sum to {total:g} (not 1 or 100)")
+
+def _check_probabilities(where: str, value: Any):
+    """Hook params: anything called *chance / frequency / *odds must lie in [0, 1]."""
+    if isinstance(value, dict):
+        for k, v in value.items():
+            key = str(k).lower()
+            if key.endswith("chance") or key == "frequency":
+                if not _is_number(v) or not 0.0 <= v <= 1.0:
+                    raise RegistryError(f"{where}.{k}: probability {v!r} must be in [0, 1]")
+            elif key.endswith("odds") and isinstance(v, dict):
+                for r, p in v.items():
+                    if not _is_number(p) or not 0.0 <= p <= 1.0:
+                        raise RegistryError(f"{where}.{k}.{r}: probability {p!r} must be in [0, 1]")
+            else:
+                _check_probabilities(f"{where}.{k}", v)
+
+def validate(code: str, config: Dict[str, Any], default: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Raises RegistryError on a broken config; returns warnings (odd weight sums)."""
+    warnings: List[str] = []
+    default = config if default is None else default
+    for key, value in config.items():
+        if key not in default and key not in EXTRA_KEYS:
+            raise RegistryError(f"{code}: unknown key {key!r}")
+        base = default.get(key)
+        if base is not None and value is not None and type(base) is not type(value) \
+                and not (_is_number(base) and _is_number(value)):
+            raise RegistryError(f"{code}.{key}: expected {type(base).__name__}, got {type(value).__name__}")
+
+    for key in COUNT_KEYS:
+        v = config.get(key)
+        if v is not None and (not isinstance(v, int) or isinstance(v, bool) or v < 0):
+            raise RegistryError(f"{code}.{key}: {v!r} must be an integer >= 0")
+    for key in PROBABILITY_KEYS:
+        v = config.get(key)
+        if v is not None and (not _is_number(v) or not 0.0 <= v <= 1.0):
+            raise RegistryError(f"{code}.{key}: probability {v!r} must be in [0, 1]")
+    if not _is_number(config.get("msrp", 1.0)) or config.get("msrp", 1.0) <= 0:
+        raise RegistryError(f"{code}.msrp: must be > 0")
+
+    for key in WEIGHT_KEYS:
+        weights = config.get(key)
+        if weights:
+            _check_weights(f"{code}.{key}", list(weights.values()), warnings)
+
+    for key in TABLE_KEYS:
+        table = config.get(key)
+        if not table:
+            continue
+        for i, entry in enumerate(table):
+            where = f"{code}.{key}[{i}]"
+            if not isinstance(entry, dict):
+                raise RegistryError(f"{where}: expected a table entry")
+            unknown = set(entry) - TABLE_ENTRY_KEYS
+            if unknown:
+                raise RegistryError(f"{where}: unknown keys {sorted(unknown)}")
+            if not isinstance(entry.get("query"), str) or not entry["query"].strip():
+                raise RegistryError(f"{where}: missing query")
+        if key != "uncommon_showcase_slot":  # not drawn from; kept for reference
+            _check_weights(f"{code}.{key}", [e.get("weight", 1.0) for e in table], warnings)
+
+    cn_range = config.get("bonus_sheet_cn_range")
+    if cn_range is not None and (len(cn_range) != 2 or not all(isinstance(n, int) for n in cn_range)
+                                 or cn_range[0] > cn_range[1]):
+        raise RegistryError(f"{code}.bonus_sheet_cn_range: expected [low, high], got {cn_range!r}")
+
+    hooks = config.get("hooks") or []
+    if hooks:
+        # imported here: both import this module
+        from booster import HOOKS
+        from booster_plan import HOOK_COMPILERS
+    for i, hook in enumerate(hooks):
+        name, params = (hook, None) if isinstance(hook, str) else (hook.get("name"), hook.get("params"))
+        if name not in HOOKS:
+            raise RegistryError(f"{code}.hooks[{i}]: unknown hook {name!r}")
+        if name not in HOOK_COMPILERS:
+            raise RegistryError(f"{code}.hooks[{i}]: hook {name!r} has no compiler in booster_plan")
+        if isinstance(hook, dict) and set(hook) - {"name", "params"}:
+            raise RegistryError(f"{code}.hooks[{i}]: unknown keys {sorted(set(hook) - {'name', 'params'})}")
+        _check_probabilities(f"{code}.hooks[{i}].params", params or {})
+    _check_probabilities(f"{code}.lurking_evil", config.get("lurking_evil") or {})
+
+    for kind, sheet in (config.get("collation") or {}).items():
+        where = f"{code}.collation.{kind}"
+        if kind not in COLLATION_KINDS or not isinstance(sheet, dict):
+            raise RegistryError(f"{where}: expected one of {list(COLLATION_KINDS)} with a sheet table")
+        unknown = set(sheet) - COLLATION_KEYS
+        if unknown:
+            raise RegistryError(f"{where}: unknown keys {sorted(unknown)}")
+        if sheet.get("layout", "color_stripes") not in COLLATION_LAYOUTS:
+            raise RegistryError(f"{where}.layout: {sheet['layout']!r} not in {list(COLLATION_LAYOUTS)}")
+        if sheet.get("start", "uniform") not in COLLATION_STARTS:
+            raise RegistryError(f"{where}.start: {sheet['start']!r} not in {list(COLLATION_STARTS)}")
+        for key, low in (("copies", 1), ("run_length", 0), ("seed", 0)):
+            v = sheet.get(key, low)
+            if not isinstance(v, int) or isinstance(v, bool) or v < low:
+                raise RegistryError(f"{where}.{key}: {v!r} must be an integer >= {low}")
+    return warnings
+
+# =========================
+# Lazy registry
+# =========================
+
+def _read(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as fh:
+        try:
+            return tomllib.load(fh)
+        except tomllib.TOMLDecodeError as err:
+            raise RegistryError(f"{os.path.basename(path)}: {err}") from err
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class Registry(Mapping):
+    """Read-only mapping set code → merged config, loaded on first access."""
+
+    def __init__(self, path: str = SETS_DIR):
+        self.path = path
+        self.warnings: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, Tuple[Optional[int], Optional[int]]] = {}  # code → (file, _default) mtimes
+
+    def file(self, code: str) -> str:
+        return os.path.join(self.path, f"{code}.toml")
+
+    def codes(self) -> List[str]:
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return []
+        return sorted(n[:-5] for n in names if n.endswith(".toml"))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.codes())
+
+    def __len__(self) -> int:
+        return len(self.codes())
+
+    def __contains__(self, code) -> bool:
+        return isinstance(code, str) and (code in self._configs or os.path.isfile(self.file(code)))
+
+    def __getitem__(self, code: str) -> Dict[str, Any]:
+        hit = self._configs.get(code)
+        if hit is not None:
+            return hit
+        with self._lock:
+            hit = self._configs.get(code)
+            if hit is None:
+                hit = self._load(code)
+            return hit
+
+    def _load(self, code: str) -> Dict[str, Any]:
+        path = self.file(code)
+        stamp = (_mtime(path), _mtime(self.file(DEFAULT_CODE)))
+        if stamp[0] is None:
+            raise KeyError(code)
+        raw = _read(path)
+        if code == DEFAULT_CODE:
+            config = {**raw, **{k: raw.get(k) for k in NULLABLE}}
+            warnings = validate(code, config)
+        else:
+            default = self[DEFAULT_CODE]
+            if raw.get("set_code", code) != code:
+                raise RegistryError(f"{code}.toml: set_code is {raw['set_code']!r}")
+            config = {**copy.deepcopy(default), **raw, "set_code": code}
+            warnings = validate(code, config, default)
+        self._configs[code] = config
+        self._stamps[code] = stamp
+        self.warnings[code] = warnings
+        return config
+
+    def refresh(self) -> List[str]:
+        """Re-reads set files changed on disk; returns the codes whose config changed (or vanished)."""
+        changed: List[str] = []
+        with self._lock:
+            default_stamp = _mtime(self.file(DEFAULT_CODE))
+            # the template first, so sets re-merge over the new one
+            for code in sorted(self._configs, key=lambda c: c != DEFAULT_CODE):
+                stamp = (_mtime(self.file(code)), default_stamp)
+                if stamp == self._stamps.get(code):
+                    continue
+                old = self._configs.pop(code)
+                if stamp[0] is None:
+                    self._stamps.pop(code, None)
+                    changed.append(code)
+                    continue
+                try:
+                    new = self._load(code)
+                except (RegistryError, OSError) as err:
+                    print(f"[registry] keeping the last good {code}: {err}")
+                    self._configs[code] = old
+                    self._stamps[code] = stamp  # don't retry until the file changes again
+                    continue
+                if new != old:
+                    changed.append(code)
+        return changed
+
+    def invalidate(self, code: Optional[str] = None):
+        """Forget parsed configs (all, or one) so the next access re-reads the file."""
+        with self._lock:
+            if code is None:
+                self._configs.clear()
+                self._stamps.clear()
+            else:
+                self._configs.pop(code, None)
+                self._stamps.pop(code, None)
+
+REGISTRY = Registry()
+
+def check(codes: Optional[List[str]] = None, pools: bool = False) -> Dict[str, List[str]]:
+    """Validates set files from disk; code → problems ("error: ..." / "warning: ...")."""
+    registry = Registry(REGISTRY.path)
+    out: Dict[str, List[str]] = {}
+    for code in codes or registry.codes():
+        problems: List[str] = []
+        try:
+            registry[code]
+            problems += [f"warning: {w}" for w in registry.warnings.get(code, [])]
+        except KeyError:
+            problems.append(f"error: no file {registry.file(code)}")
+        except RegistryError as err:
+            problems.append(f"error: {err}")
+        if pools and code != DEFAULT_CODE and not any(p.startswith("error") for p in problems):
+            from booster_plan import empty_pools
+            problems += [f"error: empty pool for {label}: {query}" for label, query in empty_pools(code)]
+        out[code] = problems
+    return out
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    if args[:1] == ["check"]:
+        codes = [a.lower() for a in args[1:] if not a.startswith("--")]
+        report = check(codes or None, pools="--pools" in args)
+        failed = False
+        for code, problems in report.items():
+            print(f"{code:<10} {'ok' if not problems else ''}")
+            for p in problems:
+                print(f"    {p}")
+                failed |= p.startswith("error")
+        sys.exit(1 if failed else 0)
+    print("usage: booster_registry.py check [codes...] [--pools]")
@@ -0,0 +1,273 @@
+# card_pools.py — full result set of a Scryfall query, cached in memory and on disk
+#
+# A "pool" is every print matching one query (the same query fetch_random_card would send to
+# /cards/random). Sampling uniformly from a pool locally is equivalent to one random call, so the
+# batched engine compiles every slot of a set down to pools, and the online opener can sample
+# from them too (use_pool_source): one paginated /cards/search per distinct query per cache
+# lifetime instead of one request per card.
+
+import os, json, math, time, random, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+POOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".card_cache", "pools")
+
+SEARCH_URL = "https://api.scryfall.com/cards/search"
+PAGE_SIZE = 175          # Scryfall's fixed /cards/search page size
+PAGE_WORKERS = 4         # concurrent page downloads per pool
+MIN_REQUEST_INTERVAL = 0.1
+
+# How long a cached pool is trusted before it is fetched again (prices move daily)
+POOL_TTL = 24 * 60 * 60
+
+HEADERS = {
+    "User-Agent": "MTGBoosterPackOpenerSIM/1.0",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip",
+}
+
+# Only what the opener/display/valuation read; full Scryfall objects are ~5 KB each
+CARD_FIELDS = (
+    "id", "name", "set", "collector_number", "rarity", "prices", "color_identity",
+    "type_line", "finishes", "image_uris", "card_faces", "border_color", "frame_effects",
+)
+
+_memory: Dict[str, List[Dict[str, Any]]] = {}
+_loaded_at: Dict[str, float] = {}
+_in_flight: Dict[str, Future] = {}
+_lock = threading.Lock()
+_provider: Optional[Callable[[str], List[Dict[str, Any]]]] = None
+
+_local = threading.local()
+_throttle_lock = threading.Lock()
+_last_request = [0.0]
+_page_executor = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix="pool-page")
+
+# =========================
+# Helpers
+# =========================
+
+def slim_card(card: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: card[k] for k in CARD_FIELDS if k in card}
+    if "card_faces" in out:
+        # keep just enough of each face to render art
+        out["card_faces"] = [{k: f[k] for k in ("name", "image_uris") if k in f} for f in out["card_faces"]]
+    return out
+
+def pool_path(query: str) -> str:
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+    return os.path.join(POOL_DIR, digest + ".json")
+
+def set_pool_provider(fn: Optional[Callable[[str], List[Dict[str, Any]]]]):
+    """Replace where pools come from (fixtures, a local bulk-data store...). None restores Scryfall."""
+    global _provider
+    _provider = fn
+    clear_memory()
+
+def pool_provider() -> Optional[Callable[[str], List[Dict[str, Any]]]]:
+    return _provider
+
+def clear_memory():
+    with _lock:
+        _memory.clear()
+        _loaded_at.clear()
+
+def seed_pools(pools: Dict[str, List[Dict[str, Any]]], loaded_at: Optional[float] = None):
+    """Put already-loaded pools into memory (warm_start snapshots); loaded_at keeps their real age."""
+    stamp = loaded_at if loaded_at is not None else time.time()
+    with _lock:
+        for query, cards in pools.items():
+            query = " ".join(query.split())
+            _memory[query] = cards
+            _loaded_at[query] = stamp
+
+def invalidate_sets(set_codes: Iterable[str]) -> int:
+    """Forget cached pools (memory and disk) whose query names one of set_codes, e.g. after new prints."""
+    tokens = {f"set:{code.lower()}" for code in set_codes}
+    def touches(query: str) -> bool:
+        return any(t in tokens for t in query.lower().replace("(", " ").split())
+    dropped = 0
+    with _lock:
+        for query in [q for q in _memory if touches(q)]:
+            _memory.pop(query, None)
+            _loaded_at.pop(query, None)
+    if os.path.isdir(POOL_DIR):
+        for name in os.listdir(POOL_DIR):
+            path = os.path.join(POOL_DIR, name)
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    query = json.load(fh).get("query", "")
+            except (OSError, ValueError):
+                continue
+            if touches(query):
+                os.remove(path)
+                dropped += 1
+    return dropped
+
+# =========================
+# Fetching
+# =========================
+
+def _session():
+    # one keep-alive session per thread; requests sessions are not meant to be shared
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        session = _local.session = requests.Session()
+        session.headers.update(HEADERS)
+    return session
+
+def _get_page(query: str, page: int) -> Optional[Dict[str, Any]]:
+    with _throttle_lock:
+        wait = _last_request[0] + MIN_REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request[0] = time.monotonic()
+    req = _session().get(SEARCH_URL, params={"q": query, "unique": "prints", "order": "set", "page": page}, timeout=30)
+    if req.status_code == 404:
+        # Scryfall answers "no cards found" with a 404
+        return None
+    req.raise_for_status()
+    return req.json()
+
+def fetch_pool_http(query: str) -> List[Dict[str, Any]]:
+    """All pages of /cards/search: page 1 tells us total_cards, the rest are fetched concurrently."""
+    first = _get_page(query, 1)
+    if not first:
+        return []
+    cards = [slim_card(c) for c in first.get("data", [])]
+    if not first.get("has_more"):
+        return cards
+    pages = math.ceil(first.get("total_cards", len(cards)) / PAGE_SIZE)
+    for page in _page_executor.map(lambda p: _get_page(query, p), range(2, pages + 1)):
+        if page:
+            cards.extend(slim_card(c) for c in page.get("data", []))
+    return cards
+
+def _read_disk(path: str, max_age: float) -> Optional[List[Dict[str, Any]]]:
+    try:
+        if time.time() - os.path.getmtime(path) > max_age:
+            return None
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)["cards"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_disk(path: str, query: str, cards: List[Dict[str, Any]]):
+    os.makedirs(POOL_DIR, exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"query": query, "cards": cards}, fh)
+    os.replace(tmp, path)
+
+def _load_uncached(query: str, refresh: bool, max_age: float) -> List[Dict[str, Any]]:
+    if _provider is not None:
+        return _provider(query)
+    path = pool_path(query)
+    cards = None if refresh else _read_disk(path, max_age)
+    if cards is None:
+        cards = fetch_pool_http(query)
+        _write_disk(path, query, cards)
+    return cards
+
+def load_pool(query: str, refresh: bool = False, max_age: float = POOL_TTL) -> List[Dict[str, Any]]:
+    """
+    Every card matching query. Memory → disk → provider/Scryfall.
+    Concurrent callers asking for the same query share one download.
+    """
+    query = " ".join(query.split())
+    with _lock:
+        hit = _memory.get(query)
+        fresh = hit is not None and time.time() - _loaded_at.get(query, 0.0) <= max_age
+        if fresh and not refresh:
+            return hit
+        future = _in_flight.get(query)
+        owner = future is None
+        if owner:
+            future = _in_flight[query] = Future()
+
+    if not owner:
+        return future.result()
+    try:
+        cards = _load_uncached(query, refresh, max_age)
+        with _lock:
+            _memory[query] = cards
+            _loaded_at[query] = time.time()
+        future.set_result(cards)
+        return cards
+    except BaseException as err:
+        future.set_exception(err)
+        raise
+    finally:
+        with _lock:
+            _in_flight.pop(query, None)
+
+def warm_pools(queries: Iterable[str], workers: int = PAGE_WORKERS):
+    """Load many pools at once (e.g. every query of a set's plan)."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(load_pool, list(queries)))
+
+# =========================
+# Local sampling for the online opener
+# =========================
+
+def sample_from_pool(query: str, rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
+    """One uniform pick from the query's pool — a local stand-in for /cards/random."""
+    try:
+        pool = load_pool(query)
+    except Exception as err:
+        print("[sample_from_pool] Error:", err, "| query:", query)
+        return None
+    if not pool:
+        return None
+    # copy: hooks tag cards with x_treatment and must not write into the cached pool
+    return dict((rng or random).choice(pool))
+
+def source_pool(query: str) -> Optional[List[Dict[str, Any]]]:
+    """The pool sample_from_pool draws from (booster.fetch_distinct picks among what is left of it)."""
+    try:
+        return load_pool(query)
+    except Exception as err:
+        print("[source_pool] Error:", err, "| query:", query)
+        return None
+
+def local_pool(query: str) -> Optional[List[Dict[str, Any]]]:
+    """The query's pool from memory or disk whatever its age, or None — never touches the network."""
+    query = " ".join(query.split())
+    with _lock:
+        hit = _memory.get(query)
+    if hit is not None:
+        return hit
+    if _provider is not None:
+        return _provider(query)
+    path = pool_path(query)
+    cards = _read_disk(path, float("inf"))
+    if cards is not None:
+        with _lock:
+            if query not in _memory:
+                # stamped with the file's age, so load_pool still refreshes a stale one
+                _memory[query] = cards
+                _loaded_at[query] = os.path.getmtime(path)
+    return cards
+
+def use_pool_source(set_codes: Iterable[str] = ()):
+    """Route open_booster through local pool sampling; pre-loads the pools of set_codes."""
+    import booster
+    from booster_plan import compile_plan, plan_queries
+
+    set_codes = list(set_codes)
+    snapshot = _provider is None and bool(set_codes)
+    installed: List[str] = []
+    if snapshot:
+        # a fresh warm-start snapshot fills memory without touching the per-query files
+        from warm_start import install_pools, save_pools
+        installed = install_pools(set_codes)
+    queries: List[str] = []
+    for code in set_codes:
+        queries.extend(q for q in plan_queries(compile_plan(code)) if q not in queries)
+    if queries:
+        warm_pools(queries)
+    missing = [code for code in set_codes if code not in installed]
+    if snapshot and missing:
+        save_pools(missing)
+    booster.set_card_source(sample_from_pool, takes_rng=True, pool=source_pool)
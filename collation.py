@@ -0,0 +1,160 @@
+# collation.py — print-sheet collation mode for the batched engine
+#
+#   python collation.py fin 200000        duplicates / colour spread: per-slot draws vs sheets
+#
+# Real boosters are not filled card by card: commons (and uncommons) are printed on sheets and a
+# pack gets a run of consecutive cards from a random start position. That keeps duplicates out of
+# a pack and spreads colours the way the sheet layout does. A set opts in from its set file:
+#
+#   [collation.common]
+#   layout = "color_stripes"   # color_stripes | shuffled | collector
+#   copies = 1                 # times each card is printed on the sheet
+#   run_length = 0             # consecutive cards per run; 0 = all of the kind's slots in one run
+#   start = "uniform"          # uniform | aligned (runs start at multiples of run_length)
+#   seed = 0                   # sheet layout seed
+#
+# Sheets are built once per compiled set from the kind's base pool (cached with it). sample_collated
+# cuts every pack's runs first: one start per run (taken from the first slot's card uniform, so no
+# extra randomness), one fancy index for every pack at once. sample_packs then fills those slots
+# from the runs instead of drawing from the pool (no per-card pick, no without-replacement
+# bookkeeping). Slots a hook took over, or that are absent (a bonus card replacing a common), are
+# drawn or skipped as usual; the remaining slots take the run's cards in order.
+
+import math
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from booster_engine import sample_packs, draw_uniforms
+from booster_plan import set_config
+
+COLOR_ORDER = ("W", "U", "B", "R", "G", "M", "C")
+
+# =========================
+# Sheets
+# =========================
+
+def _color_key(card: Dict[str, Any]) -> str:
+    colors = card.get("color_identity") or []
+    return colors[0] if len(colors) == 1 else ("M" if colors else "C")
+
+def _collector_key(card: Dict[str, Any]):
+    cn = card.get("collector_number") or ""
+    digits = "".join(ch for ch in cn if ch.isdigit())
+    return (int(digits) if digits else 0, cn)
+
+def build_sheet(members: np.ndarray, cards: List[Dict[str, Any]], layout: str = "color_stripes",
+                copies: int = 1, seed: int = 0) -> np.ndarray:
+    """Card indices in sheet order (the sheet wraps around)."""
+    rng = np.random.default_rng(seed)
+    members = np.asarray(members, dtype=np.int64)
+    if layout == "collector":
+        order = sorted(range(len(members)), key=lambda i: _collector_key(cards[members[i]]))
+        return np.tile(members[order], copies)
+    printed = np.repeat(members, copies)
+    if layout == "shuffled":
+        return rng.permutation(printed)
+    # color_stripes: shuffle within each colour, then deal one card per colour in turn, so any
+    # run of len(colours) consecutive cards holds every colour once
+    groups = {}
+    for i in rng.permutation(len(printed)):
+        groups.setdefault(_color_key(cards[printed[i]]), []).append(printed[i])
+    stripes = [groups[c] for c in COLOR_ORDER if c in groups]
+    out: List[int] = []
+    for k in range(max((len(g) for g in stripes), default=0)):
+        out.extend(g[k] for g in stripes if k < len(g))
+    return np.array(out, dtype=np.int64)
+
+def compile_sheets(compiled: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """kind → sheet + how packs are cut from it, for the kinds the set declares (cached)."""
+    cached = compiled["cache"].get("sheets")
+    if cached is not None:
+        return cached
+    declared = set_config(compiled["set_code"]).get("collation") or {}
+    sheets: Dict[str, Dict[str, Any]] = {}
+    for kind, spec in declared.items():
+        slots = [s for s, slot in enumerate(compiled["slots"]) if slot["kind"] == kind]
+        if not slots:
+            continue
+        first = compiled["slots"][slots[0]]
+        base = int(first["group_start"][-1])  # hook groups come first, the base pool last
+        offset, size = int(first["pool_offset"][base]), int(first["pool_size"][base])
+        if size == 0:
+            continue
+        members = compiled["pool_flat"][offset:offset + size]
+        sheet = build_sheet(members, compiled["cards"], spec.get("layout", "color_stripes"),
+                            int(spec.get("copies", 1)), int(spec.get("seed", 0)))
+        run = int(spec.get("run_length", 0)) or len(slots)
+        sheets[kind] = {
+            "sheet": sheet,
+            "slots": np.array(slots, dtype=np.intp),
+            "base_entry": base,
+            "run": run,
+            "runs": math.ceil(len(slots) / run),
+            "aligned": spec.get("start", "uniform") == "aligned",
+        }
+    compiled["cache"]["sheets"] = sheets
+    return sheets
+
+# =========================
+# Sampling
+# =========================
+
+def cut(sheet: Dict[str, Any], u: np.ndarray) -> np.ndarray:
+    """(n, runs) start uniforms → (n, runs * run) card indices, each run consecutive on the sheet."""
+    L, r = len(sheet["sheet"]), sheet["run"]
+    if sheet["aligned"] and L >= r:
+        starts = np.floor(u * (L // r)).astype(np.int64) * r
+    else:
+        starts = np.floor(u * L).astype(np.int64)
+    pos = (starts[:, :, None] + np.arange(r)) % L
+    return sheet["sheet"][pos].reshape(len(u), -1)
+
+def sample_collated(compiled: Dict[str, Any], n: Optional[int] = None,
+                    rng: Optional[np.random.Generator] = None,
+                    uniforms: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """sample_packs, with the declared kinds cut from print sheets (same output shape)."""
+    if uniforms is None:
+        uniforms = draw_uniforms(compiled, n, rng)
+    cut_slots = {}
+    for key, sheet in enumerate(compile_sheets(compiled).values()):
+        slots = sheet["slots"]
+        # the first slot of every run supplies that run's start
+        run_cards = cut(sheet, uniforms[:, slots[::sheet["run"]][:sheet["runs"]], 2])
+        cut_slots.update((int(s), (key, run_cards)) for s in slots)
+    return sample_packs(compiled, uniforms=uniforms, cut_slots=cut_slots)
+
+# =========================
+# Pack statistics
+# =========================
+
+def duplicate_rate(draws: Dict[str, np.ndarray], slots) -> float:
+    """Share of packs holding the same card twice among slots."""
+    cards = np.sort(draws["card"][:, slots], axis=1)
+    dup = ((cards[:, 1:] == cards[:, :-1]) & (cards[:, 1:] >= 0)).any(axis=1)
+    return float(dup.mean())
+
+def color_spread(compiled: Dict[str, Any], draws: Dict[str, np.ndarray], slots) -> float:
+    """Mean number of distinct colour groups among slots."""
+    key = np.array([COLOR_ORDER.index(_color_key(c)) for c in compiled["cards"]] + [len(COLOR_ORDER)])
+    colors = key[draws["card"][:, slots]]  # -1 (absent) picks the sentinel
+    seen = np.zeros((len(colors), len(COLOR_ORDER) + 1), dtype=bool)
+    np.put_along_axis(seen, colors, True, axis=1)
+    return float(seen[:, :len(COLOR_ORDER)].sum(axis=1).mean())
+
+if __name__ == "__main__":
+    import sys, time
+    from booster_engine import get_compiled
+    code = sys.argv[1] if len(sys.argv) > 1 else "fin"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    compiled = get_compiled(code)
+    sheets = compile_sheets(compiled)
+    if not sheets:
+        sys.exit(f"{code} declares no [collation] sheets")
+    for label, fn in (("per-slot", sample_packs), ("collated", sample_collated)):
+        t = time.perf_counter()
+        draws = fn(compiled, n, np.random.default_rng(0))
+        elapsed = time.perf_counter() - t
+        stats = ", ".join(f"{kind}: dup {duplicate_rate(draws, s['slots']):.4f} colours {color_spread(compiled, draws, s['slots']):.2f}"
+                          for kind, s in sheets.items())
+        print(f"{label:<12} {n / elapsed:>12,.0f} packs/s   {stats}")
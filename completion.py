@@ -0,0 +1,114 @@
+# completion.py — "how many packs to complete X?" simulator
+#
+# Opens packs for many independent trials at once until every card matching a target query
+# (same syntax as the registry tables, e.g. "set:fin is:booster r:rare") is owned. Ownership is
+# a packed bitset per trial: (trials x ceil(targets / 64)) uint64 words.
+
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from booster import build_query
+from booster_engine import get_compiled, sample_packs, pack_values
+from card_pools import load_pool
+
+# packs opened per trial per vectorized step
+BLOCK_PACKS = 16
+
+def target_bits(compiled: Dict[str, Any], query: str) -> Dict[str, Any]:
+    """Bit position of every target card in the set's card index (-1 = not a target)."""
+    targets = load_pool(build_query(raw_query=query))
+    bit = np.full(len(compiled["cards"]), -1, dtype=np.int64)
+    reachable, unreachable = [], []
+    for card in targets:
+        i = compiled["index"].get(card["id"])
+        if i is None:
+            unreachable.append(card)
+        elif bit[i] < 0:
+            bit[i] = len(reachable)
+            reachable.append(card)
+    return {"bit": bit, "cards": reachable, "unreachable": unreachable}
+
+def simulate_completion(set_code: str, query: str, trials: int = 1000,
+                        max_packs: int = 20_000, include_foil: bool = True,
+                        pack_price: Optional[float] = None,
+                        rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+    """
+    Distribution of packs (and money) needed to own every card matching query.
+    Cards matching the query that the set's packs can never contain are reported under
+    "unreachable" and left out of the target.
+    """
+    compiled = get_compiled(set_code)
+    rng = rng if rng is not None else np.random.default_rng()
+    pack_price = compiled["plan"]["msrp"] if pack_price is None else pack_price
+    targets = target_bits(compiled, query)
+    bit = targets["bit"]
+    n_bits = len(targets["cards"])
+    if n_bits == 0:
+        raise ValueError(f"no card matching {query!r} can be opened from {set_code} packs")
+
+    words = (n_bits + 63) // 64
+    full = np.full(words, np.uint64(0xFFFFFFFFFFFFFFFF), dtype=np.uint64)
+    if n_bits % 64:
+        full[-1] = np.uint64((1 << (n_bits % 64)) - 1)
+    slot_mask = None if include_foil else ~compiled["slot_foil"]
+
+    owned = np.zeros((trials, words), dtype=np.uint64)
+    packs_needed = np.full(trials, -1, dtype=np.int64)
+    value_opened = np.zeros(trials, dtype=np.float64)
+    active = np.arange(trials)
+    opened = 0
+
+    while active.size and opened < max_packs:
+        k = min(BLOCK_PACKS, max_packs - opened)
+        draws = sample_packs(compiled, active.size * k, rng)
+        values = pack_values(compiled, draws).reshape(active.size, k)
+        cards = draws["card"].reshape(active.size, k, -1)
+        if slot_mask is not None:
+            cards = cards[:, :, slot_mask]
+        bits = np.where(cards >= 0, bit[np.maximum(cards, 0)], -1)
+
+        done_at = np.full(active.size, -1, dtype=np.int64)
+        for j in range(k):
+            rows, cols = np.nonzero(bits[:, j, :] >= 0)
+            b = bits[rows, j, cols]
+            np.bitwise_or.at(owned, (active[rows], b >> 6), np.left_shift(np.uint64(1), (b & 63).astype(np.uint64)))
+            complete = (owned[active] == full).all(axis=1) & (done_at < 0)
+            done_at[complete] = j
+
+        finished = done_at >= 0
+        # value of the packs actually opened (up to and including the completing pack)
+        upto = np.where(finished, done_at + 1, k)
+        value_opened[active] += (values * (np.arange(k)[None, :] < upto[:, None])).sum(axis=1)
+        packs_needed[active[finished]] = opened + done_at[finished] + 1
+        active = active[~finished]
+        opened += k
+
+    done = packs_needed[packs_needed > 0]
+    q = np.quantile(done, [0.05, 0.25, 0.5, 0.75, 0.95]) if done.size else [np.nan] * 5
+    cost = done * pack_price
+    return {
+        "set_code": compiled["set_code"],
+        "query": query,
+        "targets": n_bits,
+        "unreachable": [c.get("name") for c in targets["unreachable"]],
+        "trials": trials,
+        "incomplete": int(trials - done.size),  # hit max_packs
+        "packs": {"mean": float(done.mean()) if done.size else float("nan"),
+                  "p05": float(q[0]), "p25": float(q[1]), "median": float(q[2]), "p75": float(q[3]), "p95": float(q[4])},
+        "pack_price": pack_price,
+        "cost_mean": float(cost.mean()) if done.size else float("nan"),
+        # what the opened cards are worth, so cost - value is the net price of the collection
+        "value_opened_mean": float(value_opened[packs_needed > 0].mean()) if done.size else float("nan"),
+        "packs_needed": packs_needed,
+    }
+
+if __name__ == "__main__":
+    import sys, time
+    code = sys.argv[1] if len(sys.argv) > 1 else "fin"
+    query = sys.argv[2] if len(sys.argv) > 2 else f"set:{code} is:booster r:rare"
+    t = time.perf_counter()
+    result = simulate_completion(code, query, trials=int(sys.argv[3]) if len(sys.argv) > 3 else 1000)
+    result.pop("packs_needed")
+    print(result)
+    print(f"{time.perf_counter() - t:.2f}s")
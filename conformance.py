@@ -0,0 +1,392 @@
+# conformance.py — do the fast engines still open the packs open_booster opens?
+#
+#   python conformance.py                          every REGISTRY set
+#   python conformance.py fin snc --packs 50000 --ref 5000 --seed 7
+#
+# The reference is open_booster + its hooks, card by card, drawing from the fixture pools below
+# through card_pools' pool source. Each engine opens the same set from the same pools:
+#   batched     — booster_engine.sample_packs
+#   collation   — collation.sample_collated (sets that declare [collation] sheets)
+#   analytical  — pull_rates / expected_value (no sampling)
+#   seeds       — seed_search.sample_seeds, which must open exactly open_booster's pack per seed
+# and is compared with the reference on
+#   tables      — picks per (table, entry index) from open_booster's draws log     chi-square
+#   pools       — cards per query pool (fixture ids name their pool), hooks too    chi-square
+#   treatments  — cards per treatment label                                        chi-square
+#   rarities    — cards per rarity                                                 chi-square
+#   values      — pack value distribution                                          two-sample KS
+#   expected    — (analytical) cards per rarity and EV vs the reference means     z-test
+#   cards       — (analytical) batched counts of every distinct-slot base-pool     chi-square
+#                 card vs pull_rates' expected copies (without-replacement slots);
+#                 "overlap cards" repeats it for base cards a hook entry can show too
+#   replay      — (seeds) packs differing from open_booster(rng=CounterRandom)    exact
+# A sheet run is not a uniform sample of its pool, so collation skips the value distribution.
+#
+# OVERLAP_SETS run a second time with overlapping_pool, where an exact cn: hook card (DSK Lurking
+# Evil) is a card of the base pool, as with real prints; labelled "<code>+overlap".
+#
+# Pools are made up from the query text (FIXTURE_SEED), never the network or the disk cache, and
+# every sampler runs from a fixed seed: a run is reproducible, so a failure (p below ALPHA) is a
+# drift to look at, not noise. The whole registry takes a few seconds; exit status 1 on failure.
+
+import re, math, random, hashlib
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+import booster
+import card_pools
+from booster_engine import compile_set, sample_packs, pack_values, RARITIES
+from booster_registry import REGISTRY
+
+FIXTURE_SEED = 20240601
+POOL_SIZES = (12, 90)          # cards per fixture pool (an exact cn: query holds one)
+ENGINE_PACKS = 50_000
+REFERENCE_PACKS = 5_000
+REPLAY_SEEDS = 200
+SEED = 1
+ALPHA = 1e-4                   # per test; ~100 tests over the registry
+MIN_EXPECTED = 5.0             # chi-square cells below this are pooled
+OVERLAP_SETS = ("dsk",)        # hook pools that overlap a distinct base pool
+
+FIXTURE_RARITIES = ("common", "uncommon", "rare", "mythic")
+RARITY_ALIASES = {"c": "common", "u": "uncommon", "r": "rare", "m": "mythic"}
+PRICE_MU = {"common": -2.5, "uncommon": -1.5, "rare": 0.0, "mythic": 1.0}
+
+# =========================
+# Fixture cards
+# =========================
+
+def fixture_pool(query: str) -> List[Dict[str, Any]]:
+    """A made-up pool for any query; the same query always gives the same cards."""
+    query = " ".join(query.split())
+    h = hashlib.sha1(f"{FIXTURE_SEED}:{query}".encode()).hexdigest()[:12]
+    r = random.Random(h)
+    found = re.search(r"\bset:(\w+)", query)
+    set_code = found.group(1) if found else "fx"
+    found = re.search(r"\b(?:r|rarity):(\w+)", query)
+    rarity = RARITY_ALIASES.get(found.group(1), found.group(1)) if found else None
+    # collector numbers honour cn ranges (bonus sheets re-check them on the card)
+    low = re.search(r"\bcn>=(\d+)", query)
+    high = re.search(r"\bcn<=(\d+)", query)
+    first = int(low.group(1)) if low else 1
+    size = 1 if re.search(r"\bcn:\S", query) else r.randint(*POOL_SIZES)
+    if high:
+        size = max(1, min(size, int(high.group(1)) - first + 1))
+    cards = []
+    for i in range(size):
+        rar = rarity or r.choice(FIXTURE_RARITIES)
+        eur = round(r.lognormvariate(PRICE_MU.get(rar, 0.0), 1.0), 2)
+        colors = r.choice([[], ["W"], ["U"], ["B"], ["R"], ["G"], sorted(r.sample("WUBRG", 2))])
+        cards.append({
+            "id": f"fx-{h}-{i}",
+            "name": f"Fixture {set_code.upper()} {h[:4]} {i}",
+            "set": set_code,
+            "collector_number": str(first + i),
+            "rarity": rar,
+            "color_identity": colors,
+            "type_line": "Creature",
+            "finishes": ["nonfoil", "foil"],
+            "prices": {"eur": str(eur), "eur_foil": str(round(eur * r.uniform(1.2, 3.0), 2)),
+                       "usd": str(round(eur * 1.1, 2)), "usd_foil": None},
+        })
+    return cards
+
+def overlapping_pool(query: str) -> List[Dict[str, Any]]:
+    """fixture_pool, except an exact cn: query gets its card from the same query's pool without cn."""
+    query = " ".join(query.split())
+    found = re.search(r"\bcn:(\d+)", query)
+    if found:
+        base = fixture_pool(re.sub(r"\s*\bcn:\d+", "", query, count=1))
+        if base:
+            return [dict(base[int(found.group(1)) % len(base)])]
+    return fixture_pool(query)
+
+def _pool_key(card: Dict[str, Any]) -> str:
+    return card["id"].rsplit("-", 1)[0]
+
+class fixture_pools:
+    """with fixture_pools(): every pool (engines and open_booster alike) is a fixture pool."""
+
+    def __init__(self, overlap: bool = False):
+        self.pool = overlapping_pool if overlap else fixture_pool
+
+    def __enter__(self):
+        self._provider = card_pools.pool_provider()
+        self._source = booster.card_source()
+        card_pools.set_pool_provider(self.pool)
+        card_pools.use_pool_source([])
+        return self
+
+    def __exit__(self, *exc):
+        source, takes_rng, pool = self._source
+        booster.set_card_source(source, takes_rng, pool)
+        card_pools.set_pool_provider(self._provider)
+        return False
+
+# =========================
+# Statistics (no scipy)
+# =========================
+
+def _gamma_q(a: float, x: float) -> float:
+    """Regularized upper incomplete gamma Q(a, x) (series below a + 1, continued fraction above)."""
+    if x <= 0:
+        return 1.0
+    log_front = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(10_000):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-14:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_front))
+    tiny = 1e-300
+    b = x + 1 - a
+    c, d = 1 / tiny, 1 / b
+    h = d
+    for i in range(1, 10_000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-14:
+            break
+    return min(1.0, math.exp(log_front) * h)
+
+def chi_square(a: Counter, b: Counter) -> Tuple[float, int, float]:
+    """(statistic, dof, p) for "a and b are counts from the same distribution" (2 x k table)."""
+    na, nb = sum(a.values()), sum(b.values())
+    if not na or not nb:
+        return 0.0, 0, 1.0
+    total = na + nb
+    cells: List[Tuple[float, float]] = []
+    pooled = [0.0, 0.0]
+    for key in sorted(set(a) | set(b), key=str):
+        x, y = a.get(key, 0), b.get(key, 0)
+        if (x + y) * min(na, nb) / total < MIN_EXPECTED:
+            pooled[0] += x
+            pooled[1] += y
+        else:
+            cells.append((x, y))
+    if sum(pooled):
+        cells.append((pooled[0], pooled[1]))
+    if len(cells) < 2:
+        return 0.0, 0, 1.0
+    stat = 0.0
+    for x, y in cells:
+        ea, eb = (x + y) * na / total, (x + y) * nb / total
+        stat += (x - ea) ** 2 / ea + (y - eb) ** 2 / eb
+    dof = len(cells) - 1
+    return stat, dof, _gamma_q(dof / 2.0, stat / 2.0)
+
+def goodness_of_fit(observed: np.ndarray, expected: np.ndarray) -> Tuple[float, int, float]:
+    """(statistic, dof, p) for "observed are counts with these expected values" (sparse cells pooled)."""
+    small = expected < MIN_EXPECTED
+    obs = list(observed[~small]) + ([observed[small].sum()] if small.any() else [])
+    exp = list(expected[~small]) + ([expected[small].sum()] if small.any() else [])
+    cells = [(o, e) for o, e in zip(obs, exp) if e > 0]
+    if not cells:
+        return 0.0, 0, 1.0
+    stat = float(sum((o - e) ** 2 / e for o, e in cells))
+    return stat, len(cells), _gamma_q(len(cells) / 2.0, stat / 2.0)
+
+def ks_two_sample(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+    """(D, p) of the two-sample Kolmogorov–Smirnov test, asymptotic p."""
+    x, y = np.sort(x), np.sort(y)
+    grid = np.concatenate([x, y])
+    d = float(np.abs(np.searchsorted(x, grid, side="right") / len(x)
+                     - np.searchsorted(y, grid, side="right") / len(y)).max())
+    ne = len(x) * len(y) / (len(x) + len(y))
+    lam = (math.sqrt(ne) + 0.12 + 0.11 / math.sqrt(ne)) * d
+    if lam < 0.2:
+        return d, 1.0
+    p = 2 * sum((-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam) for j in range(1, 101))
+    return d, min(1.0, max(0.0, p))
+
+def z_test(sample: np.ndarray, expected: float) -> Tuple[float, float]:
+    """(z, two-sided p) of sample's mean against an exact expectation."""
+    sd = float(np.std(sample, ddof=1)) if len(sample) > 1 else 0.0
+    diff = float(np.mean(sample)) - expected
+    if sd == 0.0:
+        return (0.0, 1.0) if abs(diff) < 1e-9 else (math.inf, 0.0)
+    z = diff / (sd / math.sqrt(len(sample)))
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+# =========================
+# Summaries
+# =========================
+
+def _summary() -> Dict[str, Any]:
+    return {"tables": Counter(), "pools": Counter(), "treatments": Counter(), "rarities": Counter()}
+
+def summarize_reference(set_code: str, packs: int, seed: int = SEED) -> Dict[str, Any]:
+    """Counts over packs opened with open_booster (call inside fixture_pools)."""
+    rng = random.Random(seed)
+    out = _summary()
+    values = np.zeros(packs)
+    per_pack = {r: np.zeros(packs) for r in RARITIES}
+    for i in range(packs):
+        draws: Dict[str, List[int]] = {}
+        cards, foil, bonus, _ = booster.open_booster(set_code, draws, rng)
+        for table, picks in draws.items():
+            out["tables"].update((table, k) for k in picks)
+        for card in [c for c in cards + [foil, bonus] if c]:
+            out["pools"][_pool_key(card)] += 1
+            out["treatments"][(card.get("x_treatment") or "").lower()] += 1
+            out["rarities"][card.get("rarity")] += 1
+            if card.get("rarity") in per_pack:
+                per_pack[card["rarity"]][i] += 1
+        values[i] = booster.pack_value(cards, foil, bonus)
+    out["values"], out["per_pack"] = values, per_pack
+    return out
+
+def summarize_draws(compiled: Dict[str, Any], draws: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """The same counts over engine draws (sample_packs output)."""
+    out = _summary()
+    card, entry, treat = draws["card"], draws["entry"], draws["treatment"]
+    keys = np.array([_pool_key(c) for c in compiled["cards"]])
+    labels = np.array([(t or "").lower() for t in compiled["treatments"]])
+    rarity = np.array([RARITIES[r] if r < len(RARITIES) else "" for r in compiled["rarity"]])
+    for s, slot in enumerate(compiled["slots"]):
+        picked = entry[:, s][entry[:, s] >= 0]
+        for e, n in zip(*np.unique(picked, return_counts=True)):
+            spec = slot["entries"][e]
+            if spec["table"] is not None:
+                out["tables"][(spec["table"], spec["index"])] += int(n)
+    shown = card >= 0
+    for name, values in (("pools", keys[card[shown]]), ("treatments", labels[treat[shown]]),
+                         ("rarities", rarity[card[shown]])):
+        out[name].update(dict(zip(*[a.tolist() for a in np.unique(values, return_counts=True)])))
+    out["values"] = pack_values(compiled, draws)
+    return out
+
+# =========================
+# Checks
+# =========================
+
+def _result(engine: str, check: str, stat: float, p: float, detail: str = "") -> Dict[str, Any]:
+    return {"engine": engine, "check": check, "stat": stat, "p": p, "ok": p >= ALPHA, "detail": detail}
+
+def compare(engine: str, ref: Dict[str, Any], got: Dict[str, Any], values: bool = True) -> List[Dict[str, Any]]:
+    results = []
+    for check in ("tables", "pools", "treatments", "rarities"):
+        if ref[check] or got[check]:
+            stat, dof, p = chi_square(ref[check], got[check])
+            results.append(_result(engine, check, stat, p, f"chi2 {stat:.1f} / {dof} dof"))
+    if values:
+        d, p = ks_two_sample(ref["values"], got["values"])
+        results.append(_result(engine, "values", d, p, f"D {d:.4f}"))
+    return results
+
+def compare_analytical(compiled: Dict[str, Any], ref: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from pull_rates import pull_rates, expected_value
+    table = pull_rates(compiled["set_code"], compiled)
+    results = []
+    for code, name in enumerate(RARITIES):
+        expected = float(table["expected"][compiled["rarity"] == code].sum())
+        if expected or ref["per_pack"][name].any():
+            z, p = z_test(ref["per_pack"][name], expected)
+            results.append(_result("analytical", f"expected {name}", z, p, f"z {z:+.2f}"))
+    ev = expected_value(compiled, table)
+    z, p = z_test(ref["values"], ev)
+    results.append(_result("analytical", "expected value", z, p, f"z {z:+.2f} (EV {ev:.3f})"))
+    return results
+
+def compare_cards(compiled: Dict[str, Any], draws: Dict[str, np.ndarray],
+                  members: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Batched copies of every card in a distinct slot's base pool (or of members, e.g. the
+    hook_overlap cards) vs pull_rates' expectation.
+    """
+    from pull_rates import pull_rates, distinct_rates
+    table = pull_rates(compiled["set_code"], compiled)
+    check = "cards" if members is None else "overlap cards"
+    if members is None:
+        base, _ = distinct_rates(compiled, np.zeros((len(compiled["slots"]), len(compiled["cards"]))))
+        members = np.flatnonzero(base.any(axis=0))
+    if not members.size:
+        return _result("analytical", check, 0.0, 1.0, "no distinct slots")
+    card = draws["card"]
+    counts = np.bincount(card[card >= 0], minlength=len(compiled["cards"]))
+    stat, dof, p = goodness_of_fit(counts[members].astype(float), table["expected"][members] * len(card))
+    return _result("analytical", check, stat, p, f"chi2 {stat:.1f} / {dof}")
+
+def hook_overlap(compiled: Dict[str, Any]) -> np.ndarray:
+    """Cards of a distinct slot's base pool that the slot's hook entries can also show."""
+    pool_flat, shared = compiled["pool_flat"], set()
+    for slot in compiled["slots"]:
+        if not slot.get("distinct"):
+            continue
+        base = int(slot["group_start"][-1])
+        pool = lambda e: pool_flat[slot["pool_offset"][e]:slot["pool_offset"][e] + slot["pool_size"][e]]
+        hooked = set(np.concatenate([pool(e) for e in range(base)]).tolist()) if base else set()
+        shared |= hooked & set(pool(base).tolist())
+    return np.array(sorted(shared), dtype=np.int64)
+
+def check_replay(compiled: Dict[str, Any], seed: int = SEED, seeds: int = REPLAY_SEEDS) -> Dict[str, Any]:
+    """seed_search's batched packs vs open_booster replaying the same seeds (exact, so p is 1 or 0)."""
+    import seed_search
+
+    start = seed * seeds
+    draws = seed_search.sample_seeds(compiled, np.arange(start, start + seeds, dtype=np.uint64))
+    bad = [start + row for row in range(seeds) if not seed_search.replays(compiled, draws, row, start + row)]
+    return _result("seeds", "replay", len(bad), 0.0 if bad else 1.0,
+                   f"{len(bad)}/{seeds} differ" + (f", first seed {bad[0]}" if bad else ""))
+
+def check_set(set_code: str, packs: int = ENGINE_PACKS, ref_packs: int = REFERENCE_PACKS,
+              seed: int = SEED) -> List[Dict[str, Any]]:
+    """Every engine against the reference for one set (call inside fixture_pools)."""
+    import collation
+
+    compiled = compile_set(set_code)
+    ref = summarize_reference(set_code, ref_packs, seed)
+    batched = sample_packs(compiled, packs, np.random.default_rng(seed))
+    results = compare("batched", ref, summarize_draws(compiled, batched))
+    if collation.compile_sheets(compiled):
+        draws = collation.sample_collated(compiled, packs, np.random.default_rng(seed))
+        results += compare("collation", ref, summarize_draws(compiled, draws), values=False)
+    results += compare_analytical(compiled, ref)
+    results.append(compare_cards(compiled, batched))
+    shared = hook_overlap(compiled)
+    if shared.size:
+        results.append(compare_cards(compiled, batched, shared))
+    results.append(check_replay(compiled, seed))
+    return results
+
+def run(codes: Optional[List[str]] = None, packs: int = ENGINE_PACKS, ref_packs: int = REFERENCE_PACKS,
+        seed: int = SEED, verbose: bool = False) -> bool:
+    codes = codes or [c for c in REGISTRY.codes() if not c.startswith("_")]
+    ok = True
+    for overlap, todo in ((False, codes), (True, [c for c in codes if c in OVERLAP_SETS])):
+        with fixture_pools(overlap):
+            for code in todo:
+                results = check_set(code, packs, ref_packs, seed)
+                failed = [r for r in results if not r["ok"]]
+                ok &= not failed
+                label = code + ("+overlap" if overlap else "")
+                print(f"{label:<12} {'ok' if not failed else 'FAIL'}  {len(results) - len(failed)}/{len(results)}")
+                for r in results if verbose else failed:
+                    print(f"   {r['engine']:<11} {r['check']:<18} p={r['p']:.2e}  {r['detail']}")
+    return ok
+
+if __name__ == "__main__":
+    import sys, time, argparse
+    parser = argparse.ArgumentParser(description="engines vs open_booster on fixture pools")
+    parser.add_argument("codes", nargs="*")
+    parser.add_argument("--packs", type=int, default=ENGINE_PACKS)
+    parser.add_argument("--ref", type=int, default=REFERENCE_PACKS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    t = time.perf_counter()
+    passed = run([c.lower() for c in args.codes], args.packs, args.ref, args.seed, args.verbose)
+    print(f"{'passed' if passed else 'FAILED'} in {time.perf_counter() - t:.1f}s")
+    sys.exit(0 if passed else 1)
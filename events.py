@@ -0,0 +1,180 @@
+# events.py — draft pods and sealed pools built from open_booster
+#
+#   python events.py draft 64 fin,fin,fin [seed] [out.json.gz]      64 players, 8 per pod, 3 packs each
+#   python events.py sealed 200 fin*6 [seed] [out.json.gz]          200 six-pack sealed pools
+#
+# A format is the list of set codes a player opens, in order ("fin,fin,fin", "mh3*6",
+# "dsk,dsk,fdn"). Every pack gets its own rng derived from (seed, table, seat, pack), so a seat's
+# packs are the same whatever the worker count, event size or order of generation: re-running an
+# event with its seed reproduces it exactly, and one seat can be regenerated on its own.
+#
+# Offline (the default) routes open_booster through card_pools, so after the first pool download
+# an event is pure local sampling.
+
+import os, json, gzip, random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+from booster import open_booster, pack_value
+
+POD_SIZE = 8
+DRAFT_FORMAT = 3
+SEALED_FORMAT = 6
+
+# =========================
+# Formats and seeds
+# =========================
+
+def parse_format(spec, default_packs: int = DRAFT_FORMAT) -> List[str]:
+    """"fin,fin,dft" / "fin*6" / "fin" / ["fin", "dft"] → one set code per pack."""
+    if not isinstance(spec, str):
+        return [c.lower() for c in spec]
+    codes: List[str] = []
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        code, _, times = part.partition("*")
+        codes.extend([code] * (int(times) if times else 1))
+    if len(codes) == 1 and "*" not in spec:
+        codes *= default_packs
+    if not codes:
+        raise ValueError(f"empty format {spec!r}")
+    return codes
+
+def seat_rng(seed: int, table: int, seat: int, pack: int) -> random.Random:
+    return random.Random(f"{seed}/{table}/{seat}/{pack}")
+
+# =========================
+# Generation
+# =========================
+
+def _open_all(jobs: List[tuple], seed: int, workers: int) -> List[tuple]:
+    """jobs are (table, seat, pack, set_code); returns open_booster results in job order."""
+    def one(job):
+        table, seat, pack, code = job
+        return open_booster(code, rng=seat_rng(seed, table, seat, pack))
+    if workers <= 1:
+        return [one(j) for j in jobs]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="event") as pool:
+        return list(pool.map(one, jobs, chunksize=16))
+
+def _use_offline(codes: Sequence[str]):
+    from card_pools import use_pool_source
+    use_pool_source(sorted(set(codes)))
+
+class _CardTable:
+    """Cards are stored once per event; packs refer to them by index."""
+
+    def __init__(self):
+        self.cards: List[Dict[str, Any]] = []
+        self.index: Dict[tuple, int] = {}
+
+    def add(self, card: Optional[Dict[str, Any]]) -> Optional[int]:
+        if not card:
+            return None
+        key = (card.get("id"), card.get("x_treatment"))
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.cards)
+            entry = {k: card.get(k) for k in ("id", "name", "set", "collector_number", "rarity")}
+            if card.get("x_treatment"):
+                entry["treatment"] = card["x_treatment"]
+            self.cards.append(entry)
+        return i
+
+def _compact_pack(table: _CardTable, code: str, opened) -> Dict[str, Any]:
+    booster, foil, bonus, _ = opened
+    out: Dict[str, Any] = {"set": code, "cards": [table.add(c) for c in booster if c]}
+    if foil:
+        out["foil"] = table.add(foil)
+    if bonus:
+        out["bonus"] = table.add(bonus)
+    out["value"] = round(pack_value(booster, foil, bonus), 2)
+    return out
+
+def generate_event(kind: str, players: int, fmt, seed: Optional[int] = None,
+                   pod_size: int = POD_SIZE, workers: int = 8, offline: bool = True) -> Dict[str, Any]:
+    """
+    kind "draft": players split into pods of pod_size (the last pod may be smaller).
+    kind "sealed": every player is their own table.
+    """
+    if kind not in ("draft", "sealed"):
+        raise ValueError(f"unknown event kind {kind!r}")
+    codes = parse_format(fmt, DRAFT_FORMAT if kind == "draft" else SEALED_FORMAT)
+    seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+    if offline:
+        _use_offline(codes)
+
+    size = pod_size if kind == "draft" else 1
+    seats = [(p // size, p % size) for p in range(players)]
+    jobs = [(t, s, k, code) for t, s in seats for k, code in enumerate(codes)]
+    opened = _open_all(jobs, seed, workers)
+
+    cards = _CardTable()
+    tables: List[Dict[str, Any]] = []
+    for (t, s, k, code), result in zip(jobs, opened):
+        if t == len(tables):
+            tables.append({"table": t, "seats": []})
+        seats_out = tables[t]["seats"]
+        if k == 0:
+            seats_out.append({"seat": s, "player": t * size + s, "packs": []})
+        seats_out[-1]["packs"].append(_compact_pack(cards, code, result))
+
+    return {"kind": kind, "seed": seed, "format": codes, "players": players,
+            "pod_size": size, "tables": tables, "cards": cards.cards}
+
+def draft_pods(players: int, fmt="fin", seed: Optional[int] = None, **kw) -> Dict[str, Any]:
+    return generate_event("draft", players, fmt, seed, **kw)
+
+def sealed_pools(players: int, fmt="fin", seed: Optional[int] = None, **kw) -> Dict[str, Any]:
+    return generate_event("sealed", players, fmt, seed, **kw)
+
+def regenerate_seat(event: Dict[str, Any], table: int, seat: int) -> List[tuple]:
+    """Re-opens one seat's packs from the event seed (audits, lost pools)."""
+    return [open_booster(code, rng=seat_rng(event["seed"], table, seat, k)) for k, code in enumerate(event["format"])]
+
+# =========================
+# Output
+# =========================
+
+def save_event(event: Dict[str, Any], path: str):
+    """Compact JSON (gzip if path ends with .gz): card table once, packs as card indices."""
+    data = json.dumps(event, separators=(",", ":")).encode("utf-8")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wb") as fh:
+        fh.write(data)
+
+def load_event(path: str) -> Dict[str, Any]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fh:
+        return json.loads(fh.read())
+
+def pool_list(event: Dict[str, Any], player: int) -> str:
+    """A player's whole pool as a deck-builder list ("2 Name (SET) 123")."""
+    size = event["pod_size"]
+    seat = event["tables"][player // size]["seats"][player % size]
+    counts: Dict[int, int] = {}
+    for pack in seat["packs"]:
+        for i in pack["cards"] + [pack[k] for k in ("foil", "bonus") if k in pack]:
+            counts[i] = counts.get(i, 0) + 1
+    lines = []
+    for i, n in sorted(counts.items(), key=lambda kv: event["cards"][kv[0]]["name"] or ""):
+        c = event["cards"][i]
+        lines.append(f"{n} {c['name']} ({(c['set'] or '').upper()}) {c['collector_number']}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import sys, time
+    kind = sys.argv[1] if len(sys.argv) > 1 else "draft"
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    fmt = sys.argv[3] if len(sys.argv) > 3 else "fin"
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    out = sys.argv[5] if len(sys.argv) > 5 else f"{kind}-{players}.json.gz"
+    t = time.perf_counter()
+    event = generate_event(kind, players, fmt, seed)
+    elapsed = time.perf_counter() - t
+    save_event(event, out)
+    packs = sum(len(s["packs"]) for tb in event["tables"] for s in tb["seats"])
+    print(f"{packs} packs for {players} players in {elapsed:.2f}s (seed {event['seed']}) → {out}")
@@ -0,0 +1,246 @@
+# hedged.py — deadline-bounded online opening: hedged /cards/random calls with local fallback
+#
+#   python hedged.py fin 20 [budget_s]       open 20 packs online, print latency percentiles
+#
+# Online, open_booster makes one /cards/random call per card, one after the other, so a single
+# slow response stalls the whole pack and a failed one leaves a hole in it. Routed through a
+# DeadlineSource (start_hedged), every card of a pack opened with open_booster_within shares one
+# latency budget:
+#
+#   0. with a prefetch.CardReservoir in front (use_online_source), a card already fetched in the
+#      background is handed out at once; the steps below only run when its queue is empty.
+#   1. the request goes out; when it has not answered after the hedge delay (p95 of recent
+#      latencies) an identical second request is sent and the first answer wins. Both are
+#      independent random draws for the same query, so taking the faster one does not bias the card.
+#      Hedges are capped at HEDGE_RATIO of all requests so a slow Scryfall is not hit twice as hard.
+#   2. nobody waits past the pack's deadline: what is still outstanding then comes from the query's
+#      local pool (card_pools memory/disk, any age), else from recent answers to the same query.
+#   3. only when there is nothing local at all (cold cache) does a card wait for its request, up to
+#      HARD_TIMEOUT — a pack is never returned with holes.
+#
+# The CLI's online mode (booster.main, "Draw live from Scryfall?") runs through use_online_source.
+#
+# Answers that arrive after their card was filled locally still feed the latency window and the
+# recent-answers cache, so a slow spell warms the fallback for the next packs.
+
+import time, random, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional, Callable, List, Iterable
+
+import booster
+from card_pools import local_pool
+
+PACK_BUDGET = 3.0          # seconds per pack (open_booster_within)
+CALL_BUDGET = 2.0          # seconds per card when no pack deadline is active
+HARD_TIMEOUT = 20.0        # the old flat timeout; only reached with no local fallback
+DEFAULT_HEDGE_DELAY = 0.3  # until LATENCY_WINDOW has enough samples
+MIN_HEDGE_DELAY = 0.05
+HEDGE_QUANTILE = 0.95
+HEDGE_RATIO = 0.1          # hedged requests per request, at most
+LATENCY_WINDOW = 256
+MIN_SAMPLES = 20
+RECENT_PER_QUERY = 32
+
+_deadline = threading.local()
+
+class LatencyWindow:
+    """Latencies of the last LATENCY_WINDOW successful requests."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class DeadlineSource:
+    """booster card source (query, rng) → card that never blocks past the current deadline."""
+
+    def __init__(self, fetch: Optional[Callable[[str, float], Optional[Dict[str, Any]]]] = None,
+                 workers: int = 8, hedge_ratio: float = HEDGE_RATIO, reservoir=None):
+        self._fetch = fetch or booster.fetch_random_card_http
+        self.reservoir = reservoir  # prefetch.CardReservoir, popped before any live request
+        self.latency = LatencyWindow()
+        self.hedge_ratio = hedge_ratio
+        self._recent: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedged")
+        self.counts = {"reserved": 0, "requests": 0, "hedges": 0, "online": 0, "local": 0, "recent": 0, "waited": 0, "failed": 0}
+
+    # ---- policy ----
+
+    def hedge_delay(self) -> float:
+        p = self.latency.quantile(HEDGE_QUANTILE)
+        return max(MIN_HEDGE_DELAY, p if p is not None else DEFAULT_HEDGE_DELAY)
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            c = self.counts
+            if c["hedges"] + 1 > self.hedge_ratio * c["requests"] + 1:
+                return False
+            c["hedges"] += 1
+            return True
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    # ---- requests ----
+
+    def _request(self, query: str) -> Optional[Dict[str, Any]]:
+        self._count("requests")
+        t = time.monotonic()
+        card = self._fetch(query, HARD_TIMEOUT)
+        if card is not None:
+            self.latency.add(time.monotonic() - t)
+            with self._lock:
+                self._recent.setdefault(query, deque(maxlen=RECENT_PER_QUERY)).append(card)
+        return card
+
+    def _first_answer(self, futures: List, timeout: float) -> Optional[Dict[str, Any]]:
+        """First non-None result among futures within timeout; None when they all failed or time ran out."""
+        end = time.monotonic() + timeout
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                return None
+            for future in done:
+                card = None if future.exception() else future.result()
+                if card is not None:
+                    return card
+        return None
+
+    # ---- fallback ----
+
+    def _local(self, query: str, rng: Optional[random.Random]) -> Optional[Dict[str, Any]]:
+        r = rng or random
+        try:
+            pool = local_pool(query)
+        except Exception:
+            pool = None
+        if pool:
+            self._count("local")
+            return dict(r.choice(pool))
+        with self._lock:
+            recent = list(self._recent.get(query, ()))
+        if recent:
+            self._count("recent")
+            return dict(r.choice(recent))
+        return None
+
+    # ---- the card source ----
+
+    def get(self, query: str, rng: Optional[random.Random] = None) -> Optional[Dict[str, Any]]:
+        if self.reservoir is not None:
+            card = self.reservoir.pop(query)
+            if card is not None:
+                self._count("reserved")
+                return card
+        deadline = getattr(_deadline, "at", None)
+        now = time.monotonic()
+        budget = (deadline - now) if deadline is not None else CALL_BUDGET
+        futures = []
+        if budget > 0:
+            futures.append(self._executor.submit(self._request, query))
+            delay = self.hedge_delay()
+            if delay < budget:
+                card = self._first_answer(futures, delay)
+                if card is not None:
+                    self._count("online")
+                    return card
+                if self._may_hedge():
+                    futures.append(self._executor.submit(self._request, query))
+            card = self._first_answer(futures, max(0.0, budget - (time.monotonic() - now)))
+            if card is not None:
+                self._count("online")
+                return card
+
+        card = self._local(query, rng)
+        if card is not None:
+            return card
+        # nothing local: a hole in the pack is worse than a late card
+        if not futures:
+            futures.append(self._executor.submit(self._request, query))
+        card = self._first_answer(futures, HARD_TIMEOUT)
+        self._count("waited" if card is not None else "failed")
+        return card
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counts)
+        out["hedge_delay"] = round(self.hedge_delay(), 3)
+        return out
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.reservoir is not None:
+            self.reservoir.close()
+
+# =========================
+# Opening
+# =========================
+
+def open_booster_within(set_code: str, budget: float = PACK_BUDGET, rng: Optional[random.Random] = None,
+                        draws: Optional[Dict[str, List[int]]] = None):
+    """open_booster with every card fetch of this pack bounded by one deadline (this thread only)."""
+    previous = getattr(_deadline, "at", None)
+    _deadline.at = time.monotonic() + budget
+    try:
+        return booster.open_booster(set_code, draws, rng)
+    finally:
+        _deadline.at = previous
+
+def start_hedged(**kwargs) -> DeadlineSource:
+    """Creates a DeadlineSource and routes open_booster's card fetches through it."""
+    source = DeadlineSource(**kwargs)
+    booster.set_card_source(source.get, takes_rng=True)
+    return source
+
+def use_online_source(set_codes: Iterable[str] = (), prefetch: bool = True, **kwargs) -> DeadlineSource:
+    """
+    The CLI's online mode: loads set_codes' pools first (memory/disk, else one /cards/search per
+    query) so every deadline has a local fallback, starts a CardReservoir filling for those sets
+    (prefetch) and routes card fetches through start_hedged.
+    """
+    from card_pools import use_pool_source
+    set_codes = list(set_codes)
+    use_pool_source(set_codes)
+    if prefetch and "reservoir" not in kwargs:
+        from prefetch import CardReservoir
+        kwargs["reservoir"] = reservoir = CardReservoir()
+        for code in set_codes:
+            reservoir.warm(code)
+    return start_hedged(**kwargs)
+
+def stop_hedged(source: DeadlineSource):
+    booster.set_card_source(None)
+    source.close()
+
+if __name__ == "__main__":
+    import sys
+    code = sys.argv[1] if len(sys.argv) > 1 else "fin"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    budget = float(sys.argv[3]) if len(sys.argv) > 3 else PACK_BUDGET
+    source = start_hedged()
+    times = []
+    try:
+        for _ in range(n):
+            t = time.perf_counter()
+            open_booster_within(code, budget)
+            times.append(time.perf_counter() - t)
+    finally:
+        stop_hedged(source)
+    times.sort()
+    pick = lambda q: times[min(len(times) - 1, int(q * len(times)))]
+    print(f"{n} packs: p50 {pick(0.5):.2f}s  p95 {pick(0.95):.2f}s  p99 {pick(0.99):.2f}s  max {times[-1]:.2f}s")
+    print(source.stats())
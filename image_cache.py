@@ -0,0 +1,341 @@
+# image_cache.py — local card images: bulk download, content-addressed disk cache, thumbnails
+#
+#   python image_cache.py warm fin [dft ...]     download every image a set's packs can show
+#   python image_cache.py stats | evict
+#
+# Images are keyed by card id. The bytes live once under IMAGE_DIR/blobs/<aa>/<sha256>.jpg
+# (reprints sharing art are stored once); index.json maps card id → blob per kind ("image" is
+# Scryfall's "normal" size, "thumb" the small preview) and keeps each blob's size and last use.
+# When the blobs pass max_bytes the least recently used ones go first.
+#
+# warm() downloads on a bounded thread pool, so a revealed pack's images are local reads only:
+# file()/read() never touch the network. Warming is opt-in: only service.py --images turns on
+# set_warm_on_load(True), after which every set booster_engine.get_compiled compiles is warmed in
+# the background (warm_loaded → warm_async, daemon threads that never hold up exit) and each pack
+# the service draws has its own art fetched first. Batch jobs and the CLI never download images.
+#
+# Thumbnails are made from the downloaded image with Pillow when it is installed; without it the
+# Scryfall "small" image is downloaded instead.
+
+import os, json, time, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Iterable
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".card_cache", "images")
+MAX_BYTES = 2 * 1024 ** 3
+IMAGE_WORKERS = 8
+IMAGE_SIZE = "normal"        # 488 x 680 JPEG
+THUMB_SIZE = "small"         # 146 x 204 JPEG, used when Pillow is missing
+THUMB_PX = (146, 204)
+THUMB_QUALITY = 80
+KINDS = ("image", "thumb")
+SAVE_EVERY = 50              # background warming saves the index this often
+
+_local = threading.local()
+
+def _pil():
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+def _session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        from card_pools import HEADERS
+        session = _local.session = requests.Session()
+        session.headers.update({**HEADERS, "Accept": "image/*"})
+    return session
+
+def image_url(card: Dict[str, Any], size: str = IMAGE_SIZE) -> Optional[str]:
+    """Front-face image of a card (double-faced cards keep theirs on card_faces)."""
+    uris = card.get("image_uris") or next((f.get("image_uris") for f in card.get("card_faces") or []
+                                           if f.get("image_uris")), None)
+    return (uris or {}).get(size)
+
+def make_thumbnail(data: bytes) -> Optional[bytes]:
+    Image = _pil()
+    if Image is None:
+        return None
+    import io
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        img.thumbnail(THUMB_PX)
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=THUMB_QUALITY, optimize=True)
+    return out.getvalue()
+
+# =========================
+# Cache
+# =========================
+
+class ImageCache:
+    def __init__(self, path: str = IMAGE_DIR, max_bytes: int = MAX_BYTES, workers: int = IMAGE_WORKERS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.cards: Dict[str, Dict[str, str]] = {}     # card id → {kind: blob}
+        self.blobs: Dict[str, List[float]] = {}        # blob → [size, last used]
+        self._load_index()
+
+    # ---- index ----
+
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), encoding="utf-8") as fh:
+                data = json.load(fh)
+            self.cards, self.blobs = data["cards"], data["blobs"]
+        except (OSError, ValueError, KeyError):
+            self.cards, self.blobs = {}, {}
+        # blobs removed behind our back are forgotten, not served
+        missing = {h for h in self.blobs if not os.path.exists(self._blob_path(h))}
+        if missing:
+            self._forget(missing)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({"cards": self.cards, "blobs": self.blobs}, separators=(",", ":"))
+            self._dirty = False
+        os.makedirs(self.path, exist_ok=True)
+        tmp = f"{self._index_path()}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(data)
+        os.replace(tmp, self._index_path())
+
+    def _forget(self, blobs: set):
+        for h in blobs:
+            self.blobs.pop(h, None)
+        for card_id in list(self.cards):
+            kinds = {k: h for k, h in self.cards[card_id].items() if h not in blobs}
+            if kinds:
+                self.cards[card_id] = kinds
+            else:
+                del self.cards[card_id]
+        self._dirty = True
+
+    # ---- blobs ----
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, "blobs", digest[:2], digest + ".jpg")
+
+    def _put(self, card_id: str, kind: str, data: bytes):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self.blobs[digest] = [len(data), time.time()]
+            self.cards.setdefault(card_id, {})[kind] = digest
+            self._dirty = True
+
+    # ---- local reads ----
+
+    def file(self, card_id: str, kind: str = "image") -> Optional[str]:
+        """Local file of a cached image (marks it used), or None. Never downloads."""
+        with self._lock:
+            digest = self.cards.get(card_id, {}).get(kind)
+            if digest is None or digest not in self.blobs:
+                return None
+            self.blobs[digest][1] = time.time()
+            self._dirty = True
+        return self._blob_path(digest)
+
+    def read(self, card_id: str, kind: str = "image") -> Optional[bytes]:
+        path = self.file(card_id, kind)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def has(self, card_id: str, kind: str = "image") -> bool:
+        with self._lock:
+            return kind in self.cards.get(card_id, {})
+
+    # ---- downloading ----
+
+    def fetch(self, card: Dict[str, Any]) -> bool:
+        """Image + thumbnail of one card; False when it has no image or the download failed."""
+        card_id = card.get("id")
+        url = image_url(card)
+        if not card_id or not url:
+            return False
+        try:
+            if not self.has(card_id):
+                req = _session().get(url, timeout=30)
+                req.raise_for_status()
+                self._put(card_id, "image", req.content)
+            if not self.has(card_id, "thumb"):
+                image = self.read(card_id)
+                thumb = make_thumbnail(image) if image else None
+                if thumb is None:
+                    small = image_url(card, THUMB_SIZE)
+                    if small:
+                        req = _session().get(small, timeout=30)
+                        req.raise_for_status()
+                        thumb = req.content
+                if thumb:
+                    self._put(card_id, "thumb", thumb)
+        except Exception as err:
+            print("[image_cache] Error:", err, "| card:", card_id)
+            return False
+        return True
+
+    def _missing(self, cards: Iterable[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        todo: Dict[str, Dict[str, Any]] = {}
+        for card in cards:
+            card_id = (card or {}).get("id")
+            if card_id and card_id not in todo and not (self.has(card_id) and self.has(card_id, "thumb")):
+                todo[card_id] = card
+        return list(todo.values())
+
+    def warm(self, cards: Iterable[Dict[str, Any]]) -> int:
+        """Downloads whatever of cards is not cached yet; returns how many were fetched."""
+        todo = self._missing(cards)
+        if not todo:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="images") as pool:
+            fetched = sum(pool.map(self.fetch, todo))
+        self.evict()
+        self.save()
+        return fetched
+
+    def warm_async(self, cards: Iterable[Optional[Dict[str, Any]]]) -> Optional[threading.Thread]:
+        """
+        warm() on daemon threads, returning the one to join (None when all is cached). The index
+        is saved every SAVE_EVERY images, so a process that exits mid-way keeps what it fetched.
+        """
+        missing = self._missing(cards)
+        if not missing:
+            return None
+        todo = iter(missing)
+        lock = threading.Lock()
+        done = [0]
+
+        def work():
+            while True:
+                with lock:
+                    card = next(todo, None)
+                if card is None:
+                    return
+                self.fetch(card)
+                with lock:
+                    done[0] += 1
+                    save = done[0] % SAVE_EVERY == 0
+                if save:
+                    self.save()
+
+        def run():
+            workers = [threading.Thread(target=work, daemon=True, name="images") for _ in range(self.workers)]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            self.evict()
+            self.save()
+
+        thread = threading.Thread(target=run, daemon=True, name="images-warm")
+        thread.start()
+        return thread
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return int(sum(size for size, _ in self.blobs.values()))
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Removes least recently used blobs until the cache fits; returns the bytes freed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            total = sum(size for size, _ in self.blobs.values())
+            if total <= limit:
+                return 0
+            doomed = set()
+            freed = 0
+            for digest, (size, _) in sorted(self.blobs.items(), key=lambda kv: kv[1][1]):
+                if total - freed <= limit:
+                    break
+                doomed.add(digest)
+                freed += size
+            self._forget(doomed)
+        for digest in doomed:
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+        return int(freed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            thumbs = sum(1 for kinds in self.cards.values() if "thumb" in kinds)
+            return {"cards": len(self.cards), "thumbs": thumbs, "blobs": len(self.blobs),
+                    "bytes": int(sum(size for size, _ in self.blobs.values())), "max_bytes": self.max_bytes}
+
+_default: Optional[ImageCache] = None
+_default_lock = threading.Lock()
+
+def get_cache() -> ImageCache:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ImageCache()
+        return _default
+
+_warm_on_load = False
+_warmed: set = set()
+
+def set_warm_on_load(on: bool = True):
+    """Turn background warming of every loaded set on or off (off by default: batch jobs never show art)."""
+    global _warm_on_load
+    _warm_on_load = on
+
+def warm_loaded(cards: Iterable[Optional[Dict[str, Any]]], key: Optional[str] = None) -> Optional[threading.Thread]:
+    """
+    Background warm of cards if warming on load is on; key (a set code) is warmed once per process.
+    Called when a set is compiled or its pools are loaded, and for the pack being revealed.
+    """
+    if not _warm_on_load:
+        return None
+    if key is not None:
+        with _default_lock:
+            if key in _warmed:
+                return None
+            _warmed.add(key)
+    return get_cache().warm_async(cards)
+
+def warm_set(set_code: str, cache: Optional[ImageCache] = None) -> int:
+    """Every card a set's packs can show (its compiled pools)."""
+    from booster_engine import get_compiled
+    return (cache or get_cache()).warm(get_compiled(set_code)["cards"])
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    cache = get_cache()
+    if args[:1] == ["warm"]:
+        for code in args[1:] or ["fin"]:
+            t = time.perf_counter()
+            n = warm_set(code.lower(), cache)
+            print(f"{code}: {n} images in {time.perf_counter() - t:.1f}s")
+        print(cache.stats())
+    elif args[:1] == ["stats"]:
+        print(cache.stats())
+    elif args[:1] == ["evict"]:
+        print(f"freed {cache.evict()} bytes")
+        cache.save()
+    else:
+        print("usage: image_cache.py warm <codes...> | stats | evict")
@@ -0,0 +1,265 @@
+# pack_archive.py — raw simulated packs as a columnar Parquet dataset
+#
+#   python pack_archive.py fin 1000000 archive/fin      write 1M FIN packs
+#   python pack_archive.py --check                      write → filtered read round trip on fixture pools
+#
+# One row per card actually in a pack (absent slots are not stored):
+#   pack      uint64   pack id, increasing in write order
+#   slot      uint8    index into the compiled plan's slots
+#   entry     int16    table entry inside the slot
+#   card      uint32   index into cards.parquet
+#   foil      bool
+#   treatment dictionary<uint8, string>
+#
+# Layout of an archive directory:
+#   cards.parquet        the dictionary: card index → id, name, set, cn, rarity, prices
+#   meta.json            set code, slot labels, pack count, seed
+#   packs/part-NNNNN.parquet
+#
+# Packs are sampled CHUNK_PACKS at a time and written as row groups, so memory stays flat no matter
+# how many packs go in. Rows are in pack order and every row group keeps min/max statistics, so
+# filters on pack / slot / card (pyarrow.dataset expressions) skip whole row groups and files.
+#
+# pyarrow is optional (requirements.txt): only this module needs it, and only when an archive is
+# written or read. --check skips itself without it.
+
+import os, json
+from typing import Dict, Any, List, Optional, Iterable
+
+import numpy as np
+
+from booster_engine import get_compiled, sample_packs, CHUNK_PACKS
+
+ROW_GROUP_PACKS = CHUNK_PACKS
+PACKS_PER_FILE = 20 * CHUNK_PACKS
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.dataset as ds
+    except ImportError as err:
+        raise ImportError("pack archives need pyarrow (pip install pyarrow)") from err
+    return pa, pq, ds
+
+# =========================
+# Writing
+# =========================
+
+class PackArchiveWriter:
+    """Appends sample_packs() batches of one compiled set to an archive directory."""
+
+    def __init__(self, path: str, set_code: str, seed: Optional[int] = None,
+                 compiled: Optional[Dict[str, Any]] = None):
+        self.pa, self.pq, _ = _pyarrow()
+        self.path = path
+        self.compiled = compiled if compiled is not None else get_compiled(set_code)
+        self.seed = seed
+        self.packs = 0
+        self._file_packs = 0
+        self._part = 0
+        self._writer = None
+        treatments = [t or "" for t in self.compiled["treatments"]]
+        self._treatments = self.pa.array(treatments, type=self.pa.string())
+        self.schema = self.pa.schema([
+            ("pack", self.pa.uint64()),
+            ("slot", self.pa.uint8()),
+            ("entry", self.pa.int16()),
+            ("card", self.pa.uint32()),
+            ("foil", self.pa.bool_()),
+            ("treatment", self.pa.dictionary(self.pa.uint8(), self.pa.string())),
+        ])
+        os.makedirs(os.path.join(path, "packs"), exist_ok=True)
+        self._write_cards()
+
+    def _write_cards(self):
+        pa, compiled = self.pa, self.compiled
+        cards = compiled["cards"]
+        table = pa.table({
+            "card": pa.array(np.arange(len(cards), dtype=np.uint32)),
+            "id": pa.array([c["id"] for c in cards]),
+            "name": pa.array([c.get("name", "") for c in cards]).dictionary_encode(),
+            "set": pa.array([c.get("set", "") for c in cards]).dictionary_encode(),
+            "collector_number": pa.array([c.get("collector_number", "") for c in cards]),
+            "rarity": pa.array([c.get("rarity", "") for c in cards]).dictionary_encode(),
+            "price": pa.array(compiled["price"]),
+            "price_foil": pa.array(compiled["price_foil"]),
+        })
+        self.pq.write_table(table, os.path.join(self.path, "cards.parquet"))
+
+    def _next_file(self):
+        if self._writer is not None:
+            self._writer.close()
+        name = os.path.join(self.path, "packs", f"part-{self._part:05d}.parquet")
+        self._writer = self.pq.ParquetWriter(name, self.schema, compression="zstd")
+        self._part += 1
+        self._file_packs = 0
+
+    def write(self, draws: Dict[str, np.ndarray]):
+        """One batch of packs (sample_packs output); pack ids continue from the previous batch."""
+        card = draws["card"]
+        n, S = card.shape
+        pack_idx, slot_idx = np.nonzero(card >= 0)  # row-major: pack order, slot order inside
+        pa = self.pa
+        table = pa.Table.from_arrays([
+            pa.array((pack_idx + self.packs).astype(np.uint64)),
+            pa.array(slot_idx.astype(np.uint8)),
+            pa.array(draws["entry"][pack_idx, slot_idx]),
+            pa.array(card[pack_idx, slot_idx].astype(np.uint32)),
+            pa.array(self.compiled["slot_foil"][slot_idx]),
+            pa.DictionaryArray.from_arrays(pa.array(draws["treatment"][pack_idx, slot_idx].astype(np.uint8)),
+                                           self._treatments),
+        ], schema=self.schema)
+        if self._writer is None or self._file_packs >= PACKS_PER_FILE:
+            self._next_file()
+        self._writer.write_table(table, row_group_size=max(1, len(table)))
+        self.packs += n
+        self._file_packs += n
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        meta = {
+            "set_code": self.compiled["set_code"],
+            "packs": self.packs,
+            "seed": self.seed,
+            "slots": [s["label"] for s in self.compiled["slots"]],
+            "slot_foil": self.compiled["slot_foil"].tolist(),
+            "treatments": [t or "" for t in self.compiled["treatments"]],
+        }
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_archive(set_code: str, n: int, path: str, seed: Optional[int] = None,
+                  chunk: int = ROW_GROUP_PACKS) -> Dict[str, Any]:
+    """Samples n packs in chunks and streams them into a new archive."""
+    rng = np.random.default_rng(seed)
+    with PackArchiveWriter(path, set_code, seed) as writer:
+        done = 0
+        while done < n:
+            k = min(chunk, n - done)
+            writer.write(sample_packs(writer.compiled, k, rng))
+            done += k
+    return {"path": path, "packs": n, "files": writer._part}
+
+# =========================
+# Reading
+# =========================
+
+def open_archive(path: str):
+    """pyarrow.dataset over the pack files (lazy; nothing is read until scanned)."""
+    _, _, ds = _pyarrow()
+    return ds.dataset(os.path.join(path, "packs"), format="parquet")
+
+def read_cards(path: str):
+    _, pq, _ = _pyarrow()
+    return pq.read_table(os.path.join(path, "cards.parquet"))
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+        return json.load(fh)
+
+def card_indices(path: str, names: Iterable[str] = (), ids: Iterable[str] = ()) -> List[int]:
+    """Card-table indices of names (any print) and/or Scryfall ids, to filter pack rows on."""
+    cards = read_cards(path).to_pydict()
+    names, ids = set(names), set(ids)
+    return [i for i, (name, cid) in enumerate(zip(cards["name"], cards["id"])) if name in names or cid in ids]
+
+def scan(path: str, columns: Optional[List[str]] = None, filter=None,
+         packs: Optional[range] = None, slots: Optional[Iterable[int]] = None,
+         cards: Optional[Iterable[int]] = None, foil: Optional[bool] = None):
+    """
+    Table of matching rows. Convenience filters are ANDed with filter (a pyarrow.dataset
+    expression) and pushed down to the Parquet reader.
+    """
+    _, _, ds = _pyarrow()
+    expr = filter
+    terms = []
+    if packs is not None:
+        terms += [ds.field("pack") >= packs.start, ds.field("pack") < packs.stop]
+    if slots is not None:
+        terms.append(ds.field("slot").isin(list(slots)))
+    if cards is not None:
+        terms.append(ds.field("card").isin(list(cards)))
+    if foil is not None:
+        terms.append(ds.field("foil") == foil)
+    for term in terms:
+        expr = term if expr is None else expr & term
+    return open_archive(path).to_table(columns=columns, filter=expr)
+
+def packs_containing(path: str, card_idx: Iterable[int]) -> np.ndarray:
+    """Distinct pack ids holding any of the given card indices."""
+    table = scan(path, columns=["pack"], cards=card_idx)
+    return np.unique(table.column("pack").to_numpy())
+
+# =========================
+# Round trip check
+# =========================
+
+def check_round_trip(set_code: str = "fin", n: int = 2000, seed: int = 1) -> List[str]:
+    """
+    Writes n packs of set_code from the conformance fixture pools, reads them back through scan's
+    filters and compares with the same draws kept in memory. Returns what differs (empty = ok).
+    """
+    import tempfile
+    from conformance import fixture_pools
+    from booster_engine import compile_set
+
+    problems: List[str] = []
+    with fixture_pools(), tempfile.TemporaryDirectory() as path:
+        compiled = compile_set(set_code)
+        draws = sample_packs(compiled, n, np.random.default_rng(seed))
+        with PackArchiveWriter(path, set_code, seed, compiled) as writer:
+            writer.write(draws)
+        card = draws["card"]
+
+        def expect(label: str, got, want):
+            if got != want:
+                problems.append(f"{label}: read {got}, wrote {want}")
+
+        expect("packs", read_meta(path)["packs"], n)
+        expect("rows", scan(path, columns=["pack"]).num_rows, int((card >= 0).sum()))
+        lo, hi = n // 4, n // 2
+        expect("pack range", scan(path, columns=["pack"], packs=range(lo, hi)).num_rows,
+               int((card[lo:hi] >= 0).sum()))
+        foil = compiled["slot_foil"][None, :] & (card >= 0)
+        expect("foil rows", scan(path, columns=["card"], foil=True).num_rows, int(foil.sum()))
+        target = int(np.bincount(card[card >= 0]).argmax())
+        expect("packs with card", packs_containing(path, [target]).tolist(),
+               np.flatnonzero((card == target).any(axis=1)).tolist())
+        slot = int(np.argmax((card >= 0).sum(axis=0)))
+        rows = scan(path, columns=["pack", "card"], slots=[slot])
+        kept = np.flatnonzero(card[:, slot] >= 0)
+        expect(f"slot {slot} packs", rows.column("pack").to_numpy().tolist(), kept.tolist())
+        expect(f"slot {slot} cards", rows.column("card").to_numpy().tolist(), card[kept, slot].tolist())
+    return problems
+
+if __name__ == "__main__":
+    import sys, time
+    try:
+        _pyarrow()
+    except ImportError as err:
+        if sys.argv[1:2] == ["--check"]:
+            print("[pack_archive] skipped:", err)
+            sys.exit(0)
+        print("[pack_archive] Error:", err)
+        sys.exit(1)
+    if sys.argv[1:2] == ["--check"]:
+        problems = check_round_trip()
+        for problem in problems:
+            print("  ", problem)
+        print("round trip", "FAILED" if problems else "ok")
+        sys.exit(1 if problems else 0)
+    code = sys.argv[1] if len(sys.argv) > 1 else "fin"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    out = sys.argv[3] if len(sys.argv) > 3 else os.path.join("archive", code)
+    t = time.perf_counter()
+    print(write_archive(code, n, out))
+    print(f"{n} packs in {time.perf_counter() - t:.2f}s")
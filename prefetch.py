@@ -0,0 +1,126 @@
+# prefetch.py — background reservoir of pre-fetched random cards for online mode
+#
+# Keeps a small FIFO of /cards/random results per query (one query per pool / table entry) and
+# refills it on a thread pool while the user is looking at the current pack, so opening a pack is
+# mostly local pops. The CLI's online mode (hedged.use_online_source) puts it in front of the
+# DeadlineSource: a queued card is taken with pop(), and only an empty queue costs a live,
+# deadline-bounded request. start_prefetch routes open_booster through it on its own instead.
+#
+# Fairness: every stored card is an independent random draw for its query and is handed out
+# exactly once, in arrival order. Nothing is ever re-used or filtered, so the cards a pack gets
+# have the same distribution as calling /cards/random directly. When a queue is empty we make a
+# fresh synchronous call instead of waiting for / duplicating a queued card.
+
+import math, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, Iterable
+
+import booster
+from booster_plan import compile_plan
+
+# Scryfall asks for 50–100 ms between requests
+MIN_REQUEST_INTERVAL = 0.1
+
+class CardReservoir:
+    def __init__(self, packs_ahead: int = 2, max_per_query: int = 16, workers: int = 4,
+                 fetch: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None):
+        self.packs_ahead = packs_ahead
+        self.max_per_query = max_per_query
+        self._fetch = fetch or booster.fetch_random_card_http
+        self._queues: Dict[str, deque] = {}
+        self._capacity: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._throttle_lock = threading.Lock()
+        self._last_request = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._closed = False
+
+    # ---- sizing ----
+
+    def warm(self, set_code: str):
+        """Size and start filling the queues for every query a set's packs can draw from."""
+        demand: Dict[str, float] = {}
+        for slot in compile_plan(set_code)["slots"]:
+            for group in slot["groups"]:
+                total = sum(e["weight"] for e in group["entries"]) or 1.0
+                for e in group["entries"]:
+                    demand[e["query"]] = demand.get(e["query"], 0.0) + group["p"] * e["weight"] / total
+        for query, uses in demand.items():
+            self.reserve(query, math.ceil(uses * self.packs_ahead))
+
+    def reserve(self, query: str, capacity: int):
+        capacity = max(1, min(self.max_per_query, capacity))
+        with self._lock:
+            self._queues.setdefault(query, deque())
+            self._capacity[query] = max(capacity, self._capacity.get(query, 0))
+        self._top_up(query)
+
+    # ---- drawing ----
+
+    def pop(self, query: str) -> Optional[Dict[str, Any]]:
+        """The oldest queued card for query, or None without waiting; either way the queue refills."""
+        with self._lock:
+            queue = self._queues.setdefault(query, deque())
+            self._capacity.setdefault(query, 1)
+            card = queue.popleft() if queue else None
+        self._top_up(query)
+        return card
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        card = self.pop(query)
+        if card is None:
+            card = self._request(query)
+        return card
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {q: len(d) for q, d in self._queues.items()}
+
+    def close(self):
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---- refilling ----
+
+    def _top_up(self, query: str):
+        with self._lock:
+            if self._closed:
+                return
+            missing = self._capacity[query] - len(self._queues[query]) - self._in_flight.get(query, 0)
+            if missing <= 0:
+                return
+            self._in_flight[query] = self._in_flight.get(query, 0) + missing
+        for _ in range(missing):
+            self._executor.submit(self._refill, query)
+
+    def _refill(self, query: str):
+        card = None
+        try:
+            card = self._request(query)
+        finally:
+            with self._lock:
+                self._in_flight[query] -= 1
+                if card is not None:
+                    self._queues[query].append(card)
+
+    def _request(self, query: str) -> Optional[Dict[str, Any]]:
+        with self._throttle_lock:
+            wait = self._last_request + MIN_REQUEST_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+        return self._fetch(query)
+
+def start_prefetch(set_codes: Iterable[str], **kwargs) -> CardReservoir:
+    """Creates a reservoir, warms it for set_codes and routes open_booster through it."""
+    reservoir = CardReservoir(**kwargs)
+    for code in set_codes:
+        reservoir.warm(code)
+    booster.set_card_source(reservoir.get)
+    return reservoir
+
+def stop_prefetch(reservoir: CardReservoir):
+    booster.set_card_source(None)
+    reservoir.close()
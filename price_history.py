@@ -0,0 +1,251 @@
+# price_history.py — compressed daily price snapshots and EV-over-time queries
+#
+#   python price_history.py record [YYYY-MM-DD]        snapshot the current price store
+#   python price_history.py ev fin [start] [end]        pack EV of one set per recorded day
+#   python price_history.py ev all [start] [end]        every REGISTRY set
+#
+# Layout under HISTORY_DIR:
+#   index.json             {"days": [...], "keyframe_every": K}
+#   days/<YYYY-MM-DD>.bin  one JSON header line, then one zlib block per card set
+#
+# Rows are price-store rows (append-only, so a row means the same card forever). Each block holds
+# the set's rows and its four price columns as int32 cents (MISSING = no price). Every K-th day is
+# a keyframe with absolute cents; the days between store the difference to the previous day, which
+# is mostly zeros and compresses to almost nothing. A query for one set decompresses only that
+# set's blocks (plus the sets its packs draw from), starting at the keyframe before the range.
+
+import os, json, zlib, datetime
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from price_store import PriceStore, COLUMNS, COLUMN_INDEX, get_store
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".card_cache", "history")
+
+KEYFRAME_EVERY = 7
+MISSING = np.int32(-1)
+
+# =========================
+# Encoding
+# =========================
+
+def to_cents(columns: np.ndarray) -> np.ndarray:
+    cents = np.rint(np.nan_to_num(columns, nan=-0.01) * 100).astype(np.int32)
+    return np.where(np.isnan(columns), MISSING, cents).astype(np.int32)
+
+def from_cents(cents: np.ndarray) -> np.ndarray:
+    return np.where(cents == MISSING, np.nan, cents / 100.0).astype(np.float32)
+
+def _encode_block(rows: np.ndarray, cents: np.ndarray, base: Optional[Tuple[np.ndarray, np.ndarray]]) -> bytes:
+    # rows are sorted; a set only ever gains rows, so the base rows are a prefix of these
+    row_deltas = np.diff(rows, prepend=0).astype(np.uint32)
+    values = cents.astype(np.int64)
+    if base is not None:
+        n = len(base[0])
+        values[:, :n] -= base[1]
+    payload = np.int32(len(rows)).tobytes() + row_deltas.tobytes() + values.astype(np.int32).tobytes()
+    return zlib.compress(payload, 6)
+
+def _decode_block(blob: bytes, base: Optional[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    raw = zlib.decompress(blob)
+    n = int(np.frombuffer(raw, dtype=np.int32, count=1)[0])
+    rows = np.cumsum(np.frombuffer(raw, dtype=np.uint32, count=n, offset=4).astype(np.int64))
+    values = np.frombuffer(raw, dtype=np.int32, offset=4 + 4 * n).reshape(len(COLUMNS), n).astype(np.int64)
+    if base is not None:
+        values[:, :len(base[0])] += base[1]
+    return rows, values.astype(np.int32)
+
+# =========================
+# Archive
+# =========================
+
+class PriceHistory:
+    def __init__(self, path: str = HISTORY_DIR):
+        self.path = path
+        self.days: List[str] = []
+        self.keyframe_every = KEYFRAME_EVERY
+        try:
+            with open(os.path.join(path, "index.json"), encoding="utf-8") as fh:
+                meta = json.load(fh)
+            self.days = meta["days"]
+            self.keyframe_every = meta.get("keyframe_every", KEYFRAME_EVERY)
+        except (OSError, ValueError, KeyError):
+            pass
+        # last decoded state per set, so sequential days never re-walk the delta chain
+        self._state: Dict[str, Tuple[str, Tuple[np.ndarray, np.ndarray]]] = {}
+
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.path, "days", f"{day}.bin")
+
+    def is_keyframe(self, day: str) -> bool:
+        return self.days.index(day) % self.keyframe_every == 0
+
+    def _header(self, day: str) -> Tuple[Dict[str, Any], int]:
+        with open(self._day_path(day), "rb") as fh:
+            line = fh.readline()
+        return json.loads(line), len(line)
+
+    def _read_blob(self, day: str, set_code: str) -> Optional[bytes]:
+        header, start = self._header(day)
+        block = header["blocks"].get(set_code)
+        if block is None:
+            return None
+        with open(self._day_path(day), "rb") as fh:
+            fh.seek(start + block[0])
+            return fh.read(block[1])
+
+    # ---- writing ----
+
+    def record(self, store: PriceStore, day: Optional[str] = None):
+        """Append the store's current prices as one day (re-recording the last day replaces it)."""
+        day = day or datetime.date.today().isoformat()
+        if self.days and day < self.days[-1]:
+            raise ValueError(f"history already has {self.days[-1]}; days must be recorded in order")
+        if self.days and day == self.days[-1]:
+            self.days.pop()
+        keyframe = len(self.days) % self.keyframe_every == 0
+        prev = self.days[-1] if self.days else None
+
+        cents = to_cents(np.asarray(store.columns))
+        sets = np.char.decode(np.asarray(store.sets), "ascii")
+        order = np.argsort(sets, kind="stable")
+        codes, starts = np.unique(sets[order], return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+
+        blocks: Dict[str, List[int]] = {}
+        blobs: List[bytes] = []
+        offset = 0
+        for code, lo, hi in zip(codes.tolist(), starts, bounds):
+            rows = order[lo:hi]
+            base = None if keyframe or prev is None else self.block(prev, code)
+            blob = _encode_block(rows, cents[:, rows], base)
+            blocks[code] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+
+        os.makedirs(os.path.join(self.path, "days"), exist_ok=True)
+        tmp = self._day_path(day) + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(json.dumps({"day": day, "keyframe": keyframe, "store_version": store.version,
+                                 "blocks": blocks}).encode("utf-8") + b"\n")
+            for blob in blobs:
+                fh.write(blob)
+        os.replace(tmp, self._day_path(day))
+        self.days.append(day)
+        self._state.clear()
+        self._save_index()
+
+    def _save_index(self):
+        tmp = os.path.join(self.path, "index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"days": self.days, "keyframe_every": self.keyframe_every}, fh)
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+
+    # ---- reading ----
+
+    def block(self, day: str, set_code: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(rows, cents[4, n]) of one set on one day; walks forward from the nearest keyframe."""
+        i = self.days.index(day)
+        state = self._state.get(set_code)
+        if state is not None and state[0] == day:
+            return state[1]
+        if state is not None and state[0] in self.days and self.days.index(state[0]) < i \
+                and i - self.days.index(state[0]) <= i % self.keyframe_every:
+            start, current = self.days.index(state[0]) + 1, state[1]
+        else:
+            start, current = i - i % self.keyframe_every, None
+        for d in self.days[start:i + 1]:
+            blob = self._read_blob(d, set_code)
+            if blob is None:
+                current = None
+                continue
+            current = _decode_block(blob, None if self.is_keyframe(d) else current)
+        if current is not None:
+            self._state[set_code] = (day, current)
+        return current
+
+    def days_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        return [d for d in self.days if (start is None or d >= start) and (end is None or d <= end)]
+
+    def prices(self, day: str, card_sets: Iterable[str], rows: np.ndarray) -> np.ndarray:
+        """float32 (len(COLUMNS), len(rows)) for store rows on day; NaN where unknown then."""
+        out = np.full((len(COLUMNS), len(rows)), np.nan, dtype=np.float32)
+        for code in card_sets:
+            got = self.block(day, code)
+            if got is None:
+                continue
+            block_rows, cents = got
+            if not len(block_rows):
+                continue
+            pos = np.clip(np.searchsorted(block_rows, rows), 0, len(block_rows) - 1)
+            hit = block_rows[pos] == rows
+            out[:, hit] = from_cents(cents[:, pos[hit]])
+        return out
+
+# =========================
+# EV over time
+# =========================
+
+class _DayPrices:
+    """Stands in for the price store in ValuationPolicy.vectors: one recorded day's columns."""
+
+    def __init__(self, prices: np.ndarray):
+        self.prices = prices
+
+    def gather(self, rows: np.ndarray, name: str) -> np.ndarray:
+        return self.prices[COLUMN_INDEX[name]]
+
+def iter_ev(set_code: str, start: Optional[str] = None, end: Optional[str] = None,
+            history: Optional[PriceHistory] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Pack EV for each recorded day in [start, end], reusing the compiled set and its exact pull
+    rates: only the price vectors change from day to day. Cards are valued like the compiled
+    price columns (valuation policy, per-card finish); etched prices are not recorded, so they
+    and cards the store has never seen keep the prices their card dicts were fetched with.
+    """
+    from booster_engine import get_compiled
+    from pull_rates import pull_rates
+    from valuation import get_policy
+
+    history = history or PriceHistory()
+    compiled = get_compiled(set_code)
+    table = pull_rates(set_code, compiled)
+    regular = table["expected"] - table["expected_foil"]
+    foil = table["expected_foil"]
+
+    rows = compiled["price_rows"]
+    card_sets = compiled["card_sets"]
+    policy = get_policy()
+    for day in history.days_between(start, end):
+        prices = _DayPrices(history.prices(day, card_sets, rows))
+        price, price_foil = policy.vectors(compiled["cards"], prices, rows)
+        yield {"day": day, "ev": float(regular @ price.astype(np.float64) + foil @ price_foil.astype(np.float64))}
+
+def ev_history(set_code: str, start: Optional[str] = None, end: Optional[str] = None,
+               history: Optional[PriceHistory] = None) -> List[Dict[str, Any]]:
+    return list(iter_ev(set_code, start, end, history))
+
+def record_snapshot(day: Optional[str] = None, history: Optional[PriceHistory] = None) -> Optional[str]:
+    """Snapshot the shared price store; returns the recorded day (None when there is no store yet)."""
+    store = get_store()
+    if store is None:
+        return None
+    history = history or PriceHistory()
+    history.record(store, day)
+    return history.days[-1]
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    if args[:1] == ["record"]:
+        print(record_snapshot(args[1] if len(args) > 1 else None))
+    elif args[:1] == ["ev"] and len(args) > 1:
+        from booster_registry import REGISTRY
+        codes = sorted(c for c in REGISTRY if not c.startswith("_")) if args[1] == "all" else [args[1]]
+        history = PriceHistory()
+        for code in codes:
+            for point in iter_ev(code, *(args[2:4]), history=history):
+                print(f"{code}\t{point['day']}\t{point['ev']:.2f}")
+    else:
+        print("usage: price_history.py record [day] | ev <set|all> [start] [end]")
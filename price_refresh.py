@@ -0,0 +1,178 @@
+# price_refresh.py — incremental price refresh from Scryfall bulk data
+#
+#   python price_refresh.py            refresh if the bulk file changed
+#   python price_refresh.py --force    ignore the saved ETag / timestamps
+#
+# 1. read the bulk-data manifest (tiny) and compare its updated_at with the last run
+# 2. download the bulk file conditionally (If-None-Match / If-Modified-Since)
+# 3. stream-parse the JSON array object by object (the file is hundreds of MB)
+# 4. apply only changed prices to the price store in batches, then save once
+# 5. invalidate compiled sets (and their cached EV / pull rates) whose card sets moved,
+#    and cached pools of sets that gained new prints
+# 6. append the day to the compressed price history (price_history.py)
+
+import os, json, time
+from typing import Dict, Any, Iterator, Iterable, List
+
+from price_store import PriceStore, PRICE_DIR, reload_store
+
+BULK_MANIFEST_URL = "https://api.scryfall.com/bulk-data/default-cards"
+STATE_PATH = os.path.join(PRICE_DIR, "bulk_state.json")
+
+CHUNK_BYTES = 1 << 20
+BATCH_CARDS = 5000
+
+# =========================
+# Streaming JSON array parser
+# =========================
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the objects of a top-level JSON array from byte chunks without holding the whole
+    document: only the current partial object stays buffered.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    pending = b""
+    for chunk in chunks:
+        # keep multi-byte UTF-8 sequences split across chunks intact
+        data = pending + chunk
+        try:
+            text = data.decode("utf-8")
+            pending = b""
+        except UnicodeDecodeError as err:
+            text = data[:err.start].decode("utf-8")
+            pending = data[err.start:]
+        buf += text
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started:
+                if pos < len(buf):
+                    if buf[pos] != "[":
+                        raise ValueError("bulk file is not a JSON array")
+                    started = True
+                    pos += 1
+                    continue
+                break
+            if pos >= len(buf) or buf[pos] == "]":
+                break
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # object continues in the next chunk
+            yield obj
+            pos = end
+        buf = buf[pos:]
+
+# =========================
+# Manifest + conditional download
+# =========================
+
+def _load_state() -> Dict[str, Any]:
+    try:
+        with open(STATE_PATH, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state: Dict[str, Any]):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, STATE_PATH)
+
+def _session():
+    import requests
+    from card_pools import HEADERS
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    return session
+
+def refresh(force: bool = False, store_path: str = PRICE_DIR, history: bool = True) -> Dict[str, Any]:
+    """Returns {"status": "unchanged" | "not-modified" | "updated", ...}."""
+    session = _session()
+    state = {} if force else _load_state()
+
+    manifest = session.get(BULK_MANIFEST_URL, timeout=30)
+    manifest.raise_for_status()
+    manifest = manifest.json()
+    if not force and manifest.get("updated_at") == state.get("updated_at"):
+        return {"status": "unchanged", "updated_at": state.get("updated_at")}
+
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    t0 = time.perf_counter()
+    with session.get(manifest["download_uri"], headers=headers, stream=True, timeout=120) as resp:
+        if resp.status_code == 304:
+            state["updated_at"] = manifest.get("updated_at")
+            _save_state(state)
+            return {"status": "not-modified", "updated_at": state["updated_at"]}
+        resp.raise_for_status()
+        result = apply_cards(iter_json_array(resp.iter_content(CHUNK_BYTES)), store_path)
+
+    _save_state({
+        "updated_at": manifest.get("updated_at"),
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "download_uri": manifest.get("download_uri"),
+    })
+    if history:
+        from price_history import PriceHistory
+        PriceHistory().record(PriceStore(store_path))
+    result["seconds"] = round(time.perf_counter() - t0, 1)
+    return result
+
+def apply_cards(cards: Iterable[Dict[str, Any]], store_path: str = PRICE_DIR) -> Dict[str, Any]:
+    """Applies price deltas from a card stream to the store and invalidates dependants."""
+    store = PriceStore(store_path, writable=True)
+    known = store.index
+    seen = changed = 0
+    new_print_sets = set()
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        nonlocal changed
+        for c in batch:
+            if c["id"] not in known:
+                new_print_sets.add(c.get("set") or "")
+        changed += store.ingest(batch)
+        batch.clear()
+
+    for card in cards:
+        seen += 1
+        batch.append({"id": card["id"], "set": card.get("set"), "prices": card.get("prices")})
+        if len(batch) >= BATCH_CARDS:
+            flush()
+    flush()
+
+    changed_sets = sorted(store.pending_sets)
+    if changed:
+        store.save()
+    return {"status": "updated", "cards": seen, "changed": changed, "version": store.version,
+            "changed_sets": changed_sets, "invalidated": invalidate(changed_sets, sorted(new_print_sets))}
+
+def invalidate(changed_sets: List[str], new_print_sets: List[str]) -> Dict[str, Any]:
+    """In-process invalidation; other processes pick the new version up via booster_engine.sync_prices()."""
+    out: Dict[str, Any] = {"compiled": [], "pools": 0}
+    if new_print_sets:
+        from card_pools import invalidate_sets
+        out["pools"] = invalidate_sets(new_print_sets)
+    if changed_sets or new_print_sets:
+        reload_store()
+        try:
+            import booster_engine
+        except ImportError:
+            return out
+        out["compiled"] = booster_engine.invalidate_card_sets(set(changed_sets) | set(new_print_sets))
+    return out
+
+if __name__ == "__main__":
+    import sys
+    print(refresh(force="--force" in sys.argv))
@@ -0,0 +1,248 @@
+# price_store.py — columnar float32 price store, memory-mapped and shared read-only
+#
+# Layout under PRICE_DIR:
+#   v<version>.<tag>/columns.npy  float32 (len(COLUMNS), rows)   one contiguous column per currency/finish, NaN = no price
+#   v<version>.<tag>/ids.npy      S36 Scryfall ids, row order
+#   v<version>.<tag>/sets.npy     S8 set code per row
+#   meta.json                     {"version", "dir", "columns", "rows", "set_versions"}
+#
+# "version" goes up on every save; "set_versions" records the version at which each set's
+# prices last changed, so caches built on one set only need rebuilding when that set moved.
+#
+# A save writes its arrays into a fresh directory of its own and then swaps meta.json, whose "dir"
+# names the current one, with a single os.replace. Readers open meta.json first and load the arrays
+# it points at, so they always see one complete save: never columns from one save and ids from
+# another, and never a half-written file. Two concurrent writers do not interfere either; the last
+# meta.json swap wins. Superseded directories are removed once they are STALE_SECONDS old.
+#
+# Readers np.load(..., mmap_mode="r") the arrays, so any number of worker processes share the same
+# pages and nothing is pickled: a PriceStore pickles as its path and reopens on the other side.
+
+import os, json, time, shutil, tempfile, threading
+from typing import Dict, Any, List, Optional, Iterable, Sequence
+
+import numpy as np
+
+PRICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".card_cache", "prices")
+
+COLUMNS = ("eur", "eur_foil", "usd", "usd_foil")
+COLUMN_INDEX = {c: i for i, c in enumerate(COLUMNS)}
+ARRAYS = ("columns", "ids", "sets")
+STALE_SECONDS = 3600        # superseded data directories live this long for late readers
+
+def parse_price(value) -> float:
+    try:
+        return float(value) if value else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+def _current_dir(path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            return json.load(fh).get("dir")
+    except (OSError, ValueError):
+        return None
+
+class PriceStore:
+    def __init__(self, path: str = PRICE_DIR, writable: bool = False):
+        self.path = path
+        self.writable = writable
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, int]] = None
+        self.version = 0
+        self.set_versions: Dict[str, int] = {}
+        self.pending_sets: set = set()  # sets changed by ingest since the last save
+        if os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+        else:
+            self.columns = np.empty((len(COLUMNS), 0), dtype=np.float32)
+            self.ids = np.empty(0, dtype="S36")
+            self.sets = np.empty(0, dtype="S8")
+
+    # pickling sends the path only; the receiver maps the same files read-only
+    def __reduce__(self):
+        return (PriceStore, (self.path, False))
+
+    def _load(self):
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        mode = None if self.writable else "r"
+        # stores saved before versioned directories keep their arrays next to meta.json
+        data = os.path.join(self.path, meta.get("dir", ""))
+        columns, ids, sets = (np.load(os.path.join(data, f"{name}.npy"), mmap_mode=mode) for name in ARRAYS)
+        if self.writable:
+            columns, ids, sets = np.array(columns), np.array(ids), np.array(sets)
+        self.columns, self.ids, self.sets = columns, ids, sets
+        self.version = meta.get("version", 0)
+        self.set_versions = meta.get("set_versions", {})
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- lookups ----
+
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = {i.decode("ascii"): r for r, i in enumerate(self.ids.tolist())}
+        return self._index
+
+    def rows_for(self, card_ids: Iterable[str]) -> np.ndarray:
+        """Row of every id, -1 when the store has never seen the card."""
+        index = self.index
+        return np.array([index.get(cid, -1) for cid in card_ids], dtype=np.int64)
+
+    def set_version(self, set_code: str) -> int:
+        return self.set_versions.get(set_code.lower(), 0)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[COLUMN_INDEX[name]]
+
+    def gather(self, rows: np.ndarray, name: str) -> np.ndarray:
+        """Prices for rows (NaN for -1 / missing)."""
+        col = self.column(name)
+        out = col[np.maximum(rows, 0)] if len(col) else np.full(len(rows), np.nan, dtype=np.float32)
+        return np.where(rows >= 0, out, np.float32(np.nan))
+
+    # ---- writing ----
+
+    def ingest(self, cards: Iterable[Dict[str, Any]]) -> int:
+        """Insert/update prices from Scryfall card dicts (one batch). Returns how many rows changed."""
+        if not self.writable:
+            raise PermissionError("price store opened read-only")
+        cards = list(cards)
+        if not cards:
+            return 0
+        index = self.index
+        values = np.array([[parse_price((c.get("prices") or {}).get(col)) for col in COLUMNS] for c in cards],
+                          dtype=np.float32).T
+        rows = np.array([index.get(c["id"], -1) for c in cards], dtype=np.int64)
+
+        # known cards: compare column-wise, write back only what moved (NaN == NaN)
+        known = np.nonzero(rows >= 0)[0]
+        old = self.columns[:, rows[known]]
+        new = values[:, known]
+        moved = ((old != new) & ~(np.isnan(old) & np.isnan(new))).any(axis=0)
+        self.columns[:, rows[known[moved]]] = new[:, moved]
+        self.pending_sets.update(cards[i].get("set") or "" for i in known[moved])
+
+        # new cards: append (a card listed twice in one batch keeps its last prices)
+        fresh: Dict[str, int] = {}
+        for i in np.nonzero(rows < 0)[0]:
+            fresh[cards[i]["id"]] = i
+        if fresh:
+            order = list(fresh.values())
+            start = len(self.ids)
+            for k, cid in enumerate(fresh):
+                index[cid] = start + k
+            self.columns = np.concatenate([self.columns, values[:, order]], axis=1)
+            self.ids = np.concatenate([self.ids, np.array(list(fresh), dtype="S36")])
+            self.sets = np.concatenate([self.sets, np.array([cards[i].get("set") or "" for i in order], dtype="S8")])
+            self.pending_sets.update(cards[i].get("set") or "" for i in order)
+        return int(moved.sum()) + len(fresh)
+
+    def save(self):
+        """
+        Write the store as a new version. Readers opening it afterwards see this save complete;
+        readers already open keep their old mapping until reopened. With concurrent writers the
+        last one to finish wins; the other's save is discarded whole, never mixed in.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self.version += 1
+        for code in self.pending_sets:
+            self.set_versions[code] = self.version
+        self.pending_sets = set()
+        data = tempfile.mkdtemp(prefix=f"v{self.version}.", dir=self.path)
+        for name, arr in zip(ARRAYS, (np.ascontiguousarray(self.columns), self.ids, self.sets)):
+            np.save(os.path.join(data, f"{name}.npy"), arr)
+        meta = {"version": self.version, "dir": os.path.basename(data), "columns": list(COLUMNS),
+                "rows": int(len(self.ids)), "set_versions": self.set_versions}
+        previous = _current_dir(self.path)
+        fd, tmp = tempfile.mkstemp(prefix="meta.", suffix=".tmp", dir=self.path)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+        self._remove_stale({meta["dir"], previous})
+
+    def _remove_stale(self, keep: set):
+        # old versions (and the flat pre-versioned arrays) once no reader can still be opening them
+        cutoff = time.time() - STALE_SECONDS
+        for entry in os.listdir(self.path):
+            full = os.path.join(self.path, entry)
+            try:
+                if entry in keep or os.path.getmtime(full) > cutoff:
+                    continue
+                if entry.startswith("v") and os.path.isdir(full):
+                    shutil.rmtree(full, ignore_errors=True)
+                elif entry in [f"{name}.npy" for name in ARRAYS]:
+                    os.remove(full)
+            except OSError:
+                pass
+
+# =========================
+# Shared default store
+# =========================
+
+_default: Optional[PriceStore] = None
+_default_lock = threading.Lock()
+
+def get_store() -> Optional[PriceStore]:
+    """The read-only store under PRICE_DIR, or None if nothing has been saved yet."""
+    global _default
+    with _default_lock:
+        if _default is None and os.path.exists(os.path.join(PRICE_DIR, "meta.json")):
+            _default = PriceStore(PRICE_DIR)
+        return _default
+
+def reload_store():
+    global _default
+    with _default_lock:
+        _default = None
+
+def check_for_update() -> List[str]:
+    """
+    Reopens the default store if another process saved a newer version.
+    Returns the set codes whose prices changed since the mapping we had.
+    """
+    global _default
+    meta_path = os.path.join(PRICE_DIR, "meta.json")
+    if not os.path.exists(meta_path):
+        return []
+    with open(meta_path, encoding="utf-8") as fh:
+        meta = json.load(fh)
+    with _default_lock:
+        old = _default
+        if old is not None and meta.get("version", 0) == old.version:
+            return []
+        _default = PriceStore(PRICE_DIR)
+        before = old.set_versions if old is not None else {}
+        return [code for code, v in _default.set_versions.items() if v != before.get(code)]
+
+def build_store(cards: Iterable[Dict[str, Any]], path: str = PRICE_DIR) -> PriceStore:
+    store = PriceStore(path, writable=True)
+    store.ingest(cards)
+    store.save()
+    reload_store()
+    return store
+
+def display_prices(store: PriceStore, rows: np.ndarray, foil: Sequence[bool]) -> np.ndarray:
+    """
+    Store rows valued under the current valuation policy (valuation.get_policy); foil is per row
+    (foil finish for foil rows). Rows the store does not know are worth 0.
+    """
+    from valuation import get_policy
+
+    rows = np.asarray(rows)
+    foil = np.asarray(foil, dtype=bool)
+    nan = np.full(len(rows), np.nan, dtype=np.float32)
+    get = lambda column: store.gather(rows, column) if column in COLUMN_INDEX else nan
+    out = get_policy().column_prices(get, np.where(foil, "foil", "nonfoil"))
+    return np.where(rows >= 0, out, np.float32(0.0)).astype(np.float32)
+
+def pack_value_sum(store: PriceStore, rows: np.ndarray, foil: np.ndarray) -> np.ndarray:
+    """(packs x slots) store rows + foil flags → value per pack, one gather and one sum."""
+    flat = display_prices(store, rows.ravel(), np.broadcast_to(foil, rows.shape).ravel())
+    return np.where(rows.ravel() >= 0, flat, 0.0).reshape(rows.shape).sum(axis=1, dtype=np.float64)
@@ -0,0 +1,262 @@
+# pull_rates.py — exact per-card odds from the compiled plan (no simulation)
+#
+# For every slot: P(slot present) x P(entry | slot) x 1/|pool|. Summing over slots gives the
+# expected copies per pack; combining the slots' "miss" probabilities gives P(at least one).
+# Slots that share randomness (SNC extra rares gated on one roll, a bonus card replacing a
+# common) are combined as joint scenarios so those odds stay exact; the SNC showcase guarantee
+# is the only slot whose presence is treated as independent of the rest of the pack. Commons
+# and uncommons drawn without replacement (distinct_slots) never repeat a base-pool draw, so
+# that part of P(at least one) adds up over the slots instead; hook cards are drawn
+# independently of it (and never excluded from it), even where a hook pool overlaps the base.
+
+import csv, json
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from booster_engine import get_compiled, price_vector
+from valuation import ValuationPolicy
+
+# =========================
+# Per-slot distributions
+# =========================
+
+def _entry_probs(slot: Dict[str, Any]) -> np.ndarray:
+    probs: List[float] = []
+    prev = 0.0
+    for gi, cum in enumerate(slot["entry_cum"]):
+        p_group = slot["group_cum"][gi] - prev
+        prev = slot["group_cum"][gi]
+        weights = np.diff(np.concatenate([[0.0], cum]))
+        probs.extend(p_group * weights / cum[-1])
+    return np.array(probs)
+
+def slot_card_probs(compiled: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (slots x cards) P(card | slot present) and P(slot yields a card | present).
+    An entry with an empty pool yields no card, exactly like a failed fetch.
+    """
+    n_cards = len(compiled["cards"])
+    pool_flat = compiled["pool_flat"]
+    rates = np.zeros((len(compiled["slots"]), n_cards))
+    yields = np.zeros(len(compiled["slots"]))
+    for s, slot in enumerate(compiled["slots"]):
+        for e, p in enumerate(_entry_probs(slot)):
+            size = slot["pool_size"][e]
+            if size == 0 or p == 0:
+                continue
+            start = slot["pool_offset"][e]
+            np.add.at(rates[s], pool_flat[start:start + size], p / size)
+            yields[s] += p
+    return rates, yields
+
+def distinct_rates(compiled: Dict[str, Any], rates: np.ndarray) -> Tuple[np.ndarray, List[List[int]]]:
+    """
+    The part of rates that distinct slots draw from their shared base pool, and those slots grouped
+    by pool. Inside a group a card turns up at most once, so P(none) there is 1 - sum of the
+    rates, not a product of misses.
+    """
+    pool_flat = compiled["pool_flat"]
+    base = np.zeros_like(rates)
+    groups: Dict[int, List[int]] = {}
+    for s, slot in enumerate(compiled["slots"]):
+        if not slot.get("distinct"):
+            continue
+        e = int(slot["group_start"][-1])
+        size = slot["pool_size"][e]
+        if size == 0:
+            continue
+        start = slot["pool_offset"][e]
+        np.add.at(base[s], pool_flat[start:start + size], _entry_probs(slot)[e] / size)
+        groups.setdefault(int(start), []).append(s)
+    return base, list(groups.values())
+
+def slot_treatment_probs(compiled: Dict[str, Any], treatments: List[str]) -> np.ndarray:
+    """P(slot shows one of treatments | present)."""
+    out = np.zeros(len(compiled["slots"]))
+    for s, slot in enumerate(compiled["slots"]):
+        for e, p in enumerate(_entry_probs(slot)):
+            t = (slot["entries"][e]["treatment"] or "").lower()
+            if t in treatments and slot["pool_size"][e] > 0:
+                out[s] += p
+    return out
+
+# =========================
+# Joint presence
+# =========================
+
+Scenario = Tuple[float, List[Tuple[int, float]]]
+
+def presence_units(compiled: Dict[str, Any], yields: np.ndarray) -> List[List[Scenario]]:
+    """
+    Slots grouped into independent units; each unit is a list of (probability, [(slot, scale)])
+    scenarios, scale rescaling P(card | present) when the scenario conditions on the slot
+    yielding a card. Gate chains are split into u0 intervals, a skip_if pair into card / no card.
+    """
+    slots = compiled["slots"]
+    units: List[List[Scenario]] = []
+    chains: Dict[int, List[Tuple[float, int]]] = {}
+    skips: Dict[int, List[int]] = {}
+    handled = set()
+
+    for s, slot in enumerate(slots):
+        if slot["skip_if"] is not None:
+            skips.setdefault(slot["skip_if"], []).append(s)
+            handled.add(s)
+        elif slot["gate"] is not None and slot["gate"][0] != s:
+            chains.setdefault(slot["gate"][0], []).append((slot["gate"][1], s))
+            handled.add(s)
+
+    for s, slot in enumerate(slots):
+        if s in handled:
+            continue
+        p = slot["gate"][1] if slot["gate"] is not None else 1.0
+        p = min(max(p, 0.0), 1.0)
+        if slot["unless_treatments"]:
+            p *= _p_no_treatment(compiled, units, slot["unless_treatments"])
+        if s in skips:
+            # target yields a card → dependents absent, otherwise dependents present
+            hit = p * yields[s]
+            dependents = [(t, 1.0) for t in skips[s]]
+            units.append([(hit, [(s, 1.0 / yields[s])] if hit else []), (1.0 - hit, dependents)])
+        else:
+            units.append([(p, [(s, 1.0)]), (1.0 - p, [])])
+        if s in chains:
+            bounds = sorted(chains[s], reverse=True)
+            scenarios = []
+            for k, (below, _) in enumerate(bounds):
+                lower = bounds[k + 1][0] if k + 1 < len(bounds) else 0.0
+                scenarios.append((below - lower, [(t, 1.0) for b, t in bounds if b > lower]))
+            scenarios.append((1.0 - bounds[0][0], []))
+            units.append(scenarios)
+    return units
+
+def _p_no_treatment(compiled: Dict[str, Any], units, treatments: List[str]) -> float:
+    # slots compiled before this one, combined per unit
+    q = slot_treatment_probs(compiled, treatments)
+    p = 1.0
+    for scenarios in units:
+        p *= sum(prob * np.prod([1.0 - q[s] * scale for s, scale in present]) for prob, present in scenarios)
+    return p
+
+def slot_presence(units) -> Dict[int, float]:
+    presence: Dict[int, float] = {}
+    for scenarios in units:
+        for prob, present in scenarios:
+            for s, scale in present:
+                presence[s] = presence.get(s, 0.0) + prob * scale
+    return presence
+
+# =========================
+# Table
+# =========================
+
+def pull_rates(set_code: str, compiled: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Per-card odds for one pack of set_code, aligned with compiled["cards"]:
+      expected       — expected copies per pack (any slot)
+      expected_foil  — expected copies from foil slots
+      p_any          — P(at least one copy in the pack)
+    plus by_name / by_cn dictionaries for O(1) lookups. compiled overrides get_compiled(set_code).
+    """
+    compiled = compiled if compiled is not None else get_compiled(set_code)
+    cached = compiled["cache"].get("pull_rates")
+    if cached is not None:
+        return cached
+    rates, yields = slot_card_probs(compiled)
+    units = presence_units(compiled, yields)
+    presence = slot_presence(units)
+    p_slot = np.array([presence.get(s, 0.0) for s in range(len(compiled["slots"]))])
+
+    weighted = rates * p_slot[:, None]
+    expected = weighted.sum(axis=0)
+    expected_foil = weighted[compiled["slot_foil"]].sum(axis=0)
+
+    base, distinct = distinct_rates(compiled, rates)
+    independent = rates - base
+    p_none = np.ones(len(compiled["cards"]))
+    for scenarios in units:
+        miss = np.zeros(len(compiled["cards"]))
+        for prob, present in scenarios:
+            if present:
+                miss += prob * np.prod([1.0 - independent[s] * scale for s, scale in present], axis=0)
+            else:
+                miss += prob
+        p_none *= miss
+    for group in distinct:
+        p_none *= 1.0 - np.minimum(1.0, (base[group] * p_slot[group, None]).sum(axis=0))
+
+    by_name: Dict[str, List[int]] = {}
+    by_cn: Dict[str, List[int]] = {}
+    for i, card in enumerate(compiled["cards"]):
+        by_name.setdefault((card.get("name") or "").lower(), []).append(i)
+        cn = str(card.get("collector_number") or "")
+        by_cn.setdefault(cn, []).append(i)
+        by_cn.setdefault(f"{card.get('set', '')}:{cn}", []).append(i)
+
+    table = compiled["cache"]["pull_rates"] = {
+        "set_code": compiled["set_code"],
+        "cards": compiled["cards"],
+        "expected": expected,
+        "expected_foil": expected_foil,
+        "p_any": 1.0 - p_none,
+        "slot_presence": dict(zip([s["label"] for s in compiled["slots"]], p_slot.tolist())),
+        "by_name": by_name,
+        "by_cn": by_cn,
+    }
+    return table
+
+def lookup(table: Dict[str, Any], name: Optional[str] = None, cn: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Rows for a card name (any print) or collector number ("123" or "spg:104")."""
+    if name is not None:
+        rows = table["by_name"].get(name.lower(), [])
+    elif cn is not None:
+        rows = table["by_cn"].get(str(cn).lower(), [])
+    else:
+        rows = []
+    return [row(table, i) for i in rows]
+
+def row(table: Dict[str, Any], i: int) -> Dict[str, Any]:
+    card = table["cards"][i]
+    p = float(table["p_any"][i])
+    return {
+        "id": card.get("id"), "name": card.get("name"), "set": card.get("set"),
+        "collector_number": card.get("collector_number"), "rarity": card.get("rarity"),
+        "expected": float(table["expected"][i]), "expected_foil": float(table["expected_foil"][i]),
+        "p_any": p, "one_in": (1.0 / p) if p > 0 else None,
+    }
+
+def expected_value(compiled: Dict[str, Any], table: Optional[Dict[str, Any]] = None,
+                   policy: Optional[ValuationPolicy] = None) -> float:
+    """Exact pack EV: expected copies x value, foil copies at foil values (cached per compiled set)."""
+    cached = compiled["cache"].get("ev") if policy is None else None
+    if cached is not None:
+        return cached
+    table = table or pull_rates(compiled["set_code"], compiled)
+    regular = table["expected"] - table["expected_foil"]
+    n = len(compiled["cards"])
+    prices = price_vector(compiled, policy)
+    ev = float(regular @ prices[:n] + table["expected_foil"] @ prices[n:2 * n])
+    if policy is None:
+        compiled["cache"]["ev"] = ev
+    return ev
+
+def save_pull_rates(table: Dict[str, Any], path: str):
+    rows = [row(table, i) for i in range(len(table["cards"]))]
+    if path.endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0]) if rows else ["id"])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"set_code": table["set_code"], "cards": rows}, fh)
+
+if __name__ == "__main__":
+    import sys
+    table = pull_rates(sys.argv[1] if len(sys.argv) > 1 else "fin")
+    if len(sys.argv) > 2:
+        for r in lookup(table, name=sys.argv[2]) or lookup(table, cn=sys.argv[2]):
+            print(r)
+    else:
+        print(table["slot_presence"])
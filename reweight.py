@@ -0,0 +1,165 @@
+# reweight.py — evaluate alternate table weights on stored samples (no re-simulation)
+#
+# Each stored sample is one opened pack: its total value plus the table entry index every
+# table-driven slot drew (see open_booster(draws=...)). Changing a table's weights only changes
+# how likely each sample was, so EV / quantiles under the new weights are the importance-weighted
+# statistics of the same samples:
+#
+#     lr(pack) = prod over drawn entries e of  p_new[e] / p_old[e]
+#
+# Everything is done on (packs x entries) count matrices in one numpy pass.
+
+import json
+from typing import Dict, Any, Optional, List, Sequence
+
+import numpy as np
+
+from booster_registry import REGISTRY
+from booster import open_booster, pack_value
+
+TABLE_NAMES = ("rare_table", "wildcard_table", "foil_table")
+
+# =========================
+# Samples
+# =========================
+
+def table_weights(set_code: str) -> Dict[str, np.ndarray]:
+    config = REGISTRY.get(set_code.lower(), REGISTRY["_default"])
+    out: Dict[str, np.ndarray] = {}
+    for name in TABLE_NAMES:
+        table = config.get(name)
+        if table:
+            out[name] = np.array([entry.get("weight", 1.0) for entry in table], dtype=np.float64)
+    return out
+
+def simulate_samples(set_code: str, packs: int, path: Optional[str] = None) -> Dict[str, Any]:
+    """Opens packs with the reference opener and keeps value + table draws (optionally saved as JSONL)."""
+    set_code = set_code.lower()
+    records: List[Dict[str, Any]] = []
+    for _ in range(packs):
+        draws: Dict[str, List[int]] = {}
+        booster, foil, bonus, _ = open_booster(set_code, draws=draws)
+        records.append({"value": pack_value(booster, foil, bonus), "draws": draws})
+
+    samples = samples_from_records(set_code, records)
+    if path:
+        save_samples(path, samples, records)
+    return samples
+
+def samples_from_records(set_code: str, records: Sequence[Dict[str, Any]],
+                         weights: Optional[Dict[str, Sequence[float]]] = None) -> Dict[str, Any]:
+    weights_np = {k: np.asarray(v, dtype=np.float64) for k, v in (weights or table_weights(set_code)).items()}
+    counts: Dict[str, np.ndarray] = {}
+    for name, w in weights_np.items():
+        c = np.zeros((len(records), len(w)), dtype=np.int32)
+        for row, rec in enumerate(records):
+            idx = (rec.get("draws") or {}).get(name) or []
+            if idx:
+                np.add.at(c[row], np.asarray(idx, dtype=np.intp), 1)
+        counts[name] = c
+    return {
+        "set_code": set_code,
+        "weights": weights_np,
+        "counts": counts,
+        "values": np.array([rec["value"] for rec in records], dtype=np.float64),
+    }
+
+def save_samples(path: str, samples: Dict[str, Any], records: Sequence[Dict[str, Any]]):
+    # first line is a header with the weights the samples were drawn under
+    with open(path, "w", encoding="utf-8") as fh:
+        header = {"set_code": samples["set_code"],
+                  "weights": {k: v.tolist() for k, v in samples["weights"].items()}}
+        fh.write(json.dumps(header) + "\n")
+        for rec in records:
+            fh.write(json.dumps(rec) + "\n")
+
+def load_samples(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        header = json.loads(fh.readline())
+        records = [json.loads(line) for line in fh if line.strip()]
+    return samples_from_records(header["set_code"], records, header["weights"])
+
+# =========================
+# Reweighting
+# =========================
+
+def _log_probs(weights: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        return np.log(weights) - np.log(weights.sum())
+
+def likelihood_ratios(samples: Dict[str, Any], new_weights: Dict[str, Sequence[float]]) -> np.ndarray:
+    """Per-sample p_new / p_old. Tables missing from new_weights keep their old weights."""
+    log_lr = np.zeros(len(samples["values"]), dtype=np.float64)
+    for name, new in new_weights.items():
+        old = samples["weights"].get(name)
+        if old is None:
+            raise KeyError(f"samples have no draws for {name}")
+        new = np.asarray(new, dtype=np.float64)
+        if new.shape != old.shape:
+            raise ValueError(f"{name}: expected {old.shape[0]} weights, got {new.shape[0]}")
+        if (new < 0).any() or not new.sum() > 0:
+            raise ValueError(f"{name}: weights must be non-negative with a positive total")
+        with np.errstate(invalid="ignore"):
+            delta = _log_probs(new) - _log_probs(old)
+        # only entries a sample actually drew contribute: a new weight of 0 sends that sample to
+        # lr = 0 (delta = -inf), while undrawn entries (incl. old weight 0) must not give 0 * inf = NaN
+        counts = samples["counts"][name]
+        with np.errstate(invalid="ignore"):
+            log_lr += np.where(counts > 0, counts * delta, 0.0).sum(axis=1)
+    return np.exp(log_lr)
+
+def _normalized_ratios(samples: Dict[str, Any], new_weights: Dict[str, Sequence[float]]) -> np.ndarray:
+    lr = likelihood_ratios(samples, new_weights)
+    total = lr.sum()
+    if not total > 0:
+        raise ValueError("new weights give every stored sample probability 0; "
+                         "re-simulate under weights that cover them")
+    return lr / total
+
+def weighted_quantiles(values: np.ndarray, weights: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+    order = np.argsort(values)
+    cum = np.cumsum(weights[order])
+    cum /= cum[-1]
+    return values[order][np.minimum(np.searchsorted(cum, qs), len(values) - 1)]
+
+def reweight(samples: Dict[str, Any], new_weights: Optional[Dict[str, Sequence[float]]] = None,
+             quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict[str, Any]:
+    """EV, quantiles and effective sample size under new_weights (self-normalized importance sampling)."""
+    values = samples["values"]
+    lr = _normalized_ratios(samples, new_weights or {})
+    ev = float((lr * values).sum())
+    return {
+        "ev": ev,
+        "quantiles": dict(zip(quantiles, weighted_quantiles(values, lr, quantiles).tolist())),
+        # ESS collapses when new weights move far from the sampling weights
+        "ess": float(1.0 / (lr ** 2).sum()),
+        "packs": int(len(values)),
+    }
+
+def ev_gradient(samples: Dict[str, Any], new_weights: Optional[Dict[str, Sequence[float]]] = None) -> Dict[str, np.ndarray]:
+    """
+    dEV/dweight for every entry of every table, evaluated at new_weights (default: sampling weights).
+    Weights are unnormalized, so d log p_e / d w_k = [e == k] / w_k - 1 / sum(w).
+    """
+    new_weights = new_weights or {}
+    values = samples["values"]
+    lr = _normalized_ratios(samples, new_weights)
+    ev = float((lr * values).sum())
+    centered = lr * (values - ev)
+
+    grads: Dict[str, np.ndarray] = {}
+    for name, old in samples["weights"].items():
+        w = np.asarray(new_weights.get(name, old), dtype=np.float64)
+        counts = samples["counts"][name]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = counts / w - counts.sum(axis=1, keepdims=True) / w.sum()
+        score[:, w == 0] = 0.0
+        grads[name] = centered @ score
+    return grads
+
+if __name__ == "__main__":
+    import sys
+    samples = load_samples(sys.argv[1])
+    print(reweight(samples))
+    for name, g in ev_gradient(samples).items():
+        print(name, np.round(g, 4).tolist())
@@ -0,0 +1,320 @@
+# seed_search.py — find seeds whose pack matches a predicate, replayable through open_booster
+#
+#   python seed_search.py snc --rares 4                       SNC packs with 4+ rares/mythics
+#   python seed_search.py fin --foil --name cid --special     a Cid variant in the foil slot
+#   python seed_search.py fin --value 40 --count 5 --start 1000000
+#   python seed_search.py replay snc 123456                   open that seed's pack card by card
+#
+# A seed is replayed by open_booster(set, rng=CounterRandom(seed)). CounterRandom's j-th random()
+# is a pure function of (seed, j) (SplitMix64 of a per-seed key), so the whole pack is a function
+# of where open_booster spends its random() calls — and that is fixed by the compiled plan:
+# per slot [gate roll][hook roll][entry pick][card]. sample_seeds() walks the plan once per slot
+# for a whole batch of seeds, keeping one stream counter per seed and advancing it only where
+# open_booster would have drawn, so a batch of a million seeds is a few dozen numpy passes.
+#
+# Matches are replayed through open_booster on the compiled set's own pools before they are
+# returned (verify=True); a seed whose replay differs (an empty pool makes the opener retry) is
+# dropped and counted, never reported.
+
+import random
+from typing import Dict, Any, List, Optional, Callable, Sequence
+
+import numpy as np
+
+import booster
+from booster_engine import get_compiled, materialize, pack_values, _pick_distinct, _take, \
+    _base_positions, TAKEN_NONE, RARITY_CODE
+
+BATCH = 1 << 18                # seeds per vectorised pass
+MAX_SEEDS = 100_000_000        # give up after this many seeds
+FOUND = 10
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_M1, _M2 = 0xBF58476D1CE4E5B9, 0x94D049BB133111EB
+_KEY_SALT = 0xD1B54A32D192ED03
+
+Predicate = Callable[[Dict[str, Any], Dict[str, np.ndarray]], np.ndarray]
+
+# =========================
+# Counter-based stream
+# =========================
+
+def _mix(z: int) -> int:
+    z = ((z ^ (z >> 30)) * _M1) & _MASK
+    z = ((z ^ (z >> 27)) * _M2) & _MASK
+    return z ^ (z >> 31)
+
+def stream_key(seed: int) -> int:
+    return _mix((int(seed) ^ _KEY_SALT) & _MASK)
+
+def stream_uniform(key: int, counter: int) -> float:
+    """The counter-th uniform in [0, 1) of a stream (53 bits, like random.random)."""
+    return (_mix((key + (counter + 1) * _GOLDEN) & _MASK) >> 11) * (1.0 / (1 << 53))
+
+def _mix_array(z: np.ndarray) -> np.ndarray:
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_M1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_M2)
+    return z ^ (z >> np.uint64(31))
+
+def stream_keys(seeds: np.ndarray) -> np.ndarray:
+    return _mix_array(np.asarray(seeds, dtype=np.uint64) ^ np.uint64(_KEY_SALT))
+
+def stream_uniforms(keys: np.ndarray, counters: np.ndarray) -> np.ndarray:
+    """stream_uniform for arrays (uint64 arithmetic wraps like the & _MASK above)."""
+    z = _mix_array(keys + (counters + np.uint64(1)) * np.uint64(_GOLDEN))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+class CounterRandom(random.Random):
+    """
+    random.Random whose j-th random() is stream_uniform(seed, j). choice/randrange take
+    floor(random() * n) — one call, the same index the batched engine computes.
+    """
+
+    def seed(self, a=None, version=2):
+        self.key = stream_key(a or 0)
+        self.counter = 0
+        super().seed(a, version)
+
+    def random(self) -> float:
+        u = stream_uniform(self.key, self.counter)
+        self.counter += 1
+        return u
+
+    def _randbelow(self, n: int) -> int:
+        return min(int(self.random() * n), n - 1)
+
+# =========================
+# Batched replay of open_booster's draws
+# =========================
+
+def sample_seeds(compiled: Dict[str, Any], seeds: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    The pack open_booster(set, rng=CounterRandom(seed)) opens, for every seed at once, in
+    sample_packs' shape (entry / card / treatment per slot).
+    """
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    n = len(seeds)
+    keys = stream_keys(seeds)
+    counter = np.zeros(n, dtype=np.uint64)
+
+    def draw(rows: np.ndarray) -> np.ndarray:
+        u = stream_uniforms(keys, counter)
+        np.add(counter, rows, out=counter)  # bool → 0/1, cheaper than a masked add
+        return u
+
+    # slot-major while filling (each slot writes one contiguous row), transposed on return
+    S = len(compiled["slots"])
+    entry = np.full((S, n), -1, dtype=np.int16)
+    card = np.full((S, n), -1, dtype=np.int32)
+    treat = np.zeros((S, n), dtype=np.int16)
+    treatments = compiled["treatments"]
+    pool_flat = compiled["pool_flat"]
+    rolls: Dict[int, np.ndarray] = {}           # gate source → its roll (drawn by the first slot testing it)
+    taken: Dict[int, List[np.ndarray]] = {}
+
+    for s, slot in enumerate(compiled["slots"]):
+        present = np.ones(n, dtype=bool)
+        if slot["skip_if"] is not None:
+            present &= card[slot["skip_if"]] < 0
+        if slot["unless_treatments"]:
+            codes = [i for i, t in enumerate(treatments) if t and t.lower() in slot["unless_treatments"]]
+            if codes and s:
+                present &= ~(np.isin(treat[:s], codes) & (card[:s] >= 0)).any(axis=0)
+        if slot["gate"] is not None:
+            src, below, inclusive = slot["gate"]
+            if src not in rolls:
+                rolls[src] = draw(present)
+            present &= (rolls[src] <= below) if inclusive else (rolls[src] < below)
+
+        group_cum = slot["group_cum"]
+        g = None
+        if slot["rolls"]:
+            u = draw(present)
+            if len(group_cum) > 1:
+                g = np.minimum(np.searchsorted(group_cum, u, side="right"), len(group_cum) - 1)
+        if len(group_cum) == 1:
+            # one group (most slots): no per-group masks
+            e = np.full(n, slot["group_start"][0], dtype=np.intp)
+            if slot["group_pick"][0]:
+                cum = slot["entry_cum"][0]
+                e += np.minimum(np.searchsorted(cum, draw(present) * cum[-1], side="right"), len(cum) - 1)
+        else:
+            e = np.empty(n, dtype=np.intp)
+            for gi, cum in enumerate(slot["entry_cum"]):
+                rows = g == gi if g is not None else np.full(n, gi == 0)
+                if slot["group_pick"][gi]:
+                    u = draw(present & rows)
+                    k = np.searchsorted(cum, u[rows] * cum[-1], side="right")
+                    e[rows] = slot["group_start"][gi] + np.minimum(k, len(cum) - 1)
+                else:
+                    e[rows] = slot["group_start"][gi]
+
+        size = slot["pool_size"][e]
+        has_card = present & (size > 0)
+        u = draw(has_card)
+        pick = np.floor(u * size).astype(np.int64)
+        base = slot["group_start"][-1]
+        if slot["distinct"]:
+            prior = taken.setdefault(int(slot["pool_offset"][base]), [])
+            if prior:
+                pick = np.where(has_card & (e == base), _pick_distinct(u, size, prior), pick)
+        idx = np.where(has_card, slot["pool_offset"][e] + np.minimum(pick, np.maximum(size - 1, 0)), 0)
+
+        entry[s] = np.where(present, e, -1)
+        card[s] = np.where(has_card, pool_flat[idx], -1)
+        treat[s] = np.where(present, slot["entry_treatment"][e], 0)
+        if slot["distinct"]:
+            _take(prior, np.where(has_card & (e == base), _base_positions(compiled, slot, base)[card[s]], TAKEN_NONE))
+
+    return {"entry": np.ascontiguousarray(entry.T), "card": np.ascontiguousarray(card.T),
+            "treatment": np.ascontiguousarray(treat.T)}
+
+# =========================
+# Predicates
+# =========================
+
+def rarity_count(rarities: Sequence[str] = ("rare", "mythic"), at_least: int = 1,
+                 foil: Optional[bool] = None) -> Predicate:
+    """At least at_least cards of rarities (foil: only foil / only non-foil slots)."""
+    codes = [RARITY_CODE[r] for r in rarities]
+
+    def predicate(compiled, draws):
+        card = draws["card"]
+        hit = np.isin(compiled["rarity"][np.maximum(card, 0)], codes) & (card >= 0)
+        if foil is not None:
+            hit &= compiled["slot_foil"][None, :] == foil
+        return hit.sum(axis=1) >= at_least
+    return predicate
+
+def has_card(name: Optional[str] = None, treatment: Optional[str] = None, rarity: Optional[str] = None,
+             foil: Optional[bool] = None, special: Optional[bool] = None) -> Predicate:
+    """Some slot shows a card matching every given filter (name / treatment are substrings)."""
+    def predicate(compiled, draws):
+        cards = compiled["cards"]
+        ok_card = np.ones(len(cards) + 1, dtype=bool)
+        ok_card[-1] = False  # -1 (no card) indexes this
+        if name:
+            ok_card[:-1] &= np.array([name.lower() in (c.get("name") or "").lower() for c in cards], dtype=bool)
+        if rarity:
+            ok_card[:-1] &= compiled["rarity"] == RARITY_CODE[rarity]
+        ok_treat = np.ones(len(compiled["treatments"]), dtype=bool)
+        if treatment:
+            ok_treat &= np.array([treatment.lower() in (t or "").lower() for t in compiled["treatments"]], dtype=bool)
+        if special is not None:
+            ok_treat &= compiled["special"] == special
+        hit = ok_card[draws["card"]] & ok_treat[draws["treatment"]]
+        if foil is not None:
+            hit &= compiled["slot_foil"][None, :] == foil
+        return hit.any(axis=1)
+    return predicate
+
+def value_at_least(value: float) -> Predicate:
+    def predicate(compiled, draws):
+        return pack_values(compiled, draws) >= value
+    return predicate
+
+def all_of(*predicates: Predicate) -> Predicate:
+    def predicate(compiled, draws):
+        out = np.ones(len(draws["card"]), dtype=bool)
+        for p in predicates:
+            out &= p(compiled, draws)
+        return out
+    return predicate
+
+# =========================
+# Replay and search
+# =========================
+
+def replay(set_code: str, seed: int):
+    """The seed's pack, opened card by card (needs the set's pools as card source)."""
+    return booster.open_booster(set_code, None, CounterRandom(seed))
+
+def _pack_ids(cards, foil, bonus) -> tuple:
+    return tuple(sorted(c["id"] for c in cards if c)), (foil or {}).get("id"), (bonus or {}).get("id")
+
+def replays(compiled: Dict[str, Any], draws: Dict[str, np.ndarray], row: int, seed: int) -> bool:
+    """Does open_booster open exactly the pack sample_seeds found for seed?"""
+    return _pack_ids(*replay(compiled["set_code"], seed)[:3]) == _pack_ids(*materialize(compiled, draws, row)[:3])
+
+def search(set_code: str, predicate: Predicate, count: int = FOUND, start: int = 0,
+           max_seeds: int = MAX_SEEDS, batch: int = BATCH, verify: bool = True) -> Dict[str, Any]:
+    """
+    The first count seeds from start on whose pack satisfies predicate:
+    {"seeds": [{"seed", "value", "cards"}], "scanned", "unreplayable"}.
+    """
+    import card_pools
+
+    compiled = get_compiled(set_code)
+    previous = booster.card_source()
+    if verify:
+        card_pools.use_pool_source([compiled["set_code"]])
+    found: List[Dict[str, Any]] = []
+    scanned = unreplayable = 0
+    try:
+        while len(found) < count and scanned < max_seeds:
+            seeds = np.arange(start + scanned, start + scanned + min(batch, max_seeds - scanned), dtype=np.uint64)
+            draws = sample_seeds(compiled, seeds)
+            values = None
+            for row in np.flatnonzero(predicate(compiled, draws)):
+                seed = int(seeds[row])
+                if verify and not replays(compiled, draws, row, seed):
+                    unreplayable += 1
+                    continue
+                values = pack_values(compiled, draws) if values is None else values
+                cards, foil, bonus, _ = materialize(compiled, draws, row)
+                found.append({"seed": seed, "value": float(values[row]),
+                              "cards": [c.get("name") for c in cards] + [f"{foil.get('name')} (foil)" if foil else None]
+                                       + ([bonus.get("name")] if bonus else [])})
+                if len(found) == count:
+                    break
+            scanned += len(seeds)
+    finally:
+        booster.set_card_source(*previous)
+    return {"seeds": found, "scanned": scanned, "unreplayable": unreplayable}
+
+if __name__ == "__main__":
+    import sys, time, argparse
+    if sys.argv[1:2] == ["replay"]:
+        import card_pools
+        code, seed = sys.argv[2].lower(), int(sys.argv[3])
+        card_pools.use_pool_source([code])
+        booster.display_booster(*replay(code, seed), suspense=False)
+        sys.exit(0)
+    parser = argparse.ArgumentParser(description="seeds whose pack matches; replay with: seed_search.py replay <set> <seed>")
+    parser.add_argument("set_code")
+    parser.add_argument("--rares", type=int, help="at least this many rares/mythics")
+    parser.add_argument("--mythics", type=int, help="at least this many mythics")
+    parser.add_argument("--name", help="a card whose name contains this")
+    parser.add_argument("--treatment", help="... with a treatment containing this")
+    parser.add_argument("--special", action="store_true", help="... with a non-regular treatment")
+    parser.add_argument("--foil", action="store_true", help="... in a foil slot")
+    parser.add_argument("--value", type=float, help="pack value at least this")
+    parser.add_argument("--count", type=int, default=FOUND)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--max", type=int, default=MAX_SEEDS)
+    parser.add_argument("--no-verify", action="store_true")
+    args = parser.parse_args()
+
+    predicates: List[Predicate] = []
+    if args.rares:
+        predicates.append(rarity_count(("rare", "mythic"), args.rares))
+    if args.mythics:
+        predicates.append(rarity_count(("mythic",), args.mythics))
+    if args.name or args.treatment or args.special or args.foil:
+        predicates.append(has_card(args.name, args.treatment, foil=True if args.foil else None,
+                                   special=True if args.special else None))
+    if args.value is not None:
+        predicates.append(value_at_least(args.value))
+    if not predicates:
+        parser.error("give at least one of --rares --mythics --name --treatment --special --foil --value")
+
+    code = args.set_code.lower()
+    get_compiled(code)
+    t = time.perf_counter()
+    result = search(code, all_of(*predicates), args.count, args.start, args.max, verify=not args.no_verify)
+    elapsed = time.perf_counter() - t
+    for hit in result["seeds"]:
+        print(f"{hit['seed']:>12}  {hit['value']:8.2f}  " + ", ".join(c for c in hit["cards"] if c))
+    print(f"{len(result['seeds'])} found, {result['scanned']:,} seeds in {elapsed:.1f}s "
+          f"({result['scanned'] / max(elapsed, 1e-9):,.0f} seeds/s), {result['unreplayable']} unreplayable")
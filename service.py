@@ -0,0 +1,366 @@
+# service.py — asyncio HTTP service over compiled plans and local pools
+#
+#   python service.py [--host 127.0.0.1] [--port 8080]
+#
+#   GET /sets                                   registry set codes
+#   GET /sets/<code>/pack[?seed=]               one pack
+#   GET /sets/<code>/packs?n=N[&seed=]          N packs, streamed as NDJSON (one pack per line)
+#   GET /sets/<code>/ev                         exact pack EV (pull rates x store prices)
+#   GET /sets/<code>/pull-rates?name=|cn=       pull-rate rows for one card (any print / one cn)
+#   GET /images/<card id>[/thumb]               cached card image (--images)
+#
+# Set files (sets/<code>.toml) are re-checked every RELOAD_INTERVAL seconds; an edited set is
+# recompiled in a worker thread and swapped in, requests in flight finish on the old plan.
+#
+# Standard library only: one event loop, HTTP/1.1 keep-alive, chunked transfer for streams.
+# Packs come from booster_engine (no Scryfall calls per request); compiling a set (pool loading)
+# and large batches run in a worker thread so the loop keeps serving other clients.
+# Each client (X-Client-Id header, else the peer address) gets a token bucket.
+#
+# With --images, compiling a set also starts downloading its card images into image_cache in the
+# background; pack cards then carry local /images/... URLs, served from disk only.
+
+import json, time, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from booster_registry import REGISTRY
+from booster_engine import get_compiled, sample_packs, slot_values, reload_sets
+from pull_rates import pull_rates, expected_value, lookup
+
+MAX_PACKS = 1_000_000           # per request
+STREAM_CHUNK = 1_000            # packs per streamed chunk
+INLINE_PACKS = 64               # at most this many packs are sampled on the event loop
+
+RATE_PER_SEC = 50.0             # sustained requests per client
+RATE_BURST = 200.0
+PACK_COST = 1.0 / STREAM_CHUNK  # extra tokens per pack on /packs, so N=1M is not "one request"
+
+RELOAD_INTERVAL = 5.0           # seconds between set-file checks
+
+MAX_HEADER_BYTES = 16 * 1024
+IDLE_TIMEOUT = 30.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           429: "Too Many Requests", 500: "Internal Server Error"}
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="service")
+_images = None                  # image_cache.ImageCache when serving images
+
+def set_codes() -> List[str]:
+    # REGISTRY lists the files on disk, so sets added while running show up
+    return sorted(code for code in REGISTRY if not code.startswith("_"))
+
+# =========================
+# Per-client limits
+# =========================
+
+class TokenBucket:
+    __slots__ = ("tokens", "stamp")
+
+    def __init__(self):
+        self.tokens = RATE_BURST
+        self.stamp = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """0 when allowed, otherwise seconds until enough tokens are back."""
+        now = time.monotonic()
+        self.tokens = min(RATE_BURST, self.tokens + (now - self.stamp) * RATE_PER_SEC)
+        self.stamp = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / RATE_PER_SEC
+
+_buckets: Dict[str, TokenBucket] = {}
+
+def rate_limit(client: str, cost: float = 1.0) -> float:
+    bucket = _buckets.get(client)
+    if bucket is None:
+        if len(_buckets) > 100_000:
+            _buckets.clear()
+        bucket = _buckets[client] = TokenBucket()
+    return bucket.take(min(cost, RATE_BURST))
+
+# =========================
+# Handlers (JSON in, JSON out)
+# =========================
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class StreamAborted(Exception):
+    """A streamed response failed after its 200 head went out; all that is left is to hang up."""
+
+async def compiled_for(code: str) -> Dict[str, Any]:
+    code = code.lower()
+    if code.startswith("_") or code not in REGISTRY:
+        raise HttpError(404, f"unknown set {code!r}")
+    # the first request per set loads pools; never do that on the loop
+    loop = asyncio.get_running_loop()
+    # with --images, get_compiled starts warming the set's images behind the packs it serves
+    return await loop.run_in_executor(_executor, get_compiled, code)
+
+def card_json(card: Dict[str, Any], foil: bool, price: float) -> Dict[str, Any]:
+    out = {k: card.get(k) for k in ("id", "name", "set", "collector_number", "rarity")}
+    out["foil"] = foil
+    out["treatment"] = card.get("x_treatment")
+    out["price"] = round(float(price), 2)
+    if _images is not None:
+        out["image"] = f"/images/{card.get('id')}"
+        out["thumb"] = f"/images/{card.get('id')}/thumb"
+    return out
+
+def warm_pack(compiled: Dict[str, Any], draws: Dict[str, np.ndarray]):
+    """With --images, fetch the art of the packs just drawn first, ahead of the set-wide warm."""
+    if _images is not None:
+        cards = compiled["cards"]
+        _images.warm_async(cards[int(c)] for c in np.unique(draws["card"]) if c >= 0)
+
+def packs_json(compiled: Dict[str, Any], draws: Dict[str, np.ndarray], first_id: int = 0) -> List[Dict[str, Any]]:
+    values = slot_values(compiled, draws)
+    out = []
+    for row in range(draws["card"].shape[0]):
+        cards = []
+        for s, slot in enumerate(compiled["slots"]):
+            c = int(draws["card"][row, s])
+            if c < 0:
+                continue
+            card = dict(compiled["cards"][c])
+            treatment = slot["entries"][int(draws["entry"][row, s])]["treatment"]
+            if treatment:
+                card["x_treatment"] = treatment
+            cards.append(dict(card_json(card, bool(slot["foil"]), values[row, s]), slot=slot["label"]))
+        out.append({"pack": first_id + row, "value": round(float(values[row].sum()), 2), "cards": cards})
+    return out
+
+def _int_param(params: Dict[str, List[str]], name: str, default: Optional[int] = None,
+               minimum: Optional[int] = None) -> Optional[int]:
+    raw = params.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise HttpError(400, f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise HttpError(400, f"{name} must be at least {minimum}")
+    return value
+
+# =========================
+# HTTP plumbing
+# =========================
+
+class Request:
+    __slots__ = ("method", "path", "params", "headers", "client")
+
+    def __init__(self, method, path, params, headers, client):
+        self.method, self.path, self.params, self.headers, self.client = method, path, params, headers, client
+
+async def read_request(reader: asyncio.StreamReader, peer: str) -> Optional[Request]:
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(400, "headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    url = urlsplit(target)
+    client = headers.get("x-client-id") or peer
+    return Request(method, url.path.rstrip("/") or "/", parse_qs(url.query), headers, client)
+
+def response_head(status: int, content_type: str = "application/json", length: Optional[int] = None,
+                  extra: Optional[Dict[str, str]] = None) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}"]
+    lines.append(f"Content-Length: {length}" if length is not None else "Transfer-Encoding: chunked")
+    for k, v in (extra or {}).items():
+        lines.append(f"{k}: {v}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+async def send_json(writer: asyncio.StreamWriter, status: int, payload: Any, extra: Optional[Dict[str, str]] = None):
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    writer.write(response_head(status, length=len(body), extra=extra) + body)
+    await writer.drain()
+
+async def send_image(writer: asyncio.StreamWriter, card_id: str, kind: str):
+    if _images is None or kind not in ("image", "thumb"):
+        raise HttpError(404, "not found")
+    data = await asyncio.get_running_loop().run_in_executor(_executor, _images.read, card_id, kind)
+    if data is None:
+        raise HttpError(404, "image not cached (yet)")
+    writer.write(response_head(200, "image/jpeg", len(data), {"Cache-Control": "public, max-age=86400"}) + data)
+    await writer.drain()
+
+async def stream_packs(writer: asyncio.StreamWriter, compiled: Dict[str, Any], n: int, seed: Optional[int]):
+    """NDJSON in chunked encoding; each chunk is sampled off-loop, so memory stays at one chunk."""
+    loop = asyncio.get_running_loop()
+    rng = np.random.default_rng(seed)
+    writer.write(response_head(200, "application/x-ndjson"))
+    done = 0
+    try:
+        while done < n:
+            k = min(STREAM_CHUNK, n - done)
+            packs = await loop.run_in_executor(
+                _executor, lambda k=k, done=done: packs_json(compiled, sample_packs(compiled, k, rng), done))
+            data = "".join(json.dumps(p, separators=(",", ":")) + "\n" for p in packs).encode("utf-8")
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await writer.drain()  # back-pressure: a slow client pauses its own stream only
+            done += k
+    except (ConnectionError, asyncio.CancelledError):
+        raise
+    except Exception as err:
+        # an error body now would land inside the chunked stream; without the final chunk the
+        # client sees a truncated response instead
+        print("[service] Error:", repr(err), "| streamed", done, "of", n)
+        raise StreamAborted() from err
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+async def route(req: Request, writer: asyncio.StreamWriter):
+    if req.method != "GET":
+        raise HttpError(405, "only GET is supported")
+    parts = [p for p in req.path.split("/") if p]
+    if parts == ["sets"]:
+        return await send_json(writer, 200, set_codes())
+    if parts[:1] == ["images"] and len(parts) in (2, 3):
+        return await send_image(writer, parts[1], parts[2] if len(parts) == 3 else "image")
+    if len(parts) != 3 or parts[0] != "sets":
+        raise HttpError(404, "not found")
+    code, action = parts[1], parts[2]
+
+    if action == "pack":
+        compiled = await compiled_for(code)
+        rng = np.random.default_rng(_int_param(req.params, "seed", minimum=0))
+        draws = sample_packs(compiled, 1, rng)
+        warm_pack(compiled, draws)
+        return await send_json(writer, 200, packs_json(compiled, draws)[0])
+
+    if action == "packs":
+        n = _int_param(req.params, "n", 1)
+        if not 1 <= n <= MAX_PACKS:
+            raise HttpError(400, f"n must be between 1 and {MAX_PACKS}")
+        wait = rate_limit(req.client, n * PACK_COST)
+        if wait:
+            raise HttpError(429, f"retry in {wait:.1f}s")
+        compiled = await compiled_for(code)
+        seed = _int_param(req.params, "seed", minimum=0)
+        if n <= INLINE_PACKS:
+            draws = sample_packs(compiled, n, np.random.default_rng(seed))
+            warm_pack(compiled, draws)
+            packs = packs_json(compiled, draws)
+            body = "".join(json.dumps(p, separators=(",", ":")) + "\n" for p in packs).encode("utf-8")
+            writer.write(response_head(200, "application/x-ndjson", len(body)) + body)
+            return await writer.drain()
+        return await stream_packs(writer, compiled, n, seed)
+
+    if action == "ev":
+        compiled = await compiled_for(code)
+        ev = await asyncio.get_running_loop().run_in_executor(_executor, expected_value, compiled)
+        plan = compiled["plan"]
+        return await send_json(writer, 200, {"set": compiled["set_code"], "ev": round(ev, 4),
+                                             "msrp": plan["msrp"], "ev_per_msrp": round(ev / plan["msrp"], 4)})
+
+    if action == "pull-rates":
+        await compiled_for(code)
+        table = await asyncio.get_running_loop().run_in_executor(_executor, pull_rates, code.lower())
+        name = req.params.get("name", [None])[0]
+        cn = req.params.get("cn", [None])[0]
+        if not name and not cn:
+            raise HttpError(400, "pass name= or cn=")
+        rows = lookup(table, name=name, cn=cn)
+        if not rows:
+            raise HttpError(404, "card not in this set's packs")
+        return await send_json(writer, 200, rows)
+
+    raise HttpError(404, "not found")
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    peer = writer.get_extra_info("peername")
+    peer = peer[0] if isinstance(peer, tuple) else str(peer)
+    try:
+        while True:
+            try:
+                req = await read_request(reader, peer)
+                if req is None:
+                    break
+                wait = rate_limit(req.client)
+                if wait:
+                    raise HttpError(429, f"retry in {wait:.1f}s")
+                await route(req, writer)
+            except HttpError as err:
+                extra = {"Retry-After": str(max(1, int(RATE_BURST / RATE_PER_SEC)))} if err.status == 429 else None
+                await send_json(writer, err.status, {"error": str(err)}, extra)
+                if err.status == 400:
+                    break
+            except (ConnectionError, asyncio.CancelledError, StreamAborted):
+                break
+            except Exception as err:
+                print("[service] Error:", repr(err))
+                await send_json(writer, 500, {"error": "internal error"})
+                break
+            if req.headers.get("connection", "").lower() == "close":
+                break
+    finally:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+async def reload_loop(interval: float = RELOAD_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            changed = await loop.run_in_executor(_executor, reload_sets)
+        except Exception as err:
+            print("[service] Reload error:", repr(err))
+            continue
+        if changed:
+            print(f"[service] reloaded {', '.join(changed)}")
+        if _images is not None:
+            await loop.run_in_executor(_executor, _images.save)  # LRU stamps of served images
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, warm: Tuple[str, ...] = (), images: bool = False):
+    global _images
+    if images:
+        from image_cache import get_cache, set_warm_on_load
+        _images = get_cache()
+        set_warm_on_load(True)
+    for code in warm:
+        await compiled_for(code)
+    server = await asyncio.start_server(handle, host, port, limit=MAX_HEADER_BYTES, backlog=4096)
+    print(f"serving on http://{host}:{port}")
+    reloader = asyncio.create_task(reload_loop())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reloader.cancel()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="MTG booster opening over HTTP")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--warm", nargs="*", default=[], help="set codes to compile before accepting requests")
+    ap.add_argument("--images", action="store_true", help="cache card images locally and serve them")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, tuple(args.warm), args.images))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,170 @@
+# sweep.py — rank every openable set by pack EV per euro of MSRP
+#
+#   python sweep.py [budget_packs] [--sets fin,dft,...] [--csv out.csv]
+#
+# Each set is compiled once (pools come from card_pools' shared cache, prices from the shared
+# price store) and gets its exact EV from pull_rates. Simulation then supplies what the exact
+# table can't: the spread of pack values and the tail probabilities. Packs are spent in rounds:
+# a pilot batch for every set, then each round gives more packs to the sets whose confidence
+# intervals (relative to EV, or on the tail probabilities) are still the widest, until every set
+# meets the target or the budget runs out.
+
+import math, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from booster import all_set_codes
+from booster_engine import get_compiled, sample_packs, pack_values
+from pull_rates import expected_value
+
+PILOT_PACKS = 20_000
+ROUND_PACKS = 200_000          # budget handed out per allocation round
+MIN_BATCH = 1_000              # smallest top-up worth a scheduling round
+TARGET_REL_CI = 0.01           # 95% CI half-width / EV
+TARGET_TAIL_CI = 0.005         # 95% CI half-width on tail probabilities
+TAIL_MULTIPLES = (1.0, 2.0, 5.0)  # P(pack value >= k x MSRP)
+Z95 = 1.96
+
+# =========================
+# Per-set running state
+# =========================
+
+class SetStats:
+    """Everything the scheduler knows about one set so far."""
+
+    def __init__(self, code: str, compiled: Dict[str, Any], seed: np.random.SeedSequence):
+        self.code = code
+        self.compiled = compiled
+        self.msrp = float(compiled["plan"]["msrp"])
+        self.ev = expected_value(compiled)
+        self._seeds = seed
+        self.values: List[np.ndarray] = []
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def run(self, n: int) -> "SetStats":
+        rng = np.random.default_rng(self._seeds.spawn(1)[0])
+        values = pack_values(self.compiled, sample_packs(self.compiled, n, rng)).astype(np.float32)
+        self.values.append(values)
+        self.n += n
+        self.total += float(values.sum(dtype=np.float64))
+        self.total_sq += float(np.square(values, dtype=np.float64).sum())
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return 0.0
+        var = (self.total_sq - self.n * self.mean ** 2) / (self.n - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def tails(self) -> Dict[float, float]:
+        values = np.concatenate(self.values) if self.values else np.zeros(0, dtype=np.float32)
+        return {k: float((values >= k * self.msrp).mean()) if len(values) else 0.0 for k in TAIL_MULTIPLES}
+
+    def packs_needed(self) -> int:
+        """Total packs for this set to meet both CI targets (normal approximation)."""
+        ev = max(abs(self.ev), 1e-9)
+        need_mean = (Z95 * self.std / (TARGET_REL_CI * ev)) ** 2
+        need_tail = max((Z95 ** 2) * p * (1 - p) / TARGET_TAIL_CI ** 2 for p in self.tails().values())
+        return int(math.ceil(max(need_mean, need_tail)))
+
+    def row(self) -> Dict[str, Any]:
+        values = np.concatenate(self.values)
+        half = Z95 * self.std / math.sqrt(self.n)
+        out = {
+            "set": self.code,
+            "packs": self.n,
+            "ev": round(self.ev, 4),
+            "ev_sim": round(self.mean, 4),
+            "ev_ci95": round(half, 4),
+            "msrp": self.msrp,
+            "ev_per_msrp": round(self.ev / self.msrp, 4),
+            "std": round(self.std, 4),
+            "median": round(float(np.median(values)), 4),
+            "p95": round(float(np.quantile(values, 0.95)), 4),
+        }
+        for k, p in self.tails().items():
+            out[f"p_ge_{k:g}x"] = round(p, 5)
+        return out
+
+# =========================
+# Scheduler
+# =========================
+
+def allocate(stats: Sequence[SetStats], budget: int) -> Dict[str, int]:
+    """Split budget over the sets still short of their target, proportional to the shortfall."""
+    short = {s.code: max(0, s.packs_needed() - s.n) for s in stats}
+    total = sum(short.values())
+    if total == 0 or budget <= 0:
+        return {}
+    scale = min(1.0, budget / total)
+    return {code: max(MIN_BATCH, int(math.ceil(n * scale))) for code, n in short.items() if n > 0}
+
+def sweep(set_codes: Optional[Sequence[str]] = None, budget: int = 2_000_000, seed: Optional[int] = None,
+          workers: int = 4, pilot: int = PILOT_PACKS, verbose: bool = True) -> List[Dict[str, Any]]:
+    """Returns rows ranked by EV / MSRP (highest first)."""
+    codes = sorted(set_codes or all_set_codes())
+    root = np.random.SeedSequence(seed)
+    seeds = dict(zip(codes, root.spawn(len(codes))))
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sweep") as pool:
+        # compile concurrently: pool downloads overlap, shared queries are loaded once
+        compiled = dict(zip(codes, pool.map(get_compiled, codes)))
+        stats = [SetStats(c, compiled[c], seeds[c]) for c in codes]
+        list(pool.map(lambda s: s.run(pilot), stats))
+        spent = pilot * len(stats)
+
+        while spent < budget:
+            plan = allocate(stats, min(ROUND_PACKS, budget - spent))
+            if not plan:
+                break
+            by_code = {s.code: s for s in stats}
+            list(pool.map(lambda kv: by_code[kv[0]].run(kv[1]), plan.items()))
+            spent += sum(plan.values())
+            if verbose:
+                print(f"[sweep] {spent:,} packs, {len(plan)} sets still refining ({time.perf_counter() - t0:.1f}s)")
+
+    rows = [s.row() for s in stats]
+    rows.sort(key=lambda r: r["ev_per_msrp"], reverse=True)
+    for rank, r in enumerate(rows, 1):
+        r["rank"] = rank
+    return rows
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    tails = [f"p_ge_{k:g}x" for k in TAIL_MULTIPLES]
+    header = f"{'#':>3} {'set':<5} {'EV':>8} {'±95%':>7} {'MSRP':>6} {'EV/MSRP':>8} " + \
+             " ".join(f"{'P≥' + t[5:]:>8}" for t in tails) + f" {'packs':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(f"{r['rank']:>3} {r['set']:<5} {r['ev']:>8.2f} {r['ev_ci95']:>7.3f} {r['msrp']:>6.2f} "
+                     f"{r['ev_per_msrp']:>8.3f} " + " ".join(f"{r[t]:>8.4f}" for t in tails) + f" {r['packs']:>9,}")
+    return "\n".join(lines)
+
+def save_csv(rows: List[Dict[str, Any]], path: str):
+    import csv
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Rank sets by pack EV per euro")
+    ap.add_argument("budget", nargs="?", type=int, default=2_000_000)
+    ap.add_argument("--sets", default="")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--csv", default="")
+    args = ap.parse_args()
+    rows = sweep([c for c in args.sets.split(",") if c] or None, args.budget, args.seed)
+    print(format_table(rows))
+    if args.csv:
+        save_csv(rows, args.csv)
@@ -0,0 +1,168 @@
+# valuation.py — what a card is worth: one policy for the opener, the engines and the reports
+#
+# A ValuationPolicy decides
+#   - which price currencies to read, in order of preference, and the FX rate of each into the
+#     base currency every value is reported in (a usd price is converted, not relabelled as €)
+#   - the finish a card is valued at: foil slots (and cards fetched with force_foil) use foil
+#     prices, foil-etched-only cards their etched price, foil-only cards in a regular slot their
+#     foil price; with finish_fallback a missing finish price falls back to the next finish
+#   - what a card with no price at all is worth (impute: rarity → value in the base currency)
+#
+# card_price() values one card dict (the opener path, pure Python); vectors() turns a whole card
+# list (+ price store rows) into one regular and one foil price vector, which is all the batched
+# engines need: valuing any number of sampled packs is then one gather.
+
+import math
+from typing import Dict, Any, List, Optional, Tuple, Callable, Sequence
+
+# base-currency units per unit of each currency (refresh when it matters; prices move more)
+FX_RATES = {"eur": 1.0, "usd": 0.92}
+CURRENCY_SYMBOLS = {"eur": "€", "usd": "$"}
+FINISH_ORDER = {"nonfoil": ("nonfoil", "foil"), "foil": ("foil", "nonfoil"), "etched": ("etched", "foil", "nonfoil")}
+_SUFFIX = {"nonfoil": "", "foil": "_foil", "etched": "_etched"}
+
+def _price(value) -> Optional[float]:
+    try:
+        v = float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+    return v if v is not None and math.isfinite(v) else None
+
+def card_finish(card: Dict[str, Any], foil_slot: bool) -> str:
+    """nonfoil / foil / etched, from the slot and the card's own finishes."""
+    finishes = card.get("finishes") or []
+    foil = foil_slot or bool(card.get("x_foil"))
+    if finishes and "nonfoil" not in finishes:
+        foil = True  # a foil-only print is a foil wherever it turns up
+    if not foil:
+        return "nonfoil"
+    if finishes and "etched" in finishes and "foil" not in finishes:
+        return "etched"
+    return "foil"
+
+class ValuationPolicy:
+    __slots__ = ("name", "base", "currencies", "fx", "finish_fallback", "impute")
+
+    def __init__(self, name: str = "default", base: str = "eur", currencies: Sequence[str] = ("eur", "usd"),
+                 fx: Optional[Dict[str, float]] = None, finish_fallback: bool = True,
+                 impute: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.base = base
+        self.currencies = tuple(currencies)
+        rates = dict(fx or FX_RATES)
+        # rates are quoted into eur; re-base them when reporting in another currency
+        self.fx = {c: rates.get(c, 1.0) / rates.get(base, 1.0) for c in self.currencies}
+        self.finish_fallback = finish_fallback
+        self.impute = dict(impute or {})
+
+    @property
+    def key(self) -> Tuple:
+        return (self.name, self.base, self.currencies, tuple(sorted(self.fx.items())), self.finish_fallback,
+                tuple(sorted(self.impute.items())))
+
+    @property
+    def symbol(self) -> str:
+        return CURRENCY_SYMBOLS.get(self.base, self.base.upper())
+
+    def order(self, finish: str) -> List[Tuple[str, float]]:
+        """(price column, rate) pairs in the order they are tried: finish first, then currency."""
+        finishes = FINISH_ORDER[finish] if self.finish_fallback else (finish,)
+        return [(c + _SUFFIX[f], self.fx[c]) for f in finishes for c in self.currencies]
+
+    # ---- one card ----
+
+    def card_price(self, card: Optional[Dict[str, Any]], foil_slot: bool = False) -> float:
+        if not card:
+            return 0.0
+        prices = card.get("prices") or {}
+        for column, rate in self.order(card_finish(card, foil_slot)):
+            v = _price(prices.get(column))
+            if v is not None:
+                return v * rate
+        return self.impute.get(card.get("rarity"), 0.0)
+
+    def format(self, value: float) -> str:
+        return f"{value:.2f} {self.symbol}"
+
+    # ---- vectors ----
+
+    def column_prices(self, get: Callable[[str], Any], finish, rarity=None):
+        """
+        Vector version of card_price. get(column) returns a float array (NaN = no price) for any
+        column name; finish is one name or a per-card array of names.
+        """
+        import numpy as np
+
+        out = None
+        finishes = ("nonfoil", "foil", "etched") if not isinstance(finish, str) else (finish,)
+        for f in finishes:
+            mask = None if isinstance(finish, str) else (np.asarray(finish) == f)
+            if mask is not None and not mask.any():
+                continue
+            vals = None
+            for column, rate in self.order(f):
+                v = np.asarray(get(column), dtype=np.float64) * rate
+                vals = v if vals is None else np.where(np.isnan(vals), v, vals)
+            if out is None:
+                out = np.full(len(vals), np.nan)
+            out = vals if mask is None else np.where(mask, vals, out)
+        if out is None:
+            return np.zeros(0, dtype=np.float32)
+        missing = np.isnan(out)
+        if missing.any():
+            fill = np.zeros(len(out))
+            if self.impute and rarity is not None:
+                fill = np.array([self.impute.get(r, 0.0) for r in rarity], dtype=np.float64)
+            out = np.where(missing, fill, out)
+        return out.astype(np.float32)
+
+    def vectors(self, cards: List[Dict[str, Any]], store=None, rows=None):
+        """
+        (regular, foil) float32 price vectors for cards. Store rows (-1 = unknown) win over the
+        prices the card dicts were fetched with; columns the store does not keep (etched) always
+        come from the card dicts.
+        """
+        import numpy as np
+        from price_store import COLUMNS
+
+        n = len(cards)
+        rows = np.full(n, -1, dtype=np.int64) if rows is None else np.asarray(rows)
+        known = rows >= 0
+        own: Dict[str, np.ndarray] = {}
+
+        def from_cards(column: str) -> np.ndarray:
+            hit = own.get(column)
+            if hit is None:
+                values = [_price((c.get("prices") or {}).get(column)) for c in cards]
+                hit = own[column] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            return hit
+
+        def get(column: str) -> np.ndarray:
+            if store is not None and column in COLUMNS and known.any():
+                return np.where(known, store.gather(rows, column), from_cards(column))
+            return from_cards(column)
+
+        rarity = [c.get("rarity") for c in cards]
+        regular = self.column_prices(get, [card_finish(c, False) for c in cards], rarity)
+        foil = self.column_prices(get, [card_finish(c, True) for c in cards], rarity)
+        return regular, foil
+
+    def __repr__(self) -> str:
+        return f"ValuationPolicy({self.name!r}, base={self.base!r}, currencies={self.currencies})"
+
+DEFAULT_POLICY = ValuationPolicy()
+# what the opener did before: eur else usd at face value, no finish fallback
+LEGACY_POLICY = ValuationPolicy("legacy", fx={"eur": 1.0, "usd": 1.0}, finish_fallback=False)
+
+_policy = DEFAULT_POLICY
+
+def set_policy(policy: ValuationPolicy):
+    """
+    The policy card_value, the display and compiled price columns use from now on (compiled sets
+    built under another policy are repriced on their next get_compiled).
+    """
+    global _policy
+    _policy = policy
+
+def get_policy() -> ValuationPolicy:
+    return _policy
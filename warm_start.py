@@ -0,0 +1,235 @@
+# warm_start.py — versioned on-disk snapshot of everything a process builds before its first pack
+#
+#   python warm_start.py build [codes...]     snapshot pools + compiled sets (default: every REGISTRY set)
+#   python warm_start.py bench [code]         cold-start timings in fresh interpreters
+#   python warm_start.py clear
+#
+# Two snapshots per set under SNAPSHOT_DIR:
+#   <code>.pools.pkl      plan queries → pools, cards stored once (pure Python: the opener path
+#                         loads it without importing numpy)
+#   <code>.engine/        booster_engine.compile_set output: the big arrays as .npy files opened
+#                         with mmap_mode="r" (pages load on first touch and are shared between
+#                         worker processes), everything else plus the cached pull-rate table pickled
+#
+# A snapshot is used only when its fingerprint matches (snapshot format + the source of the plan
+# compiler and query builder + the set's own registry files) and it is younger than the pool TTL. Price columns
+# are not a reason to rebuild: when the price store moved on, they are regathered on load.
+#
+# card_pools.use_pool_source and booster_engine.get_compiled read and write these automatically.
+
+import os, time, pickle, hashlib, shutil
+from typing import Dict, Any, List, Optional, Iterable
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".card_cache", "snapshot")
+SNAPSHOT_VERSION = 1
+
+# anything that changes what a compiled set looks like
+_SOURCES = ("booster_registry.py", "booster_plan.py", "booster.py", "booster_engine.py")  # + sets/*.toml per set
+_MMAP_ARRAYS = ("pool_flat", "price_rows", "price", "price_foil", "rarity")
+
+_source_digest: Optional[bytes] = None
+
+def fingerprint(code: str) -> str:
+    """Snapshot format + engine sources + this set's registry files (_default and <code>.toml)."""
+    global _source_digest
+    here = os.path.dirname(os.path.abspath(__file__))
+    if _source_digest is None:
+        h = hashlib.sha1(f"snapshot-v{SNAPSHOT_VERSION}".encode())
+        for name in _SOURCES:
+            try:
+                with open(os.path.join(here, name), "rb") as fh:
+                    h.update(fh.read())
+            except OSError:
+                h.update(name.encode())
+        _source_digest = h.digest()
+    # set files are re-read every time: a hot reload must not pick up a stale snapshot
+    from booster_registry import REGISTRY, DEFAULT_CODE
+    h = hashlib.sha1(_source_digest)
+    for name in (DEFAULT_CODE, code.lower()):
+        try:
+            with open(REGISTRY.file(name), "rb") as fh:
+                h.update(fh.read())
+        except OSError:
+            h.update(name.encode())
+    return h.hexdigest()
+
+def _max_age() -> float:
+    from card_pools import POOL_TTL
+    return POOL_TTL
+
+def _usable(meta: Dict[str, Any], code: str) -> bool:
+    return meta.get("fingerprint") == fingerprint(code) and time.time() - meta.get("created", 0) <= _max_age()
+
+def _enabled() -> bool:
+    # fixtures / custom pool providers must never see (or write) snapshot data
+    from card_pools import pool_provider
+    return pool_provider() is None
+
+def _atomic_pickle(obj: Any, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+# =========================
+# Pools (opener path)
+# =========================
+
+def _pools_path(code: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{code.lower()}.pools.pkl")
+
+def save_pools(set_codes: Iterable[str]):
+    """Snapshot the in-memory pools of each set's plan (call after they were loaded)."""
+    from booster_plan import compile_plan, plan_queries
+    from card_pools import load_pool
+
+    for code in set_codes:
+        cards: List[Dict[str, Any]] = []
+        index: Dict[str, int] = {}
+        queries: Dict[str, List[int]] = {}
+        for query in plan_queries(compile_plan(code)):
+            members = []
+            for card in load_pool(query):
+                i = index.get(card["id"])
+                if i is None:
+                    i = index[card["id"]] = len(cards)
+                    cards.append(card)
+                members.append(i)
+            queries[query] = members
+        _atomic_pickle({"fingerprint": fingerprint(code), "created": time.time(), "set_code": code,
+                        "cards": cards, "queries": queries}, _pools_path(code))
+
+def load_pools(code: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_pools_path(code), "rb") as fh:
+            snap = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return snap if _usable(snap, code) else None
+
+def install_pools(set_codes: Iterable[str]) -> List[str]:
+    """Seed card_pools' memory from snapshots; returns the codes that had a usable one."""
+    from card_pools import seed_pools
+
+    if not _enabled():
+        return []
+    installed = []
+    for code in set_codes:
+        snap = load_pools(code)
+        if snap is None:
+            continue
+        cards = snap["cards"]
+        # pools share card dicts; sample_from_pool hands out copies
+        seed_pools({q: [cards[i] for i in members] for q, members in snap["queries"].items()}, snap["created"])
+        installed.append(code)
+    return installed
+
+# =========================
+# Compiled sets (engine path)
+# =========================
+
+def _engine_dir(code: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{code.lower()}.engine")
+
+def save_compiled(compiled: Dict[str, Any]):
+    import numpy as np
+
+    if not _enabled():
+        return
+    final = _engine_dir(compiled["set_code"])
+    tmp = f"{final}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in _MMAP_ARRAYS:
+        np.save(os.path.join(tmp, f"{name}.npy"), compiled[name])
+    rest = {k: v for k, v in compiled.items() if k not in _MMAP_ARRAYS}
+    rest["cache"] = {k: v for k, v in compiled["cache"].items() if k == "pull_rates"}
+    meta = {"fingerprint": fingerprint(compiled["set_code"]), "created": time.time(), "compiled": rest}
+    with open(os.path.join(tmp, "compiled.pkl"), "wb") as fh:
+        pickle.dump(meta, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    # swap directories: readers see either the old snapshot or the new one
+    old = f"{final}.{os.getpid()}.old"
+    if os.path.exists(final):
+        os.replace(final, old)
+    os.replace(tmp, final)
+    shutil.rmtree(old, ignore_errors=True)
+
+def load_compiled(code: str) -> Optional[Dict[str, Any]]:
+    """The snapshot of a compiled set (arrays memory-mapped), repriced if the store moved on."""
+    import numpy as np
+
+    if not _enabled():
+        return None
+    path = _engine_dir(code)
+    try:
+        with open(os.path.join(path, "compiled.pkl"), "rb") as fh:
+            meta = pickle.load(fh)
+        if not _usable(meta, code):
+            return None
+        compiled = meta["compiled"]
+        for name in _MMAP_ARRAYS:
+            compiled[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        return None
+
+    from booster_engine import store_version, reprice
+    from valuation import get_policy
+    if compiled.get("price_version") != store_version() or compiled.get("price_policy") != get_policy().key:
+        reprice(compiled)
+    return compiled
+
+# =========================
+# Maintenance
+# =========================
+
+def build(set_codes: Iterable[str]):
+    from card_pools import use_pool_source
+    from booster_engine import get_compiled, invalidate
+    from pull_rates import pull_rates
+
+    for code in set_codes:
+        use_pool_source([code])
+        invalidate(code)
+        shutil.rmtree(_engine_dir(code), ignore_errors=True)
+        pull_rates(code)  # fills the cache before the snapshot is written
+        save_compiled(get_compiled(code))
+
+def clear():
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+
+def bench(code: str = "fin", runs: int = 5) -> Dict[str, float]:
+    """Best-of-runs wall time of fresh interpreters doing the first pack, opener and engine path."""
+    import subprocess, sys
+    here = os.path.dirname(os.path.abspath(__file__))
+    scripts = {
+        "import booster": "import booster",
+        "opener first pack": f"import booster, card_pools; card_pools.use_pool_source(['{code}']); booster.open_booster('{code}')",
+        "engine first pack": f"import booster_engine as e; c = e.get_compiled('{code}'); e.sample_packs(c, 1)",
+        "python -c pass": "pass",
+    }
+    out = {}
+    for label, script in scripts.items():
+        best = float("inf")
+        for _ in range(runs):
+            t = time.perf_counter()
+            subprocess.run([sys.executable, "-c", script], cwd=here, check=True)
+            best = min(best, time.perf_counter() - t)
+        out[label] = round(best * 1000, 1)
+    return out
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    if args[:1] == ["build"]:
+        from booster_registry import REGISTRY
+        codes = args[1:] or sorted(c for c in REGISTRY if not c.startswith("_"))
+        build(codes)
+        print(f"snapshot for {len(codes)} sets in {SNAPSHOT_DIR}")
+    elif args[:1] == ["bench"]:
+        for label, ms in bench(args[1] if len(args) > 1 else "fin").items():
+            print(f"{label:<20} {ms:>7.1f} ms")
+    elif args[:1] == ["clear"]:
+        clear()
+    else:
+        print("usage: warm_start.py build [codes...] | bench [code] | clear")